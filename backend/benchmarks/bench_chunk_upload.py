@@ -0,0 +1,129 @@
+"""
+청크 업로드 벤치마크: 단일 스트림 vs 병렬 스트림 처리량 비교
+
+사용법:
+    python benchmarks/bench_chunk_upload.py --size-mb 2048 --streams 1 4 8
+    python benchmarks/bench_chunk_upload.py --url http://127.0.0.1:8000  # 실행 중인 서버 대상
+"""
+import argparse
+import concurrent.futures
+import json
+import math
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import requests
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def start_local_server(port):
+    """임시 작업 디렉토리에서 백엔드 서버 실행 (업로드 디렉토리 초기화 영향 격리)"""
+    import uvicorn
+
+    work_dir = tempfile.mkdtemp(prefix="eodi_bench_")
+    os.chdir(work_dir)
+    sys.path.insert(0, BACKEND_DIR)
+    import main
+
+    server = uvicorn.Server(uvicorn.Config(main.app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, work_dir
+
+
+def create_test_file(size_mb):
+    """랜덤 데이터 테스트 파일 생성"""
+    path = os.path.join(tempfile.gettempdir(), f"eodi_bench_{size_mb}mb.mp4")
+    if os.path.exists(path) and os.path.getsize(path) == size_mb * 1024 * 1024:
+        return path
+    block = os.urandom(1024 * 1024)
+    with open(path, "wb") as f:
+        for _ in range(size_mb):
+            f.write(block)
+    return path
+
+
+def upload_file(base_url, path, chunk_size, streams):
+    """청크 업로드 1회 수행 후 소요 시간 반환"""
+    file_size = os.path.getsize(path)
+    total_chunks = math.ceil(file_size / chunk_size)
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_maxsize=streams)
+    session.mount("http://", adapter)
+
+    start = time.perf_counter()
+    init = session.post(f"{base_url}/upload/init", json={
+        "filename": os.path.basename(path),
+        "fileSize": file_size,
+        "totalChunks": total_chunks,
+        "chunkSize": chunk_size
+    })
+    init.raise_for_status()
+    upload_id = init.json()["uploadId"]
+
+    def send_chunk(chunk_index):
+        with open(path, "rb") as f:
+            f.seek(chunk_index * chunk_size)
+            data = f.read(chunk_size)
+        response = session.post(
+            f"{base_url}/upload/chunk",
+            data={"uploadId": upload_id, "chunkIndex": chunk_index, "totalChunks": total_chunks},
+            files={"chunk": ("chunk", data)}
+        )
+        response.raise_for_status()
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=streams) as executor:
+        list(executor.map(send_chunk, range(total_chunks)))
+
+    complete = session.post(f"{base_url}/upload/complete", json={"uploadId": upload_id})
+    complete.raise_for_status()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="청크 업로드 처리량 벤치마크")
+    parser.add_argument("--url", help="대상 서버 URL (미지정 시 임시 로컬 서버 실행)")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--size-mb", type=int, default=2048)
+    parser.add_argument("--chunk-mb", type=int, default=4)
+    parser.add_argument("--streams", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    test_file = create_test_file(args.size_mb)
+    base_url = args.url
+    if not base_url:
+        start_local_server(args.port)
+        base_url = f"http://127.0.0.1:{args.port}"
+
+    results = []
+    for streams in args.streams:
+        timings = [
+            upload_file(base_url, test_file, args.chunk_mb * 1024 * 1024, streams)
+            for _ in range(args.repeat)
+        ]
+        best = min(timings)
+        result = {
+            "streams": streams,
+            "size_mb": args.size_mb,
+            "chunk_mb": args.chunk_mb,
+            "best_seconds": round(best, 3),
+            "throughput_mb_s": round(args.size_mb / best, 1)
+        }
+        results.append(result)
+        print(f"streams={streams:2d}  {result['best_seconds']:8.2f}s  {result['throughput_mb_s']:8.1f} MB/s")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"benchmark": "chunk_upload", "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
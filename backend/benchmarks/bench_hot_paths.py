@@ -0,0 +1,322 @@
+"""
+핫 패스 벤치마크: 프레임 추출(OptimizedFrameExtractor), 장면 전환 감지(detect_scene_changes),
+배치 장면 구성(build_batch_scene), 응답 파싱(parse_analysis_response)의 처리 속도와 최대 RSS,
+정답 컷이 있는 합성 영상에 대한 컷 감지 정확도를 측정해 JSON 기준선으로 저장/비교
+
+합성 영상은 구간마다 배경색과 도형 배치를 바꿔 그려 구간 경계가 정답 컷이 되며, 시드가 같으면 항상 같은 영상이 생성됩니다.
+
+사용법:
+    python benchmarks/bench_hot_paths.py --output baseline.json
+    python benchmarks/bench_hot_paths.py --cases short --compare baseline.json --fail-on-regression
+    python benchmarks/bench_hot_paths.py --list
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import main as backend  # noqa: E402
+from mock_ollama import canned_analysis  # noqa: E402
+
+# 벤치마크 케이스 (길이(초), 해상도, 분당 평균 컷 수)
+CASES = {
+    "short": {"duration": 60, "size": (640, 360), "cuts_per_minute": 12},
+    "dense": {"duration": 120, "size": (640, 360), "cuts_per_minute": 30},
+    "hd": {"duration": 120, "size": (1280, 720), "cuts_per_minute": 6},
+    "long": {"duration": 600, "size": (640, 360), "cuts_per_minute": 4}
+}
+VIDEO_FPS = 25
+# 컷 일치 허용 오차(초, 추출 간격과 같음)
+CUT_TOLERANCE = 1.0
+# 최소 구간 길이(초, 추출 간격보다 길어야 구간이 프레임에 나타남)
+MIN_SEGMENT_SECONDS = 1.5
+# 비교 시 회귀로 판단하는 감소 비율 (처리 속도), 절대 감소량 (F1)
+SPEED_REGRESSION = 0.15
+ACCURACY_REGRESSION = 0.05
+
+
+def ground_truth_cuts(duration, cuts_per_minute, rng):
+    """정답 컷 시각 생성 (평균 간격 60/cuts_per_minute, 최소 구간 길이 보장)"""
+    mean_gap = 60.0 / cuts_per_minute
+    cuts = []
+    t = 0.0
+    while True:
+        t += max(MIN_SEGMENT_SECONDS, rng.exponential(mean_gap))
+        if t >= duration - MIN_SEGMENT_SECONDS:
+            return cuts
+        cuts.append(round(t, 2))
+
+
+def segment_image(size, rng):
+    """구간별 기본 이미지 (배경 그라데이션 + 무작위 도형, 구간마다 색상/구도가 다름)"""
+    width, height = size
+    base, accent = rng.integers(0, 256, 3), rng.integers(0, 256, 3)
+    ramp = np.linspace(0, 1, width, dtype=np.float32)[None, :, None]
+    image = (base * (1 - ramp) + accent * ramp).astype(np.uint8).repeat(height, axis=0)
+    image = np.ascontiguousarray(image)
+    for _ in range(int(rng.integers(4, 10))):
+        color = tuple(int(c) for c in rng.integers(0, 256, 3))
+        x, y = int(rng.integers(0, width)), int(rng.integers(0, height))
+        r = int(rng.integers(height // 20, height // 4))
+        if rng.random() < 0.5:
+            cv2.circle(image, (x, y), r, color, -1)
+        else:
+            cv2.rectangle(image, (x - r, y - r), (x + r, y + r // 2), color, -1)
+    return image
+
+
+def generate_video(name, case, work_dir, seed=0):
+    """합성 영상 생성 (이미 있으면 재사용) 후 (경로, 정답 컷) 반환"""
+    rng = np.random.default_rng(seed)
+    cuts = ground_truth_cuts(case["duration"], case["cuts_per_minute"], rng)
+    path = os.path.join(work_dir, f"bench_{name}_{seed}.mp4")
+    if os.path.exists(path):
+        return path, cuts
+
+    width, height = case["size"]
+    process = subprocess.Popen([
+        "ffmpeg", "-hide_banner", "-loglevel", "error", "-y",
+        "-f", "rawvideo", "-pix_fmt", "bgr24", "-s", f"{width}x{height}", "-r", str(VIDEO_FPS), "-i", "-",
+        "-c:v", "libx264", "-preset", "ultrafast", "-pix_fmt", "yuv420p", path
+    ], stdin=subprocess.PIPE)
+    boundaries = [0.0, *cuts, float(case["duration"])]
+    for start, end in zip(boundaries, boundaries[1:]):
+        image = segment_image(case["size"], rng)
+        # 구간 내 느린 이동으로 움직임 재현 (구조는 유지되어 컷으로 감지되지 않아야 함)
+        for frame_index in range(round(start * VIDEO_FPS), round(end * VIDEO_FPS)):
+            process.stdin.write(np.roll(image, frame_index % width // 4, axis=1).tobytes())
+    process.stdin.close()
+    if process.wait() != 0:
+        raise RuntimeError(f"합성 영상 생성 실패: {name}")
+    return path, cuts
+
+
+def measure(func):
+    """함수 실행 시간(초)과 실행 중 최대 RSS(MB) 측정"""
+    monitor = backend.PeakRSSMonitor().start()
+    started = time.perf_counter()
+    try:
+        result = func()
+    finally:
+        elapsed = time.perf_counter() - started
+        memory = monitor.stop()
+    return result, elapsed, memory["peak_rss_mb"]
+
+
+def cut_accuracy(detected, truth, tolerance=CUT_TOLERANCE):
+    """감지 컷과 정답 컷의 일대일 매칭 정확도 (정밀도, 재현율, F1, 평균 오차)"""
+    unmatched = list(truth)
+    offsets = []
+    for t in detected:
+        best = min(unmatched, key=lambda c: abs(c - t), default=None)
+        if best is not None and abs(best - t) <= tolerance:
+            offsets.append(abs(best - t))
+            unmatched.remove(best)
+    matched = len(offsets)
+    precision = matched / len(detected) if detected else 1.0
+    recall = matched / len(truth) if truth else 1.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return {
+        "truth_cuts": len(truth),
+        "detected_cuts": len(detected),
+        "precision": round(precision, 3),
+        "recall": round(recall, 3),
+        "f1": round(f1, 3),
+        "mean_offset": round(float(np.mean(offsets)), 3) if offsets else None
+    }
+
+
+def parse_samples(count, seed=0):
+    """파싱 벤치마크용 응답 샘플 (정상 JSON, 코드 블록, 앞뒤 설명문, 깨진 JSON 혼합)"""
+    rng = random.Random(seed)
+    samples = []
+    for i in range(count):
+        text = json.dumps(canned_analysis(rng), ensure_ascii=False)
+        kind = i % 4
+        if kind == 1:
+            text = f"```json\n{text}\n```"
+        elif kind == 2:
+            text = f"분석 결과입니다:\n{text}\n이상입니다."
+        elif kind == 3:
+            text = text[: len(text) // 2]
+        samples.append(text)
+    return samples
+
+
+def run_case(name, case, work_dir, args):
+    """케이스 1개 측정"""
+    video_path, truth = generate_video(name, case, work_dir, args.seed)
+    analyzer = backend.SceneAnalyzer()
+    extractor = backend.OptimizedFrameExtractor(target_size=(640, 360))
+
+    # 1. 프레임 추출 + FrameStore 저장 (분석 파이프라인의 균일 간격 경로와 동일)
+    def extract():
+        store = backend.FrameStore()
+        for frame_data in extractor.extract_frames_ffmpeg_hardware(video_path, 1):
+            store.append(frame_data["timestamp"], backend.encode_analysis_frame(frame_data["frame"]))
+        return store
+
+    store, extract_seconds, extract_rss = measure(extract)
+    try:
+        frame_count = len(store)
+
+        # 2. 장면 전환 감지
+        changes, detect_seconds, detect_rss = measure(lambda: analyzer.detect_scene_changes(store))
+        detected = [store.timestamps[i] for i in changes[1:]]
+
+        # 3. 배치 장면 구성 (고정 배치 크기로 전체 프레임 순회)
+        def build_batches():
+            scenes = []
+            index = 0
+            while index < frame_count:
+                scene = backend.build_batch_scene(store, index, args.batch_size, 1.0, case["duration"], len(scenes) + 1)
+                scenes.append(scene)
+                index += args.batch_size
+            return scenes
+
+        scenes, batch_seconds, _ = measure(build_batches)
+    finally:
+        store.close()
+
+    return {
+        "duration": case["duration"],
+        "size": list(case["size"]),
+        "cuts_per_minute": case["cuts_per_minute"],
+        "frames": frame_count,
+        "extract": {
+            "seconds": round(extract_seconds, 3),
+            "frames_per_second": round(frame_count / extract_seconds, 1),
+            "realtime_factor": round(case["duration"] / extract_seconds, 1),
+            "peak_rss_mb": extract_rss
+        },
+        "detect": {
+            "seconds": round(detect_seconds, 3),
+            "frames_per_second": round(frame_count / detect_seconds, 1),
+            "peak_rss_mb": detect_rss
+        },
+        "build_batch_scene": {
+            "scenes": len(scenes),
+            "scenes_per_second": round(len(scenes) / batch_seconds, 1) if batch_seconds else None
+        },
+        "accuracy": cut_accuracy(detected, truth)
+    }
+
+
+def run_parse_benchmark(count):
+    """parse_analysis_response 처리 속도 (초당 응답 수)"""
+    analyzer = backend.SceneAnalyzer()
+    samples = parse_samples(count)
+    started = time.perf_counter()
+    failures = 0
+    for i, text in enumerate(samples):
+        result = analyzer.parse_analysis_response(text, i + 1, 0.0, 5.0)
+        failures += bool(result.get("error"))
+    elapsed = time.perf_counter() - started
+    return {"responses": count, "responses_per_second": round(count / elapsed, 1), "fallbacks": failures}
+
+
+def compare(report, baseline):
+    """기준선과 비교해 회귀 목록 반환 (속도 SPEED_REGRESSION 이상 감소, F1 ACCURACY_REGRESSION 이상 감소)"""
+    regressions = []
+
+    def check_speed(label, current, previous):
+        if current and previous and current < previous * (1 - SPEED_REGRESSION):
+            regressions.append(f"{label}: {previous} → {current}")
+
+    for name, result in report["cases"].items():
+        previous = baseline.get("cases", {}).get(name)
+        if not previous:
+            continue
+        check_speed(f"{name}.extract.frames_per_second", result["extract"]["frames_per_second"], previous["extract"]["frames_per_second"])
+        check_speed(f"{name}.detect.frames_per_second", result["detect"]["frames_per_second"], previous["detect"]["frames_per_second"])
+        check_speed(f"{name}.build_batch_scene.scenes_per_second",
+                    result["build_batch_scene"]["scenes_per_second"], previous["build_batch_scene"]["scenes_per_second"])
+        if result["accuracy"]["f1"] < previous["accuracy"]["f1"] - ACCURACY_REGRESSION:
+            regressions.append(f"{name}.accuracy.f1: {previous['accuracy']['f1']} → {result['accuracy']['f1']}")
+    if "parse" in baseline:
+        check_speed("parse.responses_per_second", report["parse"]["responses_per_second"], baseline["parse"]["responses_per_second"])
+    return regressions
+
+
+def git_commit():
+    """현재 커밋 해시 (git 저장소가 아니면 None)"""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="추출/장면 감지 핫 패스 벤치마크")
+    parser.add_argument("--cases", nargs="+", choices=list(CASES), default=["short", "dense", "hd"])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--batch-size", type=int, default=6)
+    parser.add_argument("--parse-count", type=int, default=2000)
+    parser.add_argument("--video-dir", default=os.path.join(tempfile.gettempdir(), "eodi_bench_videos"),
+                        help="합성 영상 캐시 디렉토리")
+    parser.add_argument("--output", help="결과 JSON 저장 경로 (기준선으로 사용)")
+    parser.add_argument("--compare", help="비교할 기준선 JSON 경로")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    parser.add_argument("--list", action="store_true", help="케이스 목록 출력")
+    args = parser.parse_args()
+
+    if args.list:
+        for name, case in CASES.items():
+            print(f"{name:<8} {case['duration']:>5}s  {case['size'][0]}x{case['size'][1]}  {case['cuts_per_minute']} cuts/min")
+        return
+
+    logging.getLogger("main").setLevel(logging.ERROR)
+    os.makedirs(args.video_dir, exist_ok=True)
+    # 백엔드 임시 파일(temp/)이 저장소를 더럽히지 않도록 임시 작업 디렉토리에서 실행
+    os.chdir(tempfile.mkdtemp(prefix="eodi_bench_"))
+
+    report = {
+        "benchmark": "hot_paths",
+        "commit": git_commit(),
+        "created_at": datetime.now().isoformat(),
+        "host": {"platform": platform.platform(), "cpu_count": os.cpu_count(), "decoder": backend.probe_hw_decoders()["name"]},
+        "cases": {}
+    }
+    print(f"{'case':<8}{'frames':>7}{'extract fps':>13}{'detect fps':>12}{'rss MB':>8}{'P':>7}{'R':>7}{'F1':>7}")
+    for name in args.cases:
+        result = run_case(name, CASES[name], args.video_dir, args)
+        report["cases"][name] = result
+        accuracy = result["accuracy"]
+        print(f"{name:<8}{result['frames']:>7}{result['extract']['frames_per_second']:>13}{result['detect']['frames_per_second']:>12}"
+              f"{max(result['extract']['peak_rss_mb'], result['detect']['peak_rss_mb']):>8}"
+              f"{accuracy['precision']:>7}{accuracy['recall']:>7}{accuracy['f1']:>7}")
+    report["parse"] = run_parse_benchmark(args.parse_count)
+    print(f"parse_analysis_response: {report['parse']['responses_per_second']} responses/s ({report['parse']['fallbacks']} fallbacks)")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline)
+        print(f"기준선 비교 ({baseline.get('commit')} → {report['commit']}): " + ("회귀 없음" if not regressions else ""))
+        for line in regressions:
+            print(f"  회귀: {line}")
+        if regressions and args.fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+서버 시작 시간 벤치마크: main 임포트 시간과 프로세스 시작 → /health 첫 응답까지의 시간 측정
+
+사용법:
+    python benchmarks/bench_startup.py --repeat 5 --output startup.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ["cv2", "numpy", "psutil", "requests", "moviepy"]
+
+IMPORT_SCRIPT = f"""
+import sys, time, json
+sys.path.insert(0, {BACKEND_DIR!r})
+start = time.perf_counter()
+import main
+elapsed = time.perf_counter() - start
+print(json.dumps({{"import_seconds": elapsed, "loaded": [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))
+"""
+
+SERVER_SCRIPT = f"""
+import sys
+sys.path.insert(0, {BACKEND_DIR!r})
+import main, uvicorn
+uvicorn.run(main.app, host="127.0.0.1", port=int(sys.argv[1]), log_level="warning")
+"""
+
+
+def measure_import(work_dir):
+    """새 인터프리터에서 main 임포트 시간과 로드된 무거운 모듈 측정"""
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_SCRIPT],
+        cwd=work_dir, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def measure_time_to_health(work_dir, port, timeout=30.0):
+    """프로세스 시작부터 /health 첫 200 응답까지 걸린 시간"""
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-c", SERVER_SCRIPT, str(port)],
+        cwd=work_dir, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=0.5) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - start
+            except OSError:
+                time.sleep(0.01)
+        raise TimeoutError("/health 응답 없음")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="서버 시작 시간 벤치마크")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="eodi_startup_")
+    imports = [measure_import(work_dir) for _ in range(args.repeat)]
+    health = [measure_time_to_health(work_dir, args.port) for _ in range(args.repeat)]
+
+    result = {
+        "benchmark": "startup",
+        "import_seconds_median": round(statistics.median(i["import_seconds"] for i in imports), 3),
+        "heavy_modules_loaded_on_import": imports[0]["loaded"],
+        "time_to_health_seconds_median": round(statistics.median(health), 3),
+        "time_to_health_seconds_max": round(max(health), 3)
+    }
+    print(json.dumps(result, indent=2))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
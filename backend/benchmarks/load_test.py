@@ -0,0 +1,214 @@
+"""
+엔드투엔드 부하 테스트: 동시 작업마다 청크 업로드 → 분석 → 상태 폴링 → 쇼츠 생성을 실제 FastAPI 앱에 대해 수행하고
+단계별 p50/p95/p99 지연과 시간당 처리 작업 수(jobs/hour)를 보고
+
+기본값은 Ollama 모의 서버(benchmarks/mock_ollama.py)를 띄우고 EODI_OLLAMA_URL로 연결한 임시 로컬 서버를 대상으로 합니다.
+
+사용법:
+    python benchmarks/load_test.py --jobs 8 --concurrency 4
+    python benchmarks/load_test.py --jobs 20 --concurrency 8 --time-scale 0.1 --error-rate 0.05 --output load.json
+    python benchmarks/load_test.py --url http://127.0.0.1:8000 --real-ollama   # 실행 중인 서버 대상
+"""
+import argparse
+import concurrent.futures
+import json
+import math
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_chunk_upload import start_local_server  # noqa: E402
+from mock_ollama import start_mock_server  # noqa: E402
+
+# 분석/쇼츠 단계 타임아웃(초)
+JOB_TIMEOUT = 1800
+
+
+def create_test_video(duration, path):
+    """합성 테스트 영상 생성 (testsrc2 영상 + 사인파 오디오)"""
+    subprocess.run([
+        "ffmpeg", "-hide_banner", "-loglevel", "error", "-y",
+        "-f", "lavfi", "-i", f"testsrc2=size=640x360:rate=25:duration={duration}",
+        "-f", "lavfi", "-i", f"sine=frequency=440:duration={duration}",
+        "-c:v", "libx264", "-preset", "veryfast", "-c:a", "aac", "-shortest", path
+    ], check=True)
+    return path
+
+
+def percentile(values, q):
+    """선형 보간 백분위수"""
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    position = (len(ordered) - 1) * q / 100
+    lower, upper = math.floor(position), math.ceil(position)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+class LoadRecorder:
+    """단계별 지연/오류 기록 (스레드 안전)"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def record(self, step, seconds):
+        with self.lock:
+            self.latencies[step].append(seconds)
+
+    def fail(self, step):
+        with self.lock:
+            self.errors[step] += 1
+
+    def timed(self, step, func, *args, **kwargs):
+        """요청 함수 실행 시간 기록 (HTTP 오류면 오류로 집계 후 예외 전달)"""
+        started = time.perf_counter()
+        try:
+            response = func(*args, **kwargs)
+            response.raise_for_status()
+            return response
+        except Exception:
+            self.fail(step)
+            raise
+        finally:
+            self.record(step, time.perf_counter() - started)
+
+    def summary(self):
+        return {
+            step: {
+                "count": len(values),
+                "p50": round(percentile(values, 50), 4),
+                "p95": round(percentile(values, 95), 4),
+                "p99": round(percentile(values, 99), 4),
+                "max": round(max(values), 4)
+            }
+            for step, values in sorted(self.latencies.items())
+        }
+
+
+def run_job(base_url, video_path, args, recorder):
+    """작업 1건: 청크 업로드 → 분석 요청 → 완료까지 폴링 → 쇼츠 생성"""
+    session = requests.Session()
+    job_started = time.perf_counter()
+
+    file_size = os.path.getsize(video_path)
+    chunk_size = args.chunk_kb * 1024
+    total_chunks = math.ceil(file_size / chunk_size)
+    init = recorder.timed("upload_init", session.post, f"{base_url}/upload/init", json={
+        "filename": os.path.basename(video_path),
+        "fileSize": file_size,
+        "totalChunks": total_chunks,
+        "chunkSize": chunk_size
+    })
+    upload_id = init.json()["uploadId"]
+    with open(video_path, "rb") as f:
+        for chunk_index in range(total_chunks):
+            data = f.read(chunk_size)
+            recorder.timed("upload_chunk", session.post, f"{base_url}/upload/chunk",
+                           data={"uploadId": upload_id, "chunkIndex": chunk_index, "totalChunks": total_chunks},
+                           files={"chunk": ("chunk", data)})
+    complete = recorder.timed("upload_complete", session.post, f"{base_url}/upload/complete", json={"uploadId": upload_id})
+    video_id = complete.json()["video_id"]
+    recorder.record("upload_total", time.perf_counter() - job_started)
+
+    analysis_started = time.perf_counter()
+    recorder.timed("analyze_request", session.post, f"{base_url}/analyze/{video_id}", params={"force": "true"})
+    while True:
+        if time.perf_counter() - analysis_started > JOB_TIMEOUT:
+            recorder.fail("analysis")
+            raise TimeoutError(f"비디오 {video_id} 분석 시간 초과")
+        time.sleep(args.poll_interval)
+        status = recorder.timed("poll", session.get, f"{base_url}/videos/{video_id}", params={"view": "summary"}).json()["status"]
+        if status == "completed":
+            break
+        if status == "failed":
+            recorder.fail("analysis")
+            raise RuntimeError(f"비디오 {video_id} 분석 실패")
+    recorder.record("analysis_total", time.perf_counter() - analysis_started)
+
+    recorder.timed("shorts", session.post, f"{base_url}/generate-shorts/{video_id}",
+                   json={"render": args.render}, timeout=JOB_TIMEOUT)
+    recorder.record("job_total", time.perf_counter() - job_started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="엔드투엔드 부하 테스트")
+    parser.add_argument("--url", help="대상 서버 URL (미지정 시 임시 로컬 서버 실행)")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--jobs", type=int, default=8)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--video-seconds", type=int, default=20)
+    parser.add_argument("--chunk-kb", type=int, default=512)
+    parser.add_argument("--poll-interval", type=float, default=0.5)
+    parser.add_argument("--render", action="store_true", help="쇼츠 클립 렌더링까지 포함")
+    parser.add_argument("--real-ollama", action="store_true", help="모의 서버 대신 설정된 Ollama 사용")
+    parser.add_argument("--decode-tps", type=float, default=20.0)
+    parser.add_argument("--time-scale", type=float, default=0.05)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--timeout-rate", type=float, default=0.0)
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    mock_stats = None
+    if not args.real_ollama:
+        mock_server, mock_stats = start_mock_server(
+            port=0, decode_tps=args.decode_tps, time_scale=args.time_scale,
+            error_rate=args.error_rate, timeout_rate=args.timeout_rate
+        )
+        os.environ["EODI_OLLAMA_URL"] = f"http://127.0.0.1:{mock_server.server_address[1]}"
+
+    video_path = create_test_video(args.video_seconds, os.path.join(tempfile.gettempdir(), f"eodi_load_{args.video_seconds}s.mp4"))
+    base_url = args.url
+    if not base_url:
+        start_local_server(args.port)
+        base_url = f"http://127.0.0.1:{args.port}"
+
+    recorder = LoadRecorder()
+    failures = []
+    started = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        futures = [executor.submit(run_job, base_url, video_path, args, recorder) for _ in range(args.jobs)]
+        for future in concurrent.futures.as_completed(futures):
+            try:
+                future.result()
+            except Exception as e:
+                failures.append(str(e))
+    wall = time.perf_counter() - started
+
+    completed = args.jobs - len(failures)
+    report = {
+        "benchmark": "load_test",
+        "jobs": args.jobs,
+        "concurrency": args.concurrency,
+        "completed": completed,
+        "failed": len(failures),
+        "wall_seconds": round(wall, 2),
+        "jobs_per_hour": round(completed / wall * 3600, 1),
+        "latency": recorder.summary(),
+        "errors": dict(recorder.errors),
+        "failures": failures[:10]
+    }
+    if mock_stats:
+        report["mock_ollama"] = {key: value for key, value in mock_stats.items() if key != "lock"}
+
+    print(f"{'step':<16}{'count':>7}{'p50':>10}{'p95':>10}{'p99':>10}")
+    for step, values in report["latency"].items():
+        print(f"{step:<16}{values['count']:>7}{values['p50']:>10.3f}{values['p95']:>10.3f}{values['p99']:>10.3f}")
+    print(f"완료 {completed}/{args.jobs}, {wall:.1f}초, {report['jobs_per_hour']} jobs/hour")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+"""
+Ollama 모의 서버: /api/generate(스트리밍/비스트리밍)를 흉내 내며 옵션(num_gpu, num_thread, num_batch, num_ctx)과
+이미지 수에 따라 달라지는 지연 모델, 오류/타임아웃 주입, 스키마에 맞는 고정 분석 JSON으로 응답
+
+실제 Ollama 없이 튜너/부하 테스트를 돌리기 위한 용도입니다. eval_duration 등 응답의 시간 필드는 모델 기준 시간이고,
+실제 대기 시간은 --time-scale 배율을 곱해 줄일 수 있습니다.
+
+사용법:
+    python benchmarks/mock_ollama.py --port 11434 --decode-tps 20 --optimal-threads 8
+    python benchmarks/mock_ollama.py --time-scale 0.01   # 빠른 오프라인 테스트
+    python benchmarks/mock_ollama.py --gpu-layers 28     # 모델 전체가 GPU에 올라가는 노드 흉내 (기본은 GPU 없음)
+    python benchmarks/mock_ollama.py --error-rate 0.05 --timeout-rate 0.02 --timeout-seconds 90
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 지연 모델 기본값
+DEFAULT_LATENCY_MODEL = {
+    "load_seconds": 0.05,       # 요청당 고정 오버헤드(초)
+    "decode_tps": 20.0,         # 최적 스레드 수에서의 디코딩 토큰/초
+    "prefill_tps": 400.0,       # 배치가 충분할 때의 프롬프트 처리 토큰/초
+    "image_prefill_seconds": 0.1,   # 이미지 1장당 추가 인코딩 시간(초)
+    "optimal_threads": 8,       # 이 스레드 수까지 디코딩 속도가 선형 증가
+    "oversubscribe_penalty": 0.06,  # 최적 스레드 초과 1개당 속도 감소 비율
+    "batch_knee": 512,          # 이 배치 크기까지 프롬프트 처리 속도가 선형 증가
+    "ctx_cost": 0.08,           # 컨텍스트 4096 토큰당 디코딩 속도 감소 비율
+    "image_tokens": 576,        # 이미지 1장당 프롬프트 토큰 수
+    "model_layers": 28,         # 모델 레이어 수 (num_gpu가 이보다 크면 전체 오프로드)
+    "gpu_layers": 0,            # GPU 메모리에 올라가는 레이어 수 (0이면 GPU 없는 노드)
+    "gpu_speedup": 4.0,         # 레이어를 GPU에서 처리할 때의 속도 배율 (디코딩/프롬프트 처리 공통)
+    "gpu_spill_penalty": 0.005, # GPU에 올라가지 못한 요청 레이어 1개당 속도 감소 비율
+    "time_scale": 1.0,          # 실제 대기 시간 배율 (0이면 대기 없음)
+    "error_rate": 0.0,          # HTTP 500을 돌려줄 요청 비율
+    "timeout_rate": 0.0,        # 응답 없이 timeout_seconds 동안 멈출 요청 비율
+    "timeout_seconds": 90.0,    # 타임아웃 주입 시 대기 시간(초, time_scale 미적용)
+    "seed": 0                   # 오류 주입/응답 내용 난수 시드
+}
+
+# 분석 응답에 사용할 분위기 목록 (분석 프롬프트의 허용 값)
+MOODS = ["happy", "sad", "excited", "calm", "tense", "peaceful", "dramatic", "mysterious"]
+
+
+def canned_analysis(rng):
+    """분석 프롬프트 스키마에 맞는 고정 형태의 분석 JSON (분위기/점수만 난수)"""
+    mood = rng.choice(MOODS)
+    return {
+        "scene_description": f"모의 장면: 인물이 화면 중앙에서 움직이며 배경이 천천히 바뀌는 {mood} 분위기의 장면입니다. " * 2,
+        "visual_elements": {
+            "objects": ["인물", "배경"],
+            "colors": ["파랑", "주황"],
+            "lighting": "자연광",
+            "composition": "중앙 배치"
+        },
+        "mood": mood,
+        "emotion_intensity": round(rng.uniform(0.2, 0.9), 2),
+        "situation": "모의 상황 설명",
+        "key_events": ["인물 등장", "배경 전환"],
+        "character_analysis": {
+            "people_count": "1",
+            "expressions": ["미소"],
+            "actions": ["걷기"],
+            "interactions": []
+        },
+        "technical_analysis": {
+            "camera_movement": "고정",
+            "shot_type": "미디엄샷",
+            "focus_area": "중앙 인물"
+        },
+        "highlight_score": round(rng.uniform(0.1, 0.95), 2),
+        "mood_progression": "안정적",
+        "narrative_importance": "보통"
+    }
+
+
+def simulate_generation(model, payload):
+    """요청 옵션으로 모의 생성 통계(토큰 수, 나노초 단위 소요 시간) 계산"""
+    options = payload.get("options") or {}
+    threads = max(1, int(options.get("num_thread", model["optimal_threads"])))
+    batch = max(1, int(options.get("num_batch", model["batch_knee"])))
+    ctx = max(1, int(options.get("num_ctx", 4096)))
+    requested_layers = min(max(0, int(options.get("num_gpu", 0))), model["model_layers"])
+    predict = max(1, int(options.get("num_predict", 128)))
+    image_count = len(payload.get("images") or [])
+
+    prompt_tokens = len(payload.get("prompt", "")) // 4 + image_count * model["image_tokens"]
+    prompt_tokens = min(prompt_tokens, ctx)
+
+    thread_factor = min(threads, model["optimal_threads"]) / model["optimal_threads"]
+    thread_factor *= max(0.1, 1 - model["oversubscribe_penalty"] * max(0, threads - model["optimal_threads"]))
+    # 오프로드된 레이어 비율만큼 GPU 속도로 처리, GPU에 못 올린 요청 레이어는 감점 (GPU 없으면 오프로드 0)
+    offloaded = min(requested_layers, model["gpu_layers"]) / model["model_layers"]
+    gpu_factor = 1 / ((1 - offloaded) + offloaded / model["gpu_speedup"])
+    gpu_factor *= max(0.1, 1 - model["gpu_spill_penalty"] * max(0, requested_layers - model["gpu_layers"]))
+    decode_tps = model["decode_tps"] * thread_factor * gpu_factor / (1 + model["ctx_cost"] * ctx / 4096)
+    prefill_tps = model["prefill_tps"] * gpu_factor * min(batch, model["batch_knee"]) / model["batch_knee"]
+
+    prompt_seconds = prompt_tokens / prefill_tps + image_count * model["image_prefill_seconds"]
+    eval_seconds = predict / decode_tps
+    total_seconds = model["load_seconds"] + prompt_seconds + eval_seconds
+    return {
+        "prompt_eval_count": prompt_tokens,
+        "prompt_eval_duration": int(prompt_seconds * 1e9),
+        "eval_count": predict,
+        "eval_duration": int(eval_seconds * 1e9),
+        "load_duration": int(model["load_seconds"] * 1e9),
+        "total_duration": int(total_seconds * 1e9)
+    }
+
+
+def make_handler(model, stats):
+    """지연 모델을 사용하는 요청 핸들러 클래스 생성"""
+    rng = random.Random(model["seed"])
+    rng_lock = threading.Lock()
+
+    class MockOllamaHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def send_json(self, status, body):
+            data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def send_chunk(self, body):
+            data = json.dumps(body, ensure_ascii=False).encode("utf-8") + b"\n"
+            self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+            self.wfile.flush()
+
+        def do_GET(self):
+            if self.path == "/api/tags":
+                self.send_json(200, {"models": [{"name": "qwen2.5vl:7b"}]})
+            else:
+                self.send_json(404, {"error": "not found"})
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            if self.path != "/api/generate":
+                self.send_json(404, {"error": "not found"})
+                return
+            try:
+                payload = json.loads(body)
+            except ValueError:
+                self.send_json(400, {"error": "invalid json"})
+                return
+
+            with rng_lock:
+                roll = rng.random()
+                analysis = canned_analysis(rng)
+            with stats["lock"]:
+                stats["requests"] += 1
+
+            # 오류/타임아웃 주입
+            if roll < model["timeout_rate"]:
+                with stats["lock"]:
+                    stats["timeouts"] += 1
+                time.sleep(model["timeout_seconds"])
+                self.close_connection = True
+                return
+            if roll < model["timeout_rate"] + model["error_rate"]:
+                with stats["lock"]:
+                    stats["errors"] += 1
+                self.send_json(500, {"error": "injected failure"})
+                return
+
+            timing = simulate_generation(model, payload)
+            text = json.dumps(analysis, ensure_ascii=False)
+            model_name = payload.get("model", "qwen2.5vl:7b")
+            prefill_wait = (timing["load_duration"] + timing["prompt_eval_duration"]) / 1e9 * model["time_scale"]
+            decode_wait = timing["eval_duration"] / 1e9 * model["time_scale"]
+
+            # Ollama와 같이 stream 미지정 시 스트리밍 (NDJSON 청크)
+            if payload.get("stream", True):
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                time.sleep(prefill_wait)
+                pieces = max(1, min(timing["eval_count"], len(text)))
+                step = -(-len(text) // pieces)
+                for start in range(0, len(text), step):
+                    time.sleep(decode_wait / pieces)
+                    self.send_chunk({"model": model_name, "response": text[start:start + step], "done": False})
+                self.send_chunk({"model": model_name, "response": "", "done": True, "done_reason": "stop", **timing})
+                self.wfile.write(b"0\r\n\r\n")
+                return
+
+            time.sleep(prefill_wait + decode_wait)
+            self.send_json(200, {
+                "model": model_name,
+                "response": text,
+                "done": True,
+                "done_reason": "stop",
+                **timing
+            })
+
+    return MockOllamaHandler
+
+
+def start_mock_server(port=11434, host="127.0.0.1", **overrides):
+    """백그라운드 스레드에서 모의 서버 실행 후 (서버, 요청 통계) 반환"""
+    model = {**DEFAULT_LATENCY_MODEL, **overrides}
+    stats = {"requests": 0, "errors": 0, "timeouts": 0, "lock": threading.Lock()}
+    server = ThreadingHTTPServer((host, port), make_handler(model, stats))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ollama 모의 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11434)
+    for key, value in DEFAULT_LATENCY_MODEL.items():
+        parser.add_argument(f"--{key.replace('_', '-')}", type=type(value), default=value)
+    args = parser.parse_args()
+
+    overrides = {key: getattr(args, key) for key in DEFAULT_LATENCY_MODEL}
+    server, _ = start_mock_server(args.port, args.host, **overrides)
+    print(f"Ollama 모의 서버 실행 중: http://{args.host}:{args.port} ({overrides})")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
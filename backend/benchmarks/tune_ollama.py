@@ -0,0 +1,184 @@
+"""
+Ollama 옵션 튜너: 실제 분석 프롬프트와 호출당 최대 이미지 수만큼의 고정 샘플 프레임으로
+num_gpu → num_thread → num_batch → num_ctx 순서의 짧은 보정 스윕을 돌려 토큰/초가 가장 높은 조합을
+호스트별 프로필(backend/ollama_profiles.json)로 저장
+
+num_ctx 후보는 실제 분석 호출(분석 프롬프트 + 호출당 최대 이미지 수 + num_predict)이 잘리지 않는 하한 이상만 시험합니다.
+
+저장된 프로필은 SceneAnalyzer가 시작 시 읽어 기본 옵션(M4 Max 기준)을 덮어씁니다.
+
+사용법:
+    python benchmarks/tune_ollama.py                         # 설정된 엔드포인트 대상 스윕 후 프로필 저장
+    python benchmarks/tune_ollama.py --num-gpu 0 --repeats 3 # CPU 전용 노드 (num_gpu 고정, 스윕 제외)
+    python benchmarks/tune_ollama.py --mock --dry-run        # 모의 서버로 오프라인 확인 (저장 안 함)
+    python benchmarks/tune_ollama.py --mock --mock-gpu-layers 28 --dry-run   # GPU 노드를 흉내 낸 모의 서버
+"""
+import argparse
+import base64
+import json
+import math
+import os
+import statistics
+import sys
+import time
+from datetime import datetime
+
+import cv2
+import numpy as np
+import requests
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import main as backend  # noqa: E402
+
+# 보정 호출 프롬프트 (실제 분석 호출과 같은 프롬프트로 컨텍스트를 채움)
+CALIBRATION_PROMPT = backend.build_scene_prompt(1, 0.0, 10.0)
+# 이미지 토큰 추정용 패치 크기 (qwen2.5vl: 14px 패치를 2x2로 병합해 28px당 토큰 1개)
+IMAGE_PATCH_PIXELS = 28
+# 이미지당 추가 토큰 (비전 시작/끝 토큰)
+IMAGE_EXTRA_TOKENS = 2
+# num_ctx 하한 올림 단위
+CONTEXT_STEP = 1024
+
+
+def sample_frames(count=3, size=(640, 360)):
+    """보정용 고정 샘플 프레임 (결정적 합성 이미지, 분석과 같은 JPEG 품질) base64 목록"""
+    rng = np.random.default_rng(0)
+    width, height = size
+    frames = []
+    for i in range(count):
+        x = np.linspace(0, 255, width, dtype=np.float32)
+        frame = np.dstack([np.tile(x, (height, 1)), np.full((height, width), 80 * i, np.float32),
+                           np.tile(x[::-1], (height, 1))]).astype(np.uint8)
+        for _ in range(6):
+            center = (int(rng.integers(0, width)), int(rng.integers(0, height)))
+            color = tuple(int(c) for c in rng.integers(0, 256, 3))
+            cv2.circle(frame, center, int(rng.integers(10, 80)), color, -1)
+        cv2.putText(frame, f"frame {i}", (20, 60), cv2.FONT_HERSHEY_SIMPLEX, 1.5, (255, 255, 255), 3)
+        _, buffer = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, 70])
+        frames.append(base64.b64encode(buffer.tobytes()).decode("ascii"))
+    return frames
+
+
+def min_context_tokens(size=(640, 360)):
+    """실제 분석 호출 1회에 필요한 컨텍스트 토큰 하한 (분석 프롬프트 + 호출당 최대 이미지 + 분석 num_predict)
+
+    프롬프트는 UTF-8 3바이트당 토큰 1개로 보수적으로 추정 (한글 1자 ≈ 1토큰)
+    """
+    prompt_tokens = math.ceil(len(backend.build_scene_prompt(999, 9999.9, 9999.9).encode("utf-8")) / 3)
+    image_tokens = (round(size[0] / IMAGE_PATCH_PIXELS) * round(size[1] / IMAGE_PATCH_PIXELS)) + IMAGE_EXTRA_TOKENS
+    max_images = backend.BatchSizeManager().max_batch
+    return prompt_tokens + max_images * image_tokens + backend.OLLAMA_DEFAULT_OPTIONS["num_predict"]
+
+
+def run_trial(url, model, options, images, repeats, timeout):
+    """옵션 조합 1개를 repeats회 호출해 토큰/초 중앙값 측정 (프롬프트 처리 포함 전체 시간 기준)"""
+    rates = []
+    for _ in range(repeats):
+        payload = {
+            "model": model,
+            "prompt": CALIBRATION_PROMPT,
+            "images": images,
+            "stream": False,
+            "keep_alive": "10m",
+            "options": options
+        }
+        started = time.perf_counter()
+        response = requests.post(url, json=payload, timeout=timeout)
+        wall = time.perf_counter() - started
+        response.raise_for_status()
+        result = response.json()
+        seconds = result.get("total_duration", 0) / 1e9 or wall
+        if result.get("eval_count"):
+            rates.append(result["eval_count"] / seconds)
+    return statistics.median(rates) if rates else 0.0
+
+
+def sweep(url, model, base_options, grid, images, repeats, timeout):
+    """좌표 하강 스윕: 파라미터마다 후보(현재 값 포함)를 시험해 가장 빠른 값으로 고정한 뒤 다음 파라미터로 (동률이면 현재 값 유지)"""
+    best = dict(base_options)
+    trials = []
+    best_rate = None
+    for key, values in grid:
+        results = []
+        for value in sorted(set(values) | {best[key]}):
+            options = {**best, key: value}
+            rate = run_trial(url, model, options, images, repeats, timeout)
+            trials.append({"options": {k: options[k] for k in backend.OLLAMA_TUNABLE_OPTIONS}, "tokens_per_second": round(rate, 2)})
+            print(f"  {key}={value:<6} {rate:8.2f} tok/s")
+            results.append((rate, value))
+        best_rate, best[key] = max(results, key=lambda result: (result[0], result[1] == best[key]))
+    return best, best_rate, trials
+
+
+def main():
+    cpu_count = os.cpu_count() or 4
+    parser = argparse.ArgumentParser(description="Ollama 옵션 튜너")
+    parser.add_argument("--url", default=backend.OLLAMA_API_URL)
+    parser.add_argument("--model", default="qwen2.5vl:7b")
+    parser.add_argument("--gpus", type=int, nargs="+", default=[0, 18, 36],
+                        help="num_gpu 후보 (GPU에 올릴 레이어 수, 0은 CPU 전용)")
+    parser.add_argument("--threads", type=int, nargs="+",
+                        default=sorted({max(1, cpu_count // 4), max(1, cpu_count // 2), max(1, cpu_count * 3 // 4), cpu_count}))
+    parser.add_argument("--batches", type=int, nargs="+", default=[128, 256, 512, 896])
+    parser.add_argument("--contexts", type=int, nargs="+", default=[4096, 6144, 7168])
+    parser.add_argument("--num-gpu", type=int, default=None, help="고정할 num_gpu (지정 시 스윕 제외, CPU 전용 노드는 0)")
+    parser.add_argument("--predict", type=int, default=64, help="보정 호출당 생성 토큰 수")
+    parser.add_argument("--repeats", type=int, default=2)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--mock", action="store_true", help="모의 서버를 띄워 오프라인으로 실행")
+    parser.add_argument("--mock-gpu-layers", type=int, default=0, help="모의 서버의 GPU에 올라가는 레이어 수 (0이면 GPU 없는 노드)")
+    parser.add_argument("--dry-run", action="store_true", help="프로필을 저장하지 않고 결과만 출력")
+    args = parser.parse_args()
+
+    if args.mock:
+        from mock_ollama import start_mock_server
+        server, _ = start_mock_server(port=0, time_scale=0.0, gpu_layers=args.mock_gpu_layers)
+        args.url = f"http://127.0.0.1:{server.server_address[1]}/api/generate"
+
+    base_options = {**backend.OLLAMA_DEFAULT_OPTIONS, "num_predict": args.predict}
+    if args.num_gpu is not None:
+        base_options["num_gpu"] = args.num_gpu
+    # 하한 미만 num_ctx는 실제 분석에서 프롬프트/이미지가 잘리므로 후보에서 제외
+    context_tokens = min_context_tokens()
+    context_floor = math.ceil(context_tokens / CONTEXT_STEP) * CONTEXT_STEP
+    contexts = [value for value in args.contexts if value >= context_floor] or [context_floor]
+    base_options["num_ctx"] = max(base_options["num_ctx"], context_floor)
+    # 배치 제어기가 늘릴 수 있는 최대 이미지 수로 보정 (num_ctx/num_batch가 실제 최대 프롬프트를 처리하도록)
+    images = sample_frames(backend.BatchSizeManager().max_batch)
+
+    print(f"대상: {args.url} ({args.model})")
+    print(f"num_ctx 하한: {context_floor} (추정 {context_tokens} 토큰), 후보: {contexts}")
+    # 모델 로드 시간이 측정에 섞이지 않도록 예열 호출
+    run_trial(args.url, args.model, base_options, images, 1, args.timeout)
+    baseline = run_trial(args.url, args.model, base_options, images, args.repeats, args.timeout)
+    print(f"기본 옵션: {baseline:.2f} tok/s")
+
+    grid = [("num_thread", args.threads), ("num_batch", args.batches), ("num_ctx", contexts)]
+    # GPU 레이어 수가 최적 스레드/배치를 바꾸므로 먼저 고정 (--num-gpu 지정 시 그대로 사용)
+    if args.num_gpu is None:
+        grid.insert(0, ("num_gpu", args.gpus))
+    best, best_rate, trials = sweep(args.url, args.model, base_options, grid, images, args.repeats, args.timeout)
+
+    profile = {
+        "options": {key: best[key] for key in backend.OLLAMA_TUNABLE_OPTIONS},
+        "tokens_per_second": round(best_rate, 2),
+        "baseline_tokens_per_second": round(baseline, 2),
+        "min_num_ctx": context_floor,
+        "endpoint": args.url,
+        "model": args.model,
+        "tuned_at": datetime.now().isoformat(),
+        "trials": trials
+    }
+    print(json.dumps({k: v for k, v in profile.items() if k != "trials"}, ensure_ascii=False, indent=2))
+
+    if args.dry_run:
+        return
+    backend.save_ollama_profile(profile)
+    print(f"프로필 저장: {backend.OLLAMA_PROFILE_PATH} ({backend.ollama_profile_host()})")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,31 +1,51 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException, Form, BackgroundTasks
+from fastapi import FastAPI, UploadFile, File, HTTPException, Form, BackgroundTasks, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
-import moviepy as mp
-import cv2
-import uvicorn
 import os
 import uuid
 import shutil
 import base64
-import numpy as np
-import psutil
-import requests
 import asyncio
 import aiofiles
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import Dict, Any, Optional
 import json
+import hashlib
 import logging
-from collections import OrderedDict
+from collections import OrderedDict, deque
 import gc
 import math
+import heapq
+import bisect
 import subprocess
-import concurrent.futures
-from threading import Thread
+import threading
+import mmap
 import queue
+import re
+import concurrent.futures
+import importlib
 import time
+import sys
+from contextlib import asynccontextmanager, contextmanager
+from python_multipart.multipart import MultipartParser, parse_options_header
+
+class LazyModule:
+    """첫 속성 접근 시 모듈을 임포트하는 지연 로딩 프록시 (서버 시작 시간 단축)"""
+    def __init__(self, module_name):
+        self._module_name = module_name
+        self._module = None
+
+    def __getattr__(self, name):
+        if self._module is None:
+            self._module = importlib.import_module(self._module_name)
+        return getattr(self._module, name)
+
+# 무거운 모듈은 해당 코드 경로가 처음 실행될 때 로드
+cv2 = LazyModule("cv2")
+np = LazyModule("numpy")
+psutil = LazyModule("psutil")
+requests = LazyModule("requests")
 
 # Ollama 성능 최적화 환경변수 설정 (크로스 플랫폼)
 def setup_ollama_environment():
@@ -58,28 +78,18 @@ def setup_ollama_environment():
         os.environ['OLLAMA_GPU_MEMORY_FRACTION'] = '0.8'  # Linux GPU 메모리 80%
         # logger.info("Linux Ollama 환경변수 설정 완료")
 
-# Ollama 환경변수 설정 실행
-setup_ollama_environment()
-
 # 디렉토리 설정
-UPLOAD_DIR = "uploads"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
-
-# 분석 결과 저장 디렉토리
-ANALYSIS_DIR = "analysis_results"
-os.makedirs(ANALYSIS_DIR, exist_ok=True)
-
-# 쇼츠 저장 디렉토리
-SHORTS_DIR = "shorts"
-os.makedirs(SHORTS_DIR, exist_ok=True)
+UPLOAD_DIR = "uploads"  # 업로드 디렉토리
+ANALYSIS_DIR = "analysis_results"  # 분석 결과 저장 디렉토리
+SHORTS_DIR = "shorts"  # 쇼츠 저장 디렉토리
+TEMP_DIR = "temp"  # 청크 업로드 임시 디렉토리
+THUMBNAILS_DIR = "thumbnails"  # 썸네일 저장 디렉토리
+RESULTS_DIR = "temp"  # 결과 저장 디렉토리
 
-# 청크 업로드 임시 디렉토리
-TEMP_DIR = "temp"
-os.makedirs(TEMP_DIR, exist_ok=True)
-
-# 디렉토리 설정
-UPLOAD_DIR = "uploads"
-THUMBNAILS_DIR = "thumbnails"
+def ensure_directories():
+    """작업 디렉토리 생성"""
+    for directory in (UPLOAD_DIR, ANALYSIS_DIR, SHORTS_DIR, TEMP_DIR, THUMBNAILS_DIR, RESULTS_DIR):
+        os.makedirs(directory, exist_ok=True)
 
 def clear_directories():
     """업로드 및 썸네일 디렉토리 초기화"""
@@ -108,22 +118,56 @@ def clear_directories():
                 print(f"Error removing thumbnail {file}: {str(e)}")
 
     # 디렉토리 재생성
-    os.makedirs(UPLOAD_DIR, exist_ok=True)
-    os.makedirs(THUMBNAILS_DIR, exist_ok=True)
+    ensure_directories()
     print("Directories cleared and recreated.")
 
-# 서버 시작 시 디렉토리 초기화
-clear_directories()
+# 프로세스 시작 시각 (시작 시간 측정용)
+PROCESS_START_TIME = time.time()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """서버 시작/종료 처리 (Ollama 환경변수 설정, 디렉토리 초기화)"""
+    setup_ollama_environment()
+    load_ollama_profile()
+    ensure_directories()
+    await asyncio.to_thread(clear_directories)
+    # 하드웨어 디코더 프로브는 시작을 막지 않도록 백그라운드에서 진행 (추출 요청은 프로브 완료를 기다림)
+    app.state.decoder_probe = asyncio.create_task(asyncio.to_thread(probe_hw_decoders))
+    logger.info(f"서버 준비 완료: 프로세스 시작 후 {time.time() - PROCESS_START_TIME:.2f}초")
+    yield
+    # 종료 시 진행 중인 프로브를 잠시 기다려 테스트 클립을 정리하고, 넘기면 취소
+    decoder_probe = app.state.decoder_probe
+    done, _ = await asyncio.wait({decoder_probe}, timeout=HWACCEL_PROBE_SHUTDOWN_TIMEOUT)
+    if not done:
+        decoder_probe.cancel()
+        logger.warning("디코더 프로브가 끝나지 않아 종료 시 취소")
+    try:
+        await decoder_probe
+    except asyncio.CancelledError:
+        pass
+    except Exception as e:
+        logger.warning(f"디코더 프로브 오류: {e}")
 
 # FastAPI 앱 생성
 app = FastAPI(
     title="EODI Video Analysis API",
     description="비디오 분석 및 쇼츠 생성을 위한 API",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
-# 정적 파일 마운트 (썸네일 제공용)
-app.mount("/thumbnails", StaticFiles(directory=THUMBNAILS_DIR), name="thumbnails")
+class CachedStaticFiles(StaticFiles):
+    """장기 캐시 헤더를 붙이는 정적 파일 서빙 (썸네일/스프라이트 파일명은 생성 시마다 고유)"""
+    def file_response(self, *args, **kwargs):
+        response = super().file_response(*args, **kwargs)
+        response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        return response
+
+# 정적 파일 마운트 (썸네일, 스프라이트 시트 제공용, 디렉토리는 lifespan에서 생성)
+app.mount("/thumbnails", CachedStaticFiles(directory=THUMBNAILS_DIR, check_dir=False), name="thumbnails")
+
+# 렌더링된 쇼츠 클립 제공 (클립 디렉토리는 생성 시마다 고유)
+app.mount("/clips", CachedStaticFiles(directory=SHORTS_DIR, check_dir=False), name="clips")
 
 # CORS 설정 (Electron 앱과의 통신을 위해)
 app.add_middleware(
@@ -134,47 +178,360 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# 업로드 디렉토리 설정
-UPLOAD_DIR = "uploads"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
+# 비디오 메타데이터 저장 (간단한 인메모리 저장소 - 실제로는 데이터베이스 사용 권장)
+videos_db = []
 
-# 분석 결과 저장 디렉토리
-ANALYSIS_DIR = "analysis_results"
-os.makedirs(ANALYSIS_DIR, exist_ok=True)
+# 비디오 목록 변경 리비전 (ETag 및 증분 조회용, 레코드가 바뀔 때마다 증가)
+videos_revision = 0
 
-# 쇼츠 저장 디렉토리
-SHORTS_DIR = "shorts"
-os.makedirs(SHORTS_DIR, exist_ok=True)
+# 다음에 발급할 비디오 ID (삭제된 ID를 재사용하지 않도록 증가만 함)
+next_video_id = 1
 
-# 청크 업로드 임시 디렉토리
-TEMP_DIR = "temp"
-os.makedirs(TEMP_DIR, exist_ok=True)
+# 목록 조회 시 summary 뷰에서 제외할 무거운 필드
+HEAVY_VIDEO_FIELDS = {"analysis_result"}
 
-# 썸네일 저장 디렉토리
-THUMBNAILS_DIR = "thumbnails"
-os.makedirs(THUMBNAILS_DIR, exist_ok=True)
+# 목록 페이지 크기 제한
+DEFAULT_PAGE_LIMIT = 50
+MAX_PAGE_LIMIT = 200
 
-# 비디오 메타데이터 저장 (간단한 인메모리 저장소 - 실제로는 데이터베이스 사용 권장)
-videos_db = []
+class EventBroker:
+    """작업 상태 이벤트 브로커 (SSE 구독자 팬아웃 + Last-Event-ID 재전송 버퍼)"""
+    def __init__(self, buffer_size=1000, subscriber_queue_size=256):
+        self.buffer = deque(maxlen=buffer_size)
+        self.subscribers = set()
+        self.subscriber_queue_size = subscriber_queue_size
+        self.last_event_id = 0
+        self.loop = None
+
+    def publish(self, event_type, data):
+        """이벤트 발행 (워커 스레드에서 호출해도 이벤트 루프로 전달)"""
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+
+        if running_loop is not None:
+            self.loop = running_loop
+            self._publish(event_type, data)
+        elif self.loop is not None and self.loop.is_running():
+            self.loop.call_soon_threadsafe(self._publish, event_type, data)
+        else:
+            self._publish(event_type, data)
+
+    def _publish(self, event_type, data):
+        self.last_event_id += 1
+        event = {"id": self.last_event_id, "event": event_type, "data": data}
+        self.buffer.append(event)
+
+        for subscriber in list(self.subscribers):
+            try:
+                subscriber.put_nowait(event)
+            except asyncio.QueueFull:
+                # 느린 구독자는 연결 종료 (재접속 시 Last-Event-ID로 재전송)
+                self.subscribers.discard(subscriber)
+                subscriber.get_nowait()
+                subscriber.put_nowait(None)
+
+    def subscribe(self, last_event_id=0):
+        """구독 등록 후 (큐, 재전송 이벤트 목록, 버퍼 유실 여부) 반환"""
+        self.loop = asyncio.get_running_loop()
+        subscriber = asyncio.Queue(maxsize=self.subscriber_queue_size)
+        self.subscribers.add(subscriber)
+
+        replay = [event for event in self.buffer if event["id"] > last_event_id]
+        oldest_id = self.buffer[0]["id"] if self.buffer else self.last_event_id + 1
+        missed = 0 < last_event_id < oldest_id - 1
+        return subscriber, replay, missed
+
+    def unsubscribe(self, subscriber):
+        """구독 해제"""
+        self.subscribers.discard(subscriber)
+
+# 작업 상태 이벤트 브로커
+event_broker = EventBroker()
+
+def _bump_revision(video):
+    global videos_revision
+    videos_revision += 1
+    video["revision"] = videos_revision
+
+def update_video(video, **fields):
+    """비디오 레코드 갱신, 리비전 증가 및 변경 이벤트 발행"""
+    video.update(fields)
+    _bump_revision(video)
+    event_broker.publish("video.updated", {
+        "video_id": video["id"],
+        "revision": video["revision"],
+        "changes": {key: value for key, value in fields.items() if key not in HEAVY_VIDEO_FIELDS}
+    })
+    return video
+
+def allocate_video_id():
+    """새 비디오 ID 발급 (커서 페이지네이션과 결과 캐시 키가 삭제 후에도 유효하도록 단조 증가)"""
+    global next_video_id
+    video_id = next_video_id
+    next_video_id += 1
+    return video_id
+
+def find_video(video_id):
+    """ID로 비디오 레코드 조회 (없으면 None)"""
+    return next((v for v in videos_db if v["id"] == video_id), None)
+
+def get_video_or_404(video_id):
+    """ID로 비디오 레코드 조회 (없으면 404)"""
+    video = find_video(video_id)
+    if video is None:
+        raise HTTPException(status_code=404, detail="비디오를 찾을 수 없습니다")
+    return video
+
+def register_video(video_info):
+    """새 비디오 레코드 등록"""
+    videos_db.append(video_info)
+    _bump_revision(video_info)
+    event_broker.publish("video.created", {
+        "video_id": video_info["id"],
+        "revision": video_info["revision"],
+        "video": project_video(video_info)
+    })
+    return video_info
+
+def unregister_video(video):
+    """비디오 레코드 제거 및 리비전 증가 (캐시된 분석 결과도 제거)"""
+    global videos_revision
+    videos_db.remove(video)
+    invalidate_result_cache(video["id"])
+    videos_revision += 1
+    event_broker.publish("video.deleted", {"video_id": video["id"], "revision": videos_revision})
+
+def project_video(video, view="summary", fields=None):
+    """비디오 레코드 필드 투영 (summary: 분석 결과 제외, full: 전체)"""
+    if fields:
+        return {key: video.get(key) for key in fields if key in video}
+    if view == "full":
+        return video
+    return {key: value for key, value in video.items() if key not in HEAVY_VIDEO_FIELDS}
+
+def paginate_videos(videos, cursor=0, limit=DEFAULT_PAGE_LIMIT, since=0):
+    """ID 커서 기반 페이지네이션 (since: 해당 리비전 이후 변경된 레코드만)"""
+    limit = max(1, min(limit, MAX_PAGE_LIMIT))
+    page = []
+    has_more = False
+    for video in videos:
+        if video["id"] <= cursor or video.get("revision", 0) <= since:
+            continue
+        if len(page) == limit:
+            has_more = True
+            break
+        page.append(video)
+    next_cursor = page[-1]["id"] if has_more else None
+    return page, next_cursor
+
+def make_etag(*parts):
+    """요청 파라미터와 리비전으로 약한 ETag 생성"""
+    digest = hashlib.md5(":".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+    return f'W/"{digest}"'
+
+def etag_matches(request: Request, etag):
+    """If-None-Match 헤더와 ETag 비교"""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+def cached_json_response(request: Request, etag, build_content):
+    """ETag 일치 시 304, 아니면 본문 생성 후 JSON 응답"""
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(content=build_content(), headers=headers)
+
+def parse_fields_param(fields):
+    """쉼표 구분 필드 목록 파싱"""
+    if not fields:
+        return None
+    return [field.strip() for field in fields.split(",") if field.strip()]
+
+# 추출 진행 이벤트 발행 간격 (프레임 수)
+PROGRESS_EVENT_FRAMES = 10
+
+# SSE 연결 유지용 코멘트 전송 간격 (초)
+SSE_KEEPALIVE_SECONDS = 15
+
+# 업로드 스트리밍 시 한 번에 읽는 블록 크기 (바이트)
+UPLOAD_READ_BLOCK_SIZE = 1024 * 1024
+
+# 업로드 파일 크기 제한 (2GB)
+MAX_UPLOAD_SIZE = 2 * 1024 * 1024 * 1024
+
+# multipart 경계/헤더 등 본문 오버헤드 허용치 (바이트)
+MULTIPART_OVERHEAD_ALLOWANCE = 64 * 1024
+
+# 배치 크기 제어 목표 (이미지당 Ollama 처리 시간(초), 호출 지연 한도(초), 부하 시 배치 감소 배율)
+BATCH_TARGET_SECONDS_PER_FRAME = 2.5
+BATCH_LATENCY_LIMIT = 45.0
+BATCH_BACKOFF_FACTOR = 1.5
+
+# 적응형 샘플링 설정 (적용 최소 영상 길이(초), 대략 탐색 최소 간격(초, 키프레임만 디코딩), 변화 판정 히스토그램 상관/움직임 기준)
+ADAPTIVE_SAMPLING_MIN_DURATION = 300
+COARSE_SAMPLING_INTERVAL = 4.0
+ADAPTIVE_HIST_THRESHOLD = 0.9
+ADAPTIVE_MOTION_THRESHOLD = 0.02
+
+# 프레임 샘플링 모드 (auto: 길이에 따라 균일/적응형, dense: 균일 간격, scene: FFmpeg 장면 필터)
+SAMPLING_MODES = ("auto", "dense", "scene")
+# FFmpeg 장면 필터 설정 (장면 점수 기준, 변화가 없어도 프레임을 유지하는 최대 간격(초))
+SCENE_FILTER_THRESHOLD = 0.3
+SCENE_KEEPALIVE_SECONDS = 5.0
+
+# 하드웨어 디코더 프로브 설정 (테스트 클립 길이(초), 해상도, 프레임레이트)
+HWACCEL_PROBE_SECONDS = 2
+HWACCEL_PROBE_SIZE = "1280x720"
+HWACCEL_PROBE_FPS = 30
+# 서버 종료 시 진행 중인 디코더 프로브를 기다리는 최대 시간 (초, 초과 시 취소)
+HWACCEL_PROBE_SHUTDOWN_TIMEOUT = 5
+
+# 선택된 디코더 상태 (시작 시 1회 프로브 후 캐시, 작업 중 실패 시 전환)
+hwaccel_state = {"name": None, "args": [], "fps": None, "candidates": {}, "failures": [], "probed": False}
+hwaccel_lock = threading.Lock()
+
+# Ollama 생성 API 엔드포인트 (모의 서버/원격 노드 사용 시 EODI_OLLAMA_URL로 변경)
+OLLAMA_API_URL = os.environ.get("EODI_OLLAMA_URL", "http://127.0.0.1:11434").rstrip("/") + "/api/generate"
+
+# Ollama 생성 옵션 기본값 (M4 Max 기준, 호스트별 튜닝 프로필이 있으면 덮어씀)
+OLLAMA_DEFAULT_OPTIONS = {
+    "temperature": 0.3,
+    "top_p": 0.9,
+    "num_gpu": 36,  # 90% GPU 활용률 목표 (40코어 * 0.9)
+    "num_thread": 10,  # CPU 스레드 적절히 조정
+    "num_ctx": 7168,   # 컨텍스트 크기 90% 활용
+    "num_batch": 896,  # 배치 크기 90% 활용
+    "num_predict": 360, # 예측 토큰 90% 활용
+    "repeat_penalty": 1.1,
+    "top_k": 40,
+    "num_keep": 4,  # 더 많은 토큰 유지
+    "tfs_z": 1.0,  # 추가 샘플링 파라미터
+    "typical_p": 1.0  # 추가 처리 부하
+}
+# 튜닝 프로필이 덮어쓸 수 있는 성능 옵션
+OLLAMA_TUNABLE_OPTIONS = ("num_gpu", "num_thread", "num_ctx", "num_batch")
+# 호스트별 Ollama 튜닝 프로필 파일 (benchmarks/tune_ollama.py가 기록)
+OLLAMA_PROFILE_PATH = os.environ.get("EODI_OLLAMA_PROFILE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "ollama_profiles.json"))
+
+# 분석 프레임 저장소 메모리 예산 (초과분은 임시 파일로 넘기고 mmap으로 읽음)
+FRAME_STORE_MEMORY_BUDGET = 64 * 1024 * 1024
+
+# 분석 중 최대 RSS 측정 간격 (초)
+RSS_SAMPLE_INTERVAL = 0.2
+
+# 분석별 샘플링 프로파일러 설정 (샘플 간격(초), 스택 최대 깊이)
+PROFILER_SAMPLE_INTERVAL = 0.005
+PROFILER_MAX_DEPTH = 64
+# 대기 중인 스레드로 보고 샘플에서 제외할 최상위 프레임 (파일명, 함수명)
+PROFILER_IDLE_FRAMES = {("threading.py", "wait"), ("selectors.py", "select"), ("queue.py", "get"), ("thread.py", "_worker")}
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# 결과 저장 디렉토리
-RESULTS_DIR = "temp"
-os.makedirs(RESULTS_DIR, exist_ok=True)
+# 단계별 처리 시간 히스토그램 버킷 (초, 프레임 단위 디코딩/인코딩부터 장면 단위 LLM 호출까지)
+METRIC_LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+# Ollama 토큰 속도 히스토그램 버킷 (tok/s)
+METRIC_TPS_BUCKETS = (1, 2, 5, 10, 20, 40, 80, 160)
+
+def _metric_labels(label, value):
+    """Prometheus 라벨 문자열 ({label="value"}, 라벨 없으면 빈 문자열)"""
+    if label is None:
+        return ""
+    escaped = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return f'{label}="{escaped}"'
+
+class MetricHistogram:
+    """Prometheus 히스토그램 (라벨 값별 버킷 카운트, 관측당 잠금 1회로 상시 수집 가능)"""
+    def __init__(self, name, help_text, buckets, label=None):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets)
+        self.label = label
+        self.series = {}  # 라벨 값 -> [버킷별 카운트..., +Inf 카운트], 합계
+        self.lock = threading.Lock()
+
+    def observe(self, value, label_value=None):
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            series = self.series.get(label_value)
+            if series is None:
+                series = self.series[label_value] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self.lock:
+            snapshot = [(key, list(counts), total) for key, (counts, total) in sorted(self.series.items(), key=lambda item: str(item[0]))]
+        for label_value, counts, total in snapshot:
+            labels = _metric_labels(self.label, label_value)
+            prefix = f"{labels}," if labels else ""
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+            suffix = f"{{{labels}}}" if labels else ""
+            lines.append(f"{self.name}_sum{suffix} {total:.6f}")
+            lines.append(f"{self.name}_count{suffix} {cumulative}")
+        return lines
+
+class MetricCounter:
+    """Prometheus 카운터 (라벨 값별 누적)"""
+    def __init__(self, name, help_text, label=None):
+        self.name = name
+        self.help_text = help_text
+        self.label = label
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def inc(self, label_value=None, amount=1):
+        with self.lock:
+            self.values[label_value] = self.values.get(label_value, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self.lock:
+            snapshot = sorted(self.values.items(), key=lambda item: str(item[0]))
+        for label_value, value in snapshot:
+            labels = _metric_labels(self.label, label_value)
+            lines.append(f"{self.name}{{{labels}}} {value}" if labels else f"{self.name} {value}")
+        return lines
+
+# 수집 지표 (/metrics에서 Prometheus 텍스트 형식으로 노출)
+stage_seconds = MetricHistogram("eodi_stage_seconds", "단계별 처리 시간(초): decode/encode 프레임당, scene_detect 분석당, llm 장면당, parse 응답당, result_write 결과당", METRIC_LATENCY_BUCKETS, "stage")
+ollama_tokens_per_second = MetricHistogram("eodi_ollama_tokens_per_second", "Ollama 호출별 생성 토큰 속도", METRIC_TPS_BUCKETS)
+ollama_requests = MetricCounter("eodi_ollama_requests_total", "Ollama 호출 결과별 횟수", "result")
+parse_results = MetricCounter("eodi_parse_results_total", "응답 파싱 결과별 횟수 (사용된 파싱 방법)", "method")
+fallback_analyses = MetricCounter("eodi_fallback_analyses_total", "폴백 분석 생성 횟수 (원인별)", "reason")
+# 응답을 기다리는 Ollama 호출 수
+ollama_in_flight = 0
 
 class BatchSizeManager:
-    """동적 배치 크기 관리"""
-    def __init__(self, min_batch=2, max_batch=8, target_memory_usage=0.8):
+    """피드백 기반 배치 크기(Ollama 호출 1회에 보내는 이미지 수, 배치 모드에서는 장면당 프레임 수) 제어 - AIMD 방식
+    
+    부하 신호(타임아웃/오류, 지연 초과, 토큰 속도 급락, 메모리 압박)가 있으면 배치를 곱셈으로 줄여
+    호출 1회의 부하를 낮추고, 여유가 있으면 1씩 늘려 호출 수를 줄인다.
+    """
+    def __init__(self, min_batch=2, max_batch=12, target_memory_usage=0.8,
+                 target_seconds_per_frame=BATCH_TARGET_SECONDS_PER_FRAME, latency_limit=BATCH_LATENCY_LIMIT):
         self.min_batch = min_batch
         self.max_batch = max_batch
         self.target_memory_usage = target_memory_usage
+        self.target_seconds_per_frame = target_seconds_per_frame
+        self.latency_limit = latency_limit
         self.current_batch_size = 4  # GPU 가속을 고려한 기본값
+        self.initial_batch_size = None
+        self.best_tokens_per_second = 0.0
+        self.decisions = []
         
     def get_optimal_batch_size(self):
-        """시스템 리소스 기반 최적 배치 크기 계산"""
+        """시스템 리소스 기반 초기 배치 크기 계산"""
         try:
             memory = psutil.virtual_memory()
             available_memory_gb = memory.available / (1024**3)
@@ -197,11 +554,189 @@ class BatchSizeManager:
             )
             
             logger.info(f"Available memory: {available_memory_gb:.1f}GB, Batch size: {self.current_batch_size}")
-            return self.current_batch_size
             
         except Exception as e:
             logger.warning(f"메모리 확인 실패, 기본 배치 크기 사용: {e}")
-            return self.current_batch_size
+        
+        if self.initial_batch_size is None:
+            self.initial_batch_size = self.current_batch_size
+        return self.current_batch_size
+    
+    def _pressure_reason(self, frames, stats, rss_bytes, memory_percent):
+        """부하 신호 판정 (없으면 None)"""
+        if stats.get("timed_out"):
+            return "timeout"
+        if stats.get("error"):
+            return "error"
+        latency = stats.get("latency") or 0.0
+        if latency > self.latency_limit:
+            return "latency"
+        if frames and latency / frames > self.target_seconds_per_frame:
+            return "seconds_per_frame"
+        tokens_per_second = stats.get("tokens_per_second")
+        if tokens_per_second and self.best_tokens_per_second and tokens_per_second < self.best_tokens_per_second * 0.5:
+            return "tokens_per_second"
+        if memory_percent > self.target_memory_usage * 100:
+            return "memory"
+        return None
+    
+    def observe(self, scene_id, frames, stats):
+        """장면 하나의 Ollama 호출 결과를 반영해 다음 배치 크기 결정 (frames: 호출에 보낸 이미지 수)"""
+        stats = stats or {}
+        try:
+            rss_bytes = psutil.Process().memory_info().rss
+            memory_percent = psutil.virtual_memory().percent
+        except Exception:
+            rss_bytes, memory_percent = 0, 0.0
+        
+        tokens_per_second = stats.get("tokens_per_second")
+        if tokens_per_second:
+            self.best_tokens_per_second = max(self.best_tokens_per_second, tokens_per_second)
+        
+        previous = self.current_batch_size
+        reason = self._pressure_reason(frames, stats, rss_bytes, memory_percent)
+        if reason:
+            # 곱셈 감소: 호출당 이미지 수를 빠르게 줄여 타임아웃/지연 초과를 피함
+            self.current_batch_size = max(self.min_batch, min(previous - 1, math.floor(previous / BATCH_BACKOFF_FACTOR)))
+        elif (stats.get("latency") or 0.0) / max(frames, 1) < self.target_seconds_per_frame * 0.5:
+            # 덧셈 증가: 여유가 있을 때 호출당 이미지 수를 천천히 늘림
+            self.current_batch_size = min(self.max_batch, previous + 1)
+            reason = "headroom"
+        
+        self.decisions.append({
+            "scene_id": scene_id,
+            "frames": frames,
+            "latency": round(stats["latency"], 3) if stats.get("latency") is not None else None,
+            "tokens_per_second": round(tokens_per_second, 1) if tokens_per_second else None,
+            "timed_out": bool(stats.get("timed_out")),
+            "rss_mb": round(rss_bytes / (1024 ** 2), 1),
+            "batch_size": previous,
+            "next_batch_size": self.current_batch_size,
+            "reason": reason or "steady"
+        })
+        if self.current_batch_size != previous:
+            logger.info(f"배치 크기 조정: {previous} → {self.current_batch_size} ({reason})")
+        return self.current_batch_size
+    
+    def summary(self):
+        """분석 결과에 기록할 배치 제어 요약"""
+        calls = [d for d in self.decisions if d["latency"] is not None]
+        return {
+            "initial_batch_size": self.initial_batch_size,
+            "final_batch_size": self.current_batch_size,
+            "min_batch": self.min_batch,
+            "max_batch": self.max_batch,
+            "target_seconds_per_frame": self.target_seconds_per_frame,
+            "timeouts": sum(1 for d in self.decisions if d["timed_out"]),
+            "average_latency": round(sum(d["latency"] for d in calls) / len(calls), 3) if calls else None,
+            "peak_rss_mb": max((d["rss_mb"] for d in self.decisions), default=None),
+            "decisions": self.decisions
+        }
+
+def hwaccel_candidates():
+    """OS별 하드웨어 디코더 후보 (이름, FFmpeg 인수), 소프트웨어 디코딩은 항상 마지막 후보"""
+    import platform
+    system = platform.system().lower()
+    
+    if system == 'darwin':  # macOS
+        candidates = [("videotoolbox", ['-hwaccel', 'videotoolbox'])]
+    elif system == 'windows':  # Windows (NVIDIA CUDA, D3D11VA, DXVA2)
+        candidates = [("cuda", ['-hwaccel', 'cuda']), ("d3d11va", ['-hwaccel', 'd3d11va']), ("dxva2", ['-hwaccel', 'dxva2'])]
+    elif system == 'linux':  # Linux (NVIDIA CUDA, Intel/AMD VAAPI)
+        candidates = [("cuda", ['-hwaccel', 'cuda']), ("vaapi", ['-hwaccel', 'vaapi'])]
+    else:
+        candidates = []
+    return candidates + [("software", [])]
+
+def _create_probe_clip(path):
+    """디코더 프로브용 짧은 테스트 클립 생성 (libx264 없으면 mpeg4)"""
+    for codec in ('libx264', 'mpeg4'):
+        try:
+            result = subprocess.run([
+                'ffmpeg', '-hide_banner', '-loglevel', 'error', '-y',
+                '-f', 'lavfi', '-i', f'testsrc2=size={HWACCEL_PROBE_SIZE}:rate={HWACCEL_PROBE_FPS}:duration={HWACCEL_PROBE_SECONDS}',
+                '-c:v', codec, '-pix_fmt', 'yuv420p', path
+            ], capture_output=True, timeout=60)
+        except (OSError, subprocess.SubprocessError) as e:
+            logger.warning(f"디코더 프로브 클립 생성 오류 ({codec}): {e}")
+            continue
+        if result.returncode == 0 and os.path.exists(path):
+            return True
+    return False
+
+def _measure_decode_fps(args, clip_path, expected_frames):
+    """디코더 인수로 테스트 클립을 디코딩해 fps 측정 (종료 코드/프레임 수가 맞지 않으면 None)"""
+    width, height = 160, 90
+    start_time = time.time()
+    try:
+        result = subprocess.run([
+            'ffmpeg', '-hide_banner', '-loglevel', 'error', *args, '-i', clip_path,
+            '-vf', f'scale={width}:{height}', '-f', 'rawvideo', '-pix_fmt', 'bgr24', '-'
+        ], capture_output=True, timeout=60)
+    except (OSError, subprocess.SubprocessError) as e:
+        return None, str(e)
+    elapsed = max(time.time() - start_time, 1e-6)
+    frames = len(result.stdout) // (width * height * 3)
+    if result.returncode != 0 or frames < expected_frames:
+        error = result.stderr.decode(errors='replace').strip().splitlines()
+        return None, f"exit={result.returncode}, frames={frames}/{expected_frames}" + (f", {error[-1]}" if error else "")
+    return frames / elapsed, None
+
+def probe_hw_decoders():
+    """후보 디코더를 테스트 클립으로 1회 프로브해 동작하는 가장 빠른 디코더 선택 (결과 캐시)"""
+    with hwaccel_lock:
+        if hwaccel_state["probed"]:
+            return hwaccel_state
+        
+        candidates = hwaccel_candidates()
+        try:
+            listed = subprocess.run(['ffmpeg', '-hide_banner', '-hwaccels'], capture_output=True, text=True, timeout=10).stdout
+            available = {line.strip() for line in listed.splitlines()[1:] if line.strip()}
+        except (OSError, subprocess.SubprocessError):
+            available = set()
+        
+        clip_path = os.path.join(TEMP_DIR, f"hwprobe_{uuid.uuid4().hex[:8]}.mp4")
+        results = {}
+        try:
+            os.makedirs(TEMP_DIR, exist_ok=True)
+            if _create_probe_clip(clip_path):
+                expected_frames = HWACCEL_PROBE_SECONDS * HWACCEL_PROBE_FPS
+                for name, args in candidates:
+                    if args and name not in available:
+                        results[name] = {"fps": None, "error": "FFmpeg 빌드에서 지원하지 않음"}
+                        continue
+                    fps, error = _measure_decode_fps(args, clip_path, expected_frames)
+                    results[name] = {"fps": round(fps, 1) if fps else None, "error": error}
+            else:
+                logger.warning("디코더 프로브용 테스트 클립 생성 실패, 소프트웨어 디코딩 사용")
+        except (OSError, subprocess.SubprocessError) as e:
+            # FFmpeg 실행 불가 등으로 프로브가 중단돼도 소프트웨어 디코딩으로 프로브 완료 처리
+            logger.warning(f"디코더 프로브 실패, 소프트웨어 디코딩 사용: {e}")
+        finally:
+            try:
+                if os.path.exists(clip_path):
+                    os.remove(clip_path)
+            except OSError:
+                pass
+        
+        working = [(results[name]["fps"], name, args) for name, args in candidates if results.get(name, {}).get("fps")]
+        fps, name, args = max(working) if working else (None, "software", [])
+        hwaccel_state.update(name=name, args=args, fps=fps, candidates=results, probed=True)
+        logger.info(f"디코더 선택: {name} ({fps} fps), 후보: {results}")
+        return hwaccel_state
+
+def mark_hwaccel_failed(reason):
+    """작업 중 하드웨어 디코더 실패 기록 후 다음으로 빠른 디코더(최종적으로 소프트웨어)로 전환"""
+    with hwaccel_lock:
+        failed = hwaccel_state["name"]
+        hwaccel_state["failures"].append({"decoder": failed, "reason": reason, "time": datetime.now().isoformat()})
+        if failed in hwaccel_state["candidates"]:
+            hwaccel_state["candidates"][failed].update(fps=None, error=reason)
+        working = [(info["fps"], name) for name, info in hwaccel_state["candidates"].items() if info.get("fps") and name != failed]
+        fps, name = max(working) if working else (None, "software")
+        args = dict(hwaccel_candidates()).get(name, [])
+        hwaccel_state.update(name=name, args=args, fps=fps)
+        logger.warning(f"디코더 {failed} 실패 ({reason}), {name}(으)로 전환")
 
 class OptimizedFrameExtractor:
     """M4 Max 최적화된 고속 프레임 추출기"""
@@ -210,46 +745,11 @@ class OptimizedFrameExtractor:
         self.target_size = target_size
         self.max_workers = 4  # CPU 코어 활용
         self.platform = os.name
+        self.coarse_method = None  # 마지막 대략 탐색 방식 (keyframes / uniform)
     
     def _get_hwaccel_args(self):
-        """OS별 FFmpeg 하드웨어 가속 인수 반환"""
-        import platform
-        system = platform.system().lower()
-        
-        if system == 'darwin':  # macOS
-            return ['-hwaccel', 'videotoolbox']
-        elif system == 'windows':  # Windows
-            # NVIDIA GPU가 있는 경우 NVENC 사용
-            try:
-                # GPU 확인 (간단한 방법)
-                result = subprocess.run(['nvidia-smi'], capture_output=True, text=True, timeout=5)
-                if result.returncode == 0:
-                    logger.info("NVIDIA GPU 감지, NVENC 하드웨어 가속 사용")
-                    return ['-hwaccel', 'cuda', '-hwaccel_output_format', 'cuda']
-            except:
-                pass
-            
-            # DirectX Video Acceleration (DXVA2) 사용 (Intel/AMD GPU)
-            logger.info("Windows DXVA2 하드웨어 가속 사용")
-            return ['-hwaccel', 'dxva2']
-            
-        elif system == 'linux':  # Linux
-            # VAAPI (Intel/AMD) 또는 VDPAU (NVIDIA) 사용
-            try:
-                # NVIDIA GPU 확인
-                result = subprocess.run(['nvidia-smi'], capture_output=True, text=True, timeout=5)
-                if result.returncode == 0:
-                    logger.info("Linux NVIDIA GPU 감지, CUDA 하드웨어 가속 사용")
-                    return ['-hwaccel', 'cuda']
-            except:
-                pass
-            
-            logger.info("Linux VAAPI 하드웨어 가속 사용")
-            return ['-hwaccel', 'vaapi']
-        
-        # 기본값: 소프트웨어 디코딩
-        logger.info("하드웨어 가속 미지원, 소프트웨어 디코딩 사용")
-        return []
+        """시작 시 프로브로 선택된 FFmpeg 디코더 인수 반환 (프로브 전이면 먼저 프로브)"""
+        return list(probe_hw_decoders()["args"])
     
     def _get_opencv_backend(self):
         """OS별 OpenCV 백엔드 반환"""
@@ -265,19 +765,27 @@ class OptimizedFrameExtractor:
         else:
             return cv2.CAP_ANY    # 기본값
         
-    def extract_frames_ffmpeg_hardware(self, video_path, interval_seconds=1):
-        """FFmpeg 하드웨어 가속으로 프레임 추출 (크로스 플랫폼)"""
+    def extract_frames_ffmpeg_hardware(self, video_path, interval_seconds=1, progress_callback=None, start=None, end=None):
+        """FFmpeg 하드웨어 가속으로 프레임 추출 (크로스 플랫폼, 프레임을 하나씩 내보내는 제너레이터, start/end로 구간 지정)"""
+        frame_count = 0
+        process = None
+        offset = start or 0.0
         try:
             # OS별 하드웨어 가속 설정
             hwaccel_args = self._get_hwaccel_args()
+            # 구간 지정 시 입력 탐색으로 해당 구간만 디코딩
+            range_args = ['-ss', f'{offset:.3f}'] if start else []
+            duration_args = ['-t', f'{end - offset:.3f}'] if end is not None else []
             
             cmd = [
                 'ffmpeg',
                 *hwaccel_args,  # OS별 하드웨어 가속
+                *range_args,
                 '-i', video_path,
+                *duration_args,
                 '-vf', f'fps=1/{interval_seconds},scale={self.target_size[0]}:{self.target_size[1]}',
                 '-f', 'image2pipe',
-                '-pix_fmt', 'rgb24',
+                '-pix_fmt', 'bgr24',  # OpenCV 순서로 바로 받아 색상 변환 생략
                 '-vcodec', 'rawvideo',
                 '-loglevel', 'quiet',  # 로그 최소화
                 '-'
@@ -286,45 +794,188 @@ class OptimizedFrameExtractor:
             logger.info(f"FFmpeg 하드웨어 가속 프레임 추출 시작: {video_path}")
             start_time = time.time()
             
-            process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-            frames_data = []
-            frame_count = 0
+            process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
             
             # 프레임 크기 계산
-            frame_size = self.target_size[0] * self.target_size[1] * 3  # RGB
+            frame_size = self.target_size[0] * self.target_size[1] * 3  # BGR
             
             while True:
-                # 프레임 데이터 읽기
+                # 프레임 데이터 읽기 (파이프 대기 시간 = 프레임당 디코딩 지연)
+                read_started = time.perf_counter()
                 raw_frame = process.stdout.read(frame_size)
                 if len(raw_frame) != frame_size:
                     break
+                stage_seconds.observe(time.perf_counter() - read_started, "decode")
                     
-                # numpy 배열로 변환
+                # numpy 배열로 변환 (이미 BGR 순서)
                 frame = np.frombuffer(raw_frame, dtype=np.uint8)
                 frame = frame.reshape((self.target_size[1], self.target_size[0], 3))
                 
-                # BGR로 변환 (OpenCV 호환)
-                frame_bgr = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
-                
-                timestamp = frame_count * interval_seconds
-                frames_data.append({
-                    'frame': frame_bgr,
+                timestamp = offset + frame_count * interval_seconds
+                yield {
+                    'frame': frame,
                     'timestamp': timestamp
-                })
+                }
                 frame_count += 1
+                
+                if progress_callback and frame_count % PROGRESS_EVENT_FRAMES == 0:
+                    progress_callback(frame_count)
             
             process.wait()
+            if process.returncode != 0 or frame_count == 0:
+                if hwaccel_args:
+                    # 하드웨어 디코딩 실패: 디코더를 전환하고 마지막으로 받은 프레임 이후부터 이어서 추출
+                    mark_hwaccel_failed(f"exit={process.returncode}, frames={frame_count}")
+                    resume = offset + frame_count * interval_seconds if frame_count else start
+                    yield from self.extract_frames_ffmpeg_hardware(video_path, interval_seconds, progress_callback, resume, end)
+                    return
+                if frame_count == 0:
+                    raise RuntimeError(f"FFmpeg가 프레임을 출력하지 않았습니다 (exit={process.returncode})")
+                logger.warning(f"FFmpeg 비정상 종료 (exit={process.returncode}), {frame_count}개 프레임까지 사용")
             extraction_time = time.time() - start_time
             logger.info(f"FFmpeg 추출 완료: {frame_count}개 프레임, {extraction_time:.2f}초")
             
-            return frames_data
-            
         except Exception as e:
+            if frame_count:
+                raise
             logger.warning(f"FFmpeg 하드웨어 가속 실패, OpenCV로 폴백: {e}")
-            return self.extract_frames_opencv_optimized(video_path, interval_seconds)
+            yield from self.extract_frames_opencv_optimized(video_path, interval_seconds, progress_callback, start, end)
+        finally:
+            # 소비자가 중간에 멈춘 경우 FFmpeg 프로세스 정리
+            if process is not None and process.poll() is None:
+                process.kill()
+                process.wait()
     
-    def extract_frames_opencv_optimized(self, video_path, interval_seconds=1):
-        """OpenCV 최적화 프레임 추출 (크로스 플랫폼 폴백)"""
+    def _extract_selected_frames(self, video_path, video_filter, input_args=(), progress_callback=None, start=None):
+        """
+        필터 그래프로 고른 프레임을 showinfo 로그의 실제 시각과 함께 내보내는 제너레이터
+
+        하드웨어 디코딩이 실패하면 디코더를 전환하고 마지막으로 받은 프레임 이후부터 같은 필터로 이어서 추출
+        """
+        frame_count = 0
+        last_timestamp = None
+        offset = start or 0.0
+        hwaccel_args = self._get_hwaccel_args()
+        # 이어서 추출할 때는 입력 탐색 (출력 시각은 탐색 위치 기준이므로 offset을 더함)
+        range_args = ['-ss', f'{offset:.3f}'] if start else []
+        cmd = [
+            'ffmpeg',
+            '-hide_banner', '-nostats',
+            *hwaccel_args,
+            *input_args,
+            *range_args,
+            '-i', video_path,
+            '-vf', f"{video_filter},showinfo",
+            '-fps_mode', 'vfr',
+            '-f', 'image2pipe',
+            '-pix_fmt', 'bgr24',
+            '-vcodec', 'rawvideo',
+            '-loglevel', 'info',  # showinfo 출력에 필요
+            '-'
+        ]
+        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        try:
+            # stderr의 showinfo 로그에서 통과한 프레임의 시각을 순서대로 수집
+            timestamps = queue.Queue()
+            
+            def read_showinfo():
+                pattern = re.compile(rb'pts_time:\s*(-?[0-9.]+)')
+                for line in process.stderr:
+                    if b'showinfo' not in line:
+                        continue
+                    match = pattern.search(line)
+                    if match:
+                        timestamps.put(float(match.group(1)))
+                timestamps.put(None)
+            
+            threading.Thread(target=read_showinfo, daemon=True).start()
+            
+            frame_size = self.target_size[0] * self.target_size[1] * 3  # BGR
+            while True:
+                read_started = time.perf_counter()
+                raw_frame = process.stdout.read(frame_size)
+                if len(raw_frame) != frame_size:
+                    break
+                stage_seconds.observe(time.perf_counter() - read_started, "decode")
+                timestamp = timestamps.get(timeout=30)
+                if timestamp is None:
+                    raise RuntimeError("showinfo 시각 정보가 프레임보다 적습니다")
+                
+                last_timestamp = offset + timestamp
+                frame = np.frombuffer(raw_frame, dtype=np.uint8)
+                yield {
+                    'frame': frame.reshape((self.target_size[1], self.target_size[0], 3)),
+                    'timestamp': last_timestamp
+                }
+                frame_count += 1
+                
+                if progress_callback and frame_count % PROGRESS_EVENT_FRAMES == 0:
+                    progress_callback(frame_count)
+            
+            process.wait()
+            failed = process.returncode != 0
+            if not failed and not frame_count and start is None:
+                # 선택 필터는 첫 프레임을 항상 통과시키므로 처음부터 추출했는데 0개면
+                # (길이가 있는 영상이라면) 디코더/필터가 조용히 실패한 것으로 처리
+                failed = (probe_video(video_path) or {}).get("duration", 0) > 0
+            if failed and hwaccel_args:
+                mark_hwaccel_failed(f"exit={process.returncode}, frames={frame_count}")
+                resume = last_timestamp + 0.001 if last_timestamp is not None else start
+                yield from self._extract_selected_frames(video_path, video_filter, input_args, progress_callback, resume)
+                return
+            if failed and not frame_count:
+                raise RuntimeError(f"FFmpeg가 프레임을 출력하지 않았습니다 (exit={process.returncode})")
+        finally:
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+    
+    def extract_keyframes_ffmpeg(self, video_path, min_interval=COARSE_SAMPLING_INTERVAL, progress_callback=None):
+        """키프레임만 디코딩해 min_interval 이상 간격으로 추출 (대략 탐색용 제너레이터, 실패 시 균일 간격 추출로 폴백)"""
+        frame_count = 0
+        self.coarse_method = "keyframes"
+        try:
+            logger.info(f"FFmpeg 키프레임 추출 시작: {video_path}")
+            start_time = time.time()
+            # 디코더가 키프레임 외 프레임을 건너뛰므로 GOP 길이만큼 디코딩 비용이 줄어듦
+            select_expr = f"isnan(prev_selected_t)+gte(t-prev_selected_t,{min_interval})"
+            video_filter = f"select='{select_expr}',scale={self.target_size[0]}:{self.target_size[1]}"
+            for frame_data in self._extract_selected_frames(video_path, video_filter, ['-skip_frame', 'nokey'], progress_callback):
+                frame_count += 1
+                yield frame_data
+            logger.info(f"FFmpeg 키프레임 추출 완료: {frame_count}개 프레임, {time.time() - start_time:.2f}초")
+        except Exception as e:
+            if frame_count:
+                raise
+            logger.warning(f"FFmpeg 키프레임 추출 실패, 균일 간격 추출로 폴백: {e}")
+            self.coarse_method = "uniform"
+            yield from self.extract_frames_ffmpeg_hardware(video_path, min_interval, progress_callback)
+    
+    def extract_frames_ffmpeg_scene(self, video_path, threshold=SCENE_FILTER_THRESHOLD, keepalive_seconds=SCENE_KEEPALIVE_SECONDS, progress_callback=None):
+        """FFmpeg 필터 그래프에서 장면 변화 프레임만 골라 추출 (showinfo 로그로 정확한 시각 확인, 제너레이터)"""
+        frame_count = 0
+        try:
+            logger.info(f"FFmpeg 장면 필터 프레임 추출 시작: {video_path}")
+            start_time = time.time()
+            # 축소 후 장면 점수 계산, 변화 프레임 + 첫 프레임 + keepalive 간격 프레임만 통과
+            # (하드웨어 디코딩 실패 시 같은 장면 필터를 소프트웨어 디코딩으로 재시도)
+            select_expr = (f"gt(scene,{threshold})+isnan(prev_selected_t)"
+                           f"+gte(t-prev_selected_t,{keepalive_seconds})")
+            video_filter = f"scale={self.target_size[0]}:{self.target_size[1]},select='{select_expr}'"
+            for frame_data in self._extract_selected_frames(video_path, video_filter, progress_callback=progress_callback):
+                frame_count += 1
+                yield frame_data
+            extraction_time = time.time() - start_time
+            logger.info(f"FFmpeg 장면 필터 추출 완료: {frame_count}개 프레임, {extraction_time:.2f}초")
+            
+        except Exception as e:
+            if frame_count:
+                raise
+            logger.warning(f"FFmpeg 장면 필터 실패, 균일 간격 추출로 폴백: {e}")
+            yield from self.extract_frames_ffmpeg_hardware(video_path, 1, progress_callback)
+    
+    def extract_frames_opencv_optimized(self, video_path, interval_seconds=1, progress_callback=None, start=None, end=None):
+        """OpenCV 최적화 프레임 추출 (크로스 플랫폼 폴백, 제너레이터, start/end로 구간 지정)"""
         logger.info(f"OpenCV 최적화 프레임 추출 시작: {video_path}")
         start_time = time.time()
         
@@ -337,29 +988,36 @@ class OptimizedFrameExtractor:
         total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
         frame_interval = max(1, int(fps * interval_seconds))
         
-        frames_data = []
+        frame_count = 0
         
         # 필요한 프레임만 직접 점프하여 추출
-        for frame_num in range(0, total_frames, frame_interval):
-            cap.set(cv2.CAP_PROP_POS_FRAMES, frame_num)
-            ret, frame = cap.read()
-            
-            if ret:
-                # 추출과 동시에 리사이징
-                frame_resized = cv2.resize(frame, self.target_size, 
-                                         interpolation=cv2.INTER_LINEAR)
+        try:
+            first_frame = int((start or 0.0) * fps)
+            last_frame = min(total_frames, int(end * fps)) if end is not None else total_frames
+            for frame_num in range(first_frame, last_frame, frame_interval):
+                read_started = time.perf_counter()
+                cap.set(cv2.CAP_PROP_POS_FRAMES, frame_num)
+                ret, frame = cap.read()
                 
-                timestamp = frame_num / fps
-                frames_data.append({
-                    'frame': frame_resized,
-                    'timestamp': timestamp
-                })
-        
-        cap.release()
+                if ret:
+                    stage_seconds.observe(time.perf_counter() - read_started, "decode")
+                    # 추출과 동시에 리사이징
+                    frame_resized = cv2.resize(frame, self.target_size, 
+                                             interpolation=cv2.INTER_LINEAR)
+                    
+                    timestamp = frame_num / fps
+                    yield {
+                        'frame': frame_resized,
+                        'timestamp': timestamp
+                    }
+                    frame_count += 1
+                    
+                    if progress_callback and frame_count % PROGRESS_EVENT_FRAMES == 0:
+                        progress_callback(frame_count)
+        finally:
+            cap.release()
         extraction_time = time.time() - start_time
-        logger.info(f"OpenCV 추출 완료: {len(frames_data)}개 프레임, {extraction_time:.2f}초")
-        
-        return frames_data
+        logger.info(f"OpenCV 추출 완료: {frame_count}개 프레임, {extraction_time:.2f}초")
     
     def extract_frames_parallel(self, video_path, timestamps):
         """멀티스레딩으로 특정 타임스탬프 프레임들 병렬 추출"""
@@ -409,29 +1067,386 @@ class OptimizedFrameExtractor:
         
         return None
 
+def encode_analysis_frame(frame):
+    """분석 프레임 JPEG 인코딩 (70 품질로 속도와 품질 균형)"""
+    started = time.perf_counter()
+    _, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 70])
+    stage_seconds.observe(time.perf_counter() - started, "encode")
+    return buffer.tobytes()
+
+class FrameRange:
+    """FrameStore의 연속 구간 뷰 (프레임을 복사하지 않고 인덱스 범위만 보관)"""
+    def __init__(self, store, start, stop):
+        self.store = store
+        self.start = start
+        self.stop = max(start, stop)
+
+    def __len__(self):
+        return self.stop - self.start
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            start, stop, _ = i.indices(len(self))
+            return FrameRange(self.store, self.start + start, self.start + stop)
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("프레임 인덱스 범위 초과")
+        return self.store[self.start + i]
+
+    def __iter__(self):
+        for i in range(self.start, self.stop):
+            yield self.store[i]
+
+class FrameStore:
+    """분석 프레임 저장소 - JPEG 바이트를 메모리 예산까지 보관하고 초과분은 파일에 기록해 mmap으로 읽음"""
+    def __init__(self, memory_budget=FRAME_STORE_MEMORY_BUDGET, spill_dir=TEMP_DIR):
+        self.memory_budget = memory_budget
+        self.spill_dir = spill_dir
+        self.timestamps = []
+        self._memory_frames = []  # 앞쪽 프레임부터 메모리에 보관
+        self._memory_bytes = 0
+        self._spill_index = []  # 파일로 넘긴 프레임의 (오프셋, 길이)
+        self._spill_bytes = 0
+        self._spill_file = None
+        self._spill_path = None
+        self._mmap = None
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            start, stop, _ = i.indices(len(self))
+            return FrameRange(self, start, stop)
+        if i < 0:
+            i += len(self)
+        return {'index': i, 'timestamp': self.timestamps[i], 'jpeg': self.jpeg(i)}
+
+    def append(self, timestamp, jpeg_bytes):
+        """프레임 추가 (예산 초과 시 이후 프레임은 모두 파일로)"""
+        if not self._spill_index and self._memory_bytes + len(jpeg_bytes) <= self.memory_budget:
+            self._memory_frames.append(bytes(jpeg_bytes))
+            self._memory_bytes += len(jpeg_bytes)
+        else:
+            if self._spill_file is None:
+                self._spill_path = os.path.join(self.spill_dir, f"frames_{uuid.uuid4().hex}.bin")
+                self._spill_file = open(self._spill_path, "w+b")
+            self._spill_file.write(jpeg_bytes)
+            self._spill_index.append((self._spill_bytes, len(jpeg_bytes)))
+            self._spill_bytes += len(jpeg_bytes)
+        self.timestamps.append(float(timestamp))
+
+    def jpeg(self, i):
+        """i번째 프레임의 JPEG 바이트"""
+        if i < len(self._memory_frames):
+            return self._memory_frames[i]
+        offset, length = self._spill_index[i - len(self._memory_frames)]
+        if self._mmap is None or len(self._mmap) < offset + length:
+            # 파일이 커졌으면 다시 매핑
+            self._spill_file.flush()
+            if self._mmap is not None:
+                self._mmap.close()
+            self._mmap = mmap.mmap(self._spill_file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._mmap[offset:offset + length]
+
+    def decode(self, i, reduced=False):
+        """i번째 프레임 디코딩 (reduced=True면 1/4 크기로 빠르게 디코딩)"""
+        flag = cv2.IMREAD_REDUCED_COLOR_4 if reduced else cv2.IMREAD_COLOR
+        return cv2.imdecode(np.frombuffer(self.jpeg(i), np.uint8), flag)
+
+    def stats(self):
+        return {
+            "frames": len(self),
+            "memory_frames": len(self._memory_frames),
+            "memory_bytes": self._memory_bytes,
+            "spilled_frames": len(self._spill_index),
+            "spilled_bytes": self._spill_bytes,
+            "memory_budget": self.memory_budget
+        }
+
+    def close(self):
+        """메모리 해제 및 임시 파일 삭제"""
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._spill_file is not None:
+            self._spill_file.close()
+            self._spill_file = None
+            if os.path.exists(self._spill_path):
+                os.remove(self._spill_path)
+        self._memory_frames = []
+
+class PeakRSSMonitor:
+    """작업 중 프로세스 RSS를 주기적으로 측정해 최대값 기록"""
+    def __init__(self, interval=RSS_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.start_rss = 0
+        self.peak_rss = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        rss = psutil.Process().memory_info().rss
+        self.peak_rss = max(self.peak_rss, rss)
+        return rss
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self):
+        self.start_rss = self.peak_rss = self._sample()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._sample()
+        return {
+            "start_rss_mb": round(self.start_rss / (1024 ** 2), 1),
+            "peak_rss_mb": round(self.peak_rss / (1024 ** 2), 1)
+        }
+
+class SamplingProfiler:
+    """파이썬 스택 샘플링 프로파일러 - 모든 스레드의 스택을 주기적으로 수집해 flame graph용 folded 형식으로 집계
+    
+    프로세스 전체를 샘플링하므로 동시에 진행 중인 다른 작업의 스택도 포함되며, 대기 중인 스레드는 제외한다.
+    """
+    def __init__(self, interval=PROFILER_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.stacks = {}
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    @staticmethod
+    def _frame_name(code):
+        return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+    def _collect(self):
+        own_id = threading.get_ident()
+        names = {thread.ident: re.sub(r'_\d+$', '', thread.name) for thread in threading.enumerate()}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_id:
+                continue
+            if (os.path.basename(frame.f_code.co_filename), frame.f_code.co_name) in PROFILER_IDLE_FRAMES:
+                continue
+            stack = []
+            while frame is not None and len(stack) < PROFILER_MAX_DEPTH:
+                stack.append(self._frame_name(frame.f_code))
+                frame = frame.f_back
+            key = ";".join([names.get(thread_id, "thread"), *reversed(stack)])
+            self.stacks[key] = self.stacks.get(key, 0) + 1
+            self.samples += 1
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._collect()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """샘플링 중지 후 folded 스택 텍스트 반환 (flamegraph.pl/speedscope 입력 형식)"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return "".join(f"{stack} {count}\n" for stack, count in sorted(self.stacks.items(), key=lambda item: -item[1]))
+
+class AnalysisTrace:
+    """분석 1회의 성능 추적 - 단계 구간, 장면별 요청 시간, 프레임 수, 디코더/배치 결정"""
+    def __init__(self, video_id, sampling):
+        self.started = time.perf_counter()
+        self.meta = {"video_id": video_id, "started_at": datetime.now().isoformat(), "sampling_mode": sampling}
+        self.spans = []
+        self.scenes = []
+        self.decoder_failures_before = len(hwaccel_state["failures"])
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def begin(self, name, **attrs):
+        """단계 구간 시작 (end()로 종료할 구간 dict 반환)"""
+        return {"name": name, "start": round(self.elapsed(), 4), **attrs}
+
+    def end(self, entry, **attrs):
+        """단계 구간 종료 후 기록"""
+        entry.update(attrs, duration=round(self.elapsed() - entry["start"], 4))
+        self.spans.append(entry)
+
+    @contextmanager
+    def span(self, name, **attrs):
+        """with 블록을 단계 구간으로 기록 (yield된 dict에 속성을 추가할 수 있음)"""
+        entry = self.begin(name, **attrs)
+        try:
+            yield entry
+        finally:
+            self.end(entry)
+
+    def add_scene(self, scene, analysis, call_stats, parse_method, started):
+        """장면 1개의 분석 요청 기록"""
+        self.scenes.append({
+            "scene_id": scene["scene_id"],
+            "start_time": round(float(scene["start_time"]), 2),
+            "end_time": round(float(scene["end_time"]), 2),
+            "frames": len(scene["frames"]),
+            "images": call_stats.get("images"),
+            "start": round(started - self.started, 4),
+            "duration": round(time.perf_counter() - started, 4),
+            "llm_latency": round(call_stats["latency"], 4) if call_stats.get("latency") is not None else None,
+            "tokens_per_second": round(call_stats["tokens_per_second"], 2) if call_stats.get("tokens_per_second") else None,
+            "timed_out": call_stats.get("timed_out", False),
+            "error": call_stats.get("error"),
+            "parse_method": parse_method,
+            "fallback": bool(analysis.get("error"))
+        })
+
+    def to_dict(self, **fields):
+        latencies = sorted(scene["llm_latency"] for scene in self.scenes if scene["llm_latency"] is not None)
+        failures = hwaccel_state["failures"][self.decoder_failures_before:]
+        return {
+            **self.meta,
+            "total_seconds": round(self.elapsed(), 3),
+            "decoder": {
+                "name": hwaccel_state["name"],
+                "probe_fps": hwaccel_state["fps"],
+                "retries": len(failures),
+                "failures": failures
+            },
+            "spans": self.spans,
+            "scene_summary": {
+                "count": len(self.scenes),
+                "llm_seconds": round(sum(latencies), 3),
+                "llm_latency_p50": latencies[len(latencies) // 2] if latencies else None,
+                "llm_latency_max": latencies[-1] if latencies else None,
+                "timeouts": sum(scene["timed_out"] for scene in self.scenes),
+                "fallbacks": sum(scene["fallback"] for scene in self.scenes)
+            },
+            "scenes": self.scenes,
+            **fields
+        }
+
+# 현재 호스트의 Ollama 튜닝 프로필 (최초 사용 시 1회 로드)
+ollama_profile = None
+
+def ollama_profile_host():
+    """튜닝 프로필 키로 쓰는 호스트 이름"""
+    import socket
+    return socket.gethostname()
+
+def load_ollama_profile(refresh=False):
+    """현재 호스트의 튜닝 프로필 로드 (없거나 읽을 수 없으면 빈 프로필)"""
+    global ollama_profile
+    if ollama_profile is not None and not refresh:
+        return ollama_profile
+    ollama_profile = {}
+    try:
+        with open(OLLAMA_PROFILE_PATH, encoding="utf-8") as f:
+            profiles = json.load(f)
+        ollama_profile = profiles.get(ollama_profile_host(), {})
+        if ollama_profile:
+            logger.info(f"Ollama 튜닝 프로필 로드: {ollama_profile.get('options')} ({ollama_profile.get('tokens_per_second')} tok/s)")
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ollama 튜닝 프로필 로드 실패, 기본 옵션 사용: {e}")
+    return ollama_profile
+
+def save_ollama_profile(profile):
+    """현재 호스트의 튜닝 프로필을 프로필 파일에 기록 (다른 호스트 항목은 유지)"""
+    profiles = {}
+    if os.path.exists(OLLAMA_PROFILE_PATH):
+        with open(OLLAMA_PROFILE_PATH, encoding="utf-8") as f:
+            profiles = json.load(f)
+    profiles[ollama_profile_host()] = profile
+    temp_path = f"{OLLAMA_PROFILE_PATH}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(profiles, f, ensure_ascii=False, indent=2)
+    os.replace(temp_path, OLLAMA_PROFILE_PATH)
+    load_ollama_profile(refresh=True)
+
+def resolve_ollama_options(profile=None):
+    """기본 옵션에 튜닝 프로필의 성능 옵션을 덮어쓴 Ollama 옵션"""
+    options = dict(OLLAMA_DEFAULT_OPTIONS)
+    tuned = (profile or {}).get("options", {})
+    options.update({key: tuned[key] for key in OLLAMA_TUNABLE_OPTIONS if key in tuned})
+    return options
+
+def build_scene_prompt(scene_id, start_time, end_time):
+    """장면 분석 프롬프트 (GPU 집약적 상세 분석, 튜너가 컨텍스트 하한 계산에도 사용)"""
+    return f"""
+장면 {scene_id} 종합 분석 ({start_time:.1f}초 ~ {end_time:.1f}초):
+
+이 장면의 모든 프레임을 매우 상세하게 분석해주세요. 다음 모든 항목을 포함한 JSON으로 응답해주세요:
+
+{{
+    "scene_description": "장면의 매우 상세한 설명 (최소 100자)",
+    "visual_elements": {{
+        "objects": ["식별된 모든 객체들"],
+        "colors": ["주요 색상들과 색조 분석"],
+        "lighting": "조명 상태와 그림자 분석",
+        "composition": "화면 구성과 레이아웃 분석"
+    }},
+    "mood": "주요 분위기 (happy/sad/excited/calm/tense/peaceful/dramatic/mysterious 중 하나)",
+    "emotion_intensity": 0.0~1.0 사이의 감정 강도,
+    "situation": "상황에 대한 상세한 설명",
+    "key_events": ["장면에서 일어나는 모든 주요 사건들"],
+    "character_analysis": {{
+        "people_count": "등장인물 수",
+        "expressions": ["표정 분석"],
+        "actions": ["행동 분석"],
+        "interactions": ["상호작용 분석"]
+    }},
+    "technical_analysis": {{
+        "camera_movement": "카메라 움직임 분석",
+        "shot_type": "샷의 종류 (클로즈업, 롱샷 등)",
+        "focus_area": "초점이 맞춰진 영역"
+    }},
+    "highlight_score": 0.0~1.0 사이의 하이라이트 점수,
+    "mood_progression": "장면 내 분위기 변화의 상세 분석",
+    "narrative_importance": "스토리텔링 관점에서의 중요도 분석"
+}}
+
+모든 프레임의 연속성, 시각적 요소, 감정적 흐름을 종합적으로 고려하여 매우 상세하게 분석해주세요.
+"""
+
 class SceneAnalyzer:
     """장면 분석기 - 최적화된 프레임 추출 통합"""
     def __init__(self, scene_threshold=0.65):
         self.scene_threshold = scene_threshold
         self.frame_extractor = OptimizedFrameExtractor(target_size=(640, 360))  # 최적화된 추출기
         # 단일 Ollama 서버 URL
-        self.ollama_url = "http://127.0.0.1:11434/api/generate"
+        self.ollama_url = OLLAMA_API_URL
         self.interval_seconds = 1.0
         self.video_duration = 0.0
+        self.sprite_sheet = None
+        self.saliency_track = None
+        self.audio_timeline = None
+        self.motion_timeline = None
+        self.last_call_stats = {}
+        self.sampling_stats = None
+        self.last_parse_method = None
+        # 호스트별 튜닝 프로필 적용한 Ollama 옵션
+        self.ollama_options = resolve_ollama_options(load_ollama_profile())
         
     def get_ollama_url(self):
         """단일 Ollama 서버 URL 반환"""
         return self.ollama_url
         
-    async def extract_frames_from_video(self, video_path, interval_seconds=2):
-        """최적화된 프레임 추출 (FFmpeg 하드웨어 가속 우선)"""
+    async def extract_frames_from_video(self, video_path, interval_seconds=2, progress_callback=None, sprite_prefix=None, sampling="auto"):
+        """최적화된 프레임 추출 후 FrameStore 반환 (FFmpeg 하드웨어 가속 우선, sprite_prefix 지정 시 스프라이트 시트 동시 생성, sampling으로 샘플링 모드 선택)"""
         try:
-            # 비디오 메타데이터 먼저 가져오기
-            cap = cv2.VideoCapture(video_path)
-            fps = cap.get(cv2.CAP_PROP_FPS)
-            total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-            duration = total_frames / fps
-            cap.release()
+            # 비디오 메타데이터 먼저 가져오기 (업로드 시 프로브 결과 캐시 재사용)
+            probe = await probe_video_async(video_path)
+            fps = probe["fps"]
+            total_frames = probe["frame_count"]
+            duration = probe["duration"]
             
             # 메타데이터 저장
             self.interval_seconds = float(interval_seconds)
@@ -440,51 +1455,160 @@ class SceneAnalyzer:
             logger.info(f"비디오 정보: FPS={fps}, 총 프레임={total_frames}, 길이={duration:.1f}초")
             logger.info("🚀 최적화된 프레임 추출 시작 (FFmpeg 하드웨어 가속 우선)")
             
-            # FFmpeg 하드웨어 가속으로 프레임 추출 시도
-            raw_frames = self.frame_extractor.extract_frames_ffmpeg_hardware(
-                video_path, interval_seconds
-            )
+            # FFmpeg 하드웨어 가속으로 프레임 추출 시도 (이벤트 루프 블로킹 방지를 위해 스레드에서 실행)
+            expected_frames = int(duration / interval_seconds) + 1
+            extraction_callback = None
+            if progress_callback:
+                extraction_callback = lambda count: progress_callback(count, expected_frames)
             
-            # Base64 인코딩 (Ollama 전송용)
-            frames_data = []
-            for frame_data in raw_frames:
-                frame = frame_data['frame']
-                timestamp = frame_data['timestamp']
-                
-                # JPEG 품질 최적화 (70 품질로 속도와 품질 균형)
-                _, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 70])
-                img_base64 = base64.b64encode(buffer).decode('utf-8')
-                
-                frames_data.append({
-                    'timestamp': timestamp,
-                    'frame_index': int(timestamp * fps),
-                    'image_base64': img_base64
-                })
-                
-                if len(frames_data) % 10 == 0:  # 10개마다 로그
-                    logger.info(f"프레임 인코딩 진행: {len(frames_data)}개 완료")
+            loop = asyncio.get_running_loop()
+            # 오디오 디코딩/분석은 프레임 추출과 동시에 별도 스레드에서 진행
+            self.audio_timeline = None
+            audio_future = loop.run_in_executor(None, analyze_audio_track, video_path)
+            
+            # 추출되는 프레임을 바로 JPEG로 압축해 저장소에 넣음 (원본 프레임을 모아두지 않음)
+            frame_store = FrameStore()
+            adaptive = (sampling == "auto" and duration >= ADAPTIVE_SAMPLING_MIN_DURATION
+                        and interval_seconds < COARSE_SAMPLING_INTERVAL)
+            
+            def ingest_frames():
+                if sampling == "scene":
+                    for frame_data in self.frame_extractor.extract_frames_ffmpeg_scene(video_path, progress_callback=extraction_callback):
+                        frame_store.append(frame_data['timestamp'], encode_analysis_frame(frame_data['frame']))
+                    self.sampling_stats = {
+                        "mode": "scene",
+                        "threshold": SCENE_FILTER_THRESHOLD,
+                        "keepalive": SCENE_KEEPALIVE_SECONDS,
+                        "total_frames": len(frame_store),
+                        "uniform_frames": expected_frames
+                    }
+                    return
+                if adaptive:
+                    self.sampling_stats = self._sample_adaptive(video_path, duration, interval_seconds, frame_store, extraction_callback)
+                    return
+                for frame_data in self.frame_extractor.extract_frames_ffmpeg_hardware(video_path, interval_seconds, extraction_callback):
+                    frame_store.append(frame_data['timestamp'], encode_analysis_frame(frame_data['frame']))
+                self.sampling_stats = {"mode": "dense", "interval": interval_seconds, "total_frames": len(frame_store)}
             
-            logger.info(f"🎯 최적화된 프레임 추출 완료: {len(frames_data)}개 프레임")
-            return frames_data
+            try:
+                await loop.run_in_executor(None, ingest_frames)
+            except Exception:
+                frame_store.close()
+                raise
+            finally:
+                try:
+                    self.audio_timeline = await audio_future
+                except Exception as e:
+                    logger.warning(f"오디오 분석 실패: {e}")
+            
+            # 저장된 JPEG를 1/4 크기로 빠르게 디코딩해 스크럽 미리보기용 스프라이트 시트 생성
+            self.sprite_sheet = None
+            if sprite_prefix and len(frame_store):
+                try:
+                    self.sprite_sheet = await loop.run_in_executor(
+                        None, generate_sprite_sheet, frame_store, sprite_prefix
+                    )
+                except Exception as e:
+                    logger.warning(f"스프라이트 시트 생성 실패: {e}")
+            
+            # 세로 리프레이밍용 주목 영역 트랙도 같은 저해상도 프레임으로 계산
+            self.saliency_track = None
+            if len(frame_store):
+                try:
+                    self.saliency_track = await loop.run_in_executor(None, compute_saliency_track, frame_store)
+                except Exception as e:
+                    logger.warning(f"주목 영역 트랙 계산 실패: {e}")
+            
+            logger.info(f"🎯 최적화된 프레임 추출 완료: {len(frame_store)}개 프레임 {frame_store.stats()}")
+            return frame_store
             
         except Exception as e:
             logger.error(f"최적화된 프레임 추출 실패: {e}")
-            return []
+            return None
+    
+    def _sample_adaptive(self, video_path, duration, interval_seconds, frame_store, progress_callback=None):
+        """대략 탐색 후 변화가 있는 구간만 촘촘히 디코딩해 frame_store에 시간순으로 저장"""
+        coarse_store = FrameStore()
+        try:
+            # 1단계: 키프레임만 디코딩해 낮은 빈도로 훑으며 히스토그램/움직임 특징만 보관
+            hists, smalls = [], []
+            for frame_data in self.frame_extractor.extract_keyframes_ffmpeg(video_path, COARSE_SAMPLING_INTERVAL, progress_callback):
+                frame = frame_data['frame']
+                coarse_store.append(frame_data['timestamp'], encode_analysis_frame(frame))
+                hists.append(cv2.calcHist([frame], [0, 1, 2], None, [8, 8, 8], [0, 256, 0, 256, 0, 256]))
+                smalls.append(cv2.resize(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY), MOTION_FRAME_SIZE, interpolation=cv2.INTER_AREA))
+            
+            # 2단계: 인접 대략 프레임 사이에 색상/움직임 변화가 있는 간격 표시 후 연속 간격을 구간으로 병합
+            times = coarse_store.timestamps
+            regions = []
+            for i in range(len(times) - 1):
+                correlation = cv2.compareHist(hists[i], hists[i + 1], cv2.HISTCMP_CORREL)
+                motion = np.abs(smalls[i + 1].astype(np.int16) - smalls[i]).mean() / 255.0
+                if correlation < ADAPTIVE_HIST_THRESHOLD or motion > ADAPTIVE_MOTION_THRESHOLD:
+                    if regions and regions[-1][1] == times[i]:
+                        regions[-1][1] = times[i + 1]
+                    else:
+                        regions.append([times[i], times[i + 1]])
+            # 마지막 대략 프레임 이후 꼬리 구간도 촘촘히 확인
+            if times and duration - times[-1] > interval_seconds:
+                if regions and regions[-1][1] == times[-1]:
+                    regions[-1][1] = duration
+                else:
+                    regions.append([times[-1], duration])
+            
+            # 3단계: 대략 프레임과 구간별 촘촘한 프레임을 시간순으로 병합 (대략 프레임과 겹치는 시각은 건너뜀)
+            coarse_index = 0
+            dense_frames = 0
+            tolerance = interval_seconds / 4
+            for region_start, region_end in regions:
+                for frame_data in self.frame_extractor.extract_frames_ffmpeg_hardware(video_path, interval_seconds, None, region_start, region_end):
+                    timestamp = frame_data['timestamp']
+                    while coarse_index < len(times) and times[coarse_index] <= timestamp + tolerance:
+                        frame_store.append(times[coarse_index], coarse_store.jpeg(coarse_index))
+                        coarse_index += 1
+                    if len(frame_store) and abs(timestamp - frame_store.timestamps[-1]) <= tolerance:
+                        continue
+                    frame_store.append(timestamp, encode_analysis_frame(frame_data['frame']))
+                    dense_frames += 1
+            while coarse_index < len(times):
+                frame_store.append(times[coarse_index], coarse_store.jpeg(coarse_index))
+                coarse_index += 1
+            
+            stats = {
+                "mode": "adaptive",
+                "interval": interval_seconds,
+                "coarse_interval": COARSE_SAMPLING_INTERVAL,
+                "coarse_method": self.frame_extractor.coarse_method,
+                "coarse_frames": len(times),
+                "dense_regions": len(regions),
+                "dense_seconds": round(sum(end - start for start, end in regions), 1),
+                "dense_frames": dense_frames,
+                "total_frames": len(frame_store),
+                "uniform_frames": int(duration / interval_seconds) + 1
+            }
+            logger.info(f"적응형 샘플링: {stats}")
+            return stats
+        finally:
+            coarse_store.close()
     
     def detect_scene_changes(self, frames_data):
-        """개선된 장면 전환 감지 - 구도 변화 vs 실제 장면 변화 구분"""
+        """개선된 장면 전환 감지 - 구도 변화 vs 실제 장면 변화 구분 (같은 패스에서 움직임 타임라인 계산)"""
         scene_changes = [0]  # 첫 번째 프레임은 항상 새로운 장면
+        self.motion_timeline = None
+        started = time.perf_counter()
         
         try:
             prev_hist = None
             prev_frame = None
             consecutive_changes = 0  # 연속 변화 카운터
+            small_frames = []  # 움직임 계산용 축소 흑백 프레임
             
-            for i, frame_data in enumerate(frames_data):
-                # base64에서 이미지 복원
-                img_data = base64.b64decode(frame_data['image_base64'])
-                nparr = np.frombuffer(img_data, np.uint8)
-                frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+            for i in range(len(frames_data)):
+                # 저장된 JPEG에서 이미지 복원
+                frame = frames_data.decode(i)
+                frame_data = {'timestamp': frames_data.timestamps[i]}
+                small_frames.append(cv2.resize(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY), MOTION_FRAME_SIZE, interpolation=cv2.INTER_AREA))
+                change_reason = "변화 없음"
                 
                 if prev_hist is not None and prev_frame is not None:
                     # 1. 히스토그램 비교 (색상 분포)
@@ -542,6 +1666,8 @@ class SceneAnalyzer:
                 prev_hist = hist
                 prev_frame = frame.copy()
             
+            self.motion_timeline = compute_motion_timeline(frames_data.timestamps, small_frames, scene_changes)
+            stage_seconds.observe(time.perf_counter() - started, "scene_detect")
             return scene_changes
             
         except Exception as e:
@@ -568,70 +1694,38 @@ class SceneAnalyzer:
         logger.info(f"총 {len(scenes)}개 장면으로 분할")
         return scenes
     
-    async def analyze_scene_batch(self, scene_frames, scene_id, start_time, end_time):
-        """장면의 배치 분석"""
+    async def analyze_scene_batch(self, scene_frames, scene_id, start_time, end_time, max_images=3):
+        """장면의 배치 분석 (대표 프레임 최대 max_images장 전송)"""
+        self.last_call_stats = {}
         try:
-            # 대표 프레임 선택 (최대 3개)
-            representative_frames = self.select_representative_frames(scene_frames)
+            # 대표 프레임 선택 (배치 크기 제어기가 정한 호출당 이미지 수만큼)
+            representative_frames = self.select_representative_frames(scene_frames, max_images)
             
-            # 더 복잡한 GPU 집약적 분석 프롬프트
-            prompt = f"""
-장면 {scene_id} 종합 분석 ({start_time:.1f}초 ~ {end_time:.1f}초):
-
-이 장면의 모든 프레임을 매우 상세하게 분석해주세요. 다음 모든 항목을 포함한 JSON으로 응답해주세요:
-
-{{
-    "scene_description": "장면의 매우 상세한 설명 (최소 100자)",
-    "visual_elements": {{
-        "objects": ["식별된 모든 객체들"],
-        "colors": ["주요 색상들과 색조 분석"],
-        "lighting": "조명 상태와 그림자 분석",
-        "composition": "화면 구성과 레이아웃 분석"
-    }},
-    "mood": "주요 분위기 (happy/sad/excited/calm/tense/peaceful/dramatic/mysterious 중 하나)",
-    "emotion_intensity": 0.0~1.0 사이의 감정 강도,
-    "situation": "상황에 대한 상세한 설명",
-    "key_events": ["장면에서 일어나는 모든 주요 사건들"],
-    "character_analysis": {{
-        "people_count": "등장인물 수",
-        "expressions": ["표정 분석"],
-        "actions": ["행동 분석"],
-        "interactions": ["상호작용 분석"]
-    }},
-    "technical_analysis": {{
-        "camera_movement": "카메라 움직임 분석",
-        "shot_type": "샷의 종류 (클로즈업, 롱샷 등)",
-        "focus_area": "초점이 맞춰진 영역"
-    }},
-    "highlight_score": 0.0~1.0 사이의 하이라이트 점수,
-    "mood_progression": "장면 내 분위기 변화의 상세 분석",
-    "narrative_importance": "스토리텔링 관점에서의 중요도 분석"
-}}
-
-모든 프레임의 연속성, 시각적 요소, 감정적 흐름을 종합적으로 고려하여 매우 상세하게 분석해주세요.
-"""
+            prompt = build_scene_prompt(scene_id, start_time, end_time)
             
             # 이미지들을 Ollama에 전송
-            images = [frame['image_base64'] for frame in representative_frames]
+            images = [base64.b64encode(frame['jpeg']).decode('utf-8') for frame in representative_frames]
             
             response = await self.call_ollama_api(prompt, images)
             
             if response:
                 return self.parse_analysis_response(response, scene_id, start_time, end_time)
             else:
-                return self.create_fallback_analysis(scene_id, start_time, end_time)
+                reason = "ollama_timeout" if self.last_call_stats.get("timed_out") else "ollama_error"
+                return self.create_fallback_analysis(scene_id, start_time, end_time, reason)
                 
         except Exception as e:
             logger.error(f"장면 {scene_id} 분석 중 오류: {e}")
-            return self.create_fallback_analysis(scene_id, start_time, end_time)
+            return self.create_fallback_analysis(scene_id, start_time, end_time, "analysis_exception")
     
-    def select_representative_frames(self, scene_frames):
-        """장면의 대표 프레임 선택"""
-        if len(scene_frames) <= 3:
+    def select_representative_frames(self, scene_frames, max_images=3):
+        """장면의 대표 프레임 선택 (균등 간격으로 최대 max_images장)"""
+        if len(scene_frames) <= max_images:
             return scene_frames
+        if max_images <= 1:
+            return [scene_frames[len(scene_frames) // 2]]
         
-        # 적절한 대표 프레임 선택 (안정성과 성능 균형)
-        frame_count = min(3, len(scene_frames))  # 최대 3개 프레임 (안정성)
+        frame_count = max_images
         indices = []
         
         for i in range(frame_count):
@@ -641,7 +1735,12 @@ class SceneAnalyzer:
         return [scene_frames[i] for i in indices]
     
     async def call_ollama_api(self, prompt, images):
-        """Ollama API 호출"""
+        """Ollama API 호출 (지연/토큰 속도/타임아웃 여부를 last_call_stats에 기록)"""
+        global ollama_in_flight
+        ollama_url = self.get_ollama_url()
+        self.last_call_stats = {"latency": None, "tokens_per_second": None, "timed_out": False, "error": None, "images": len(images)}
+        started = time.perf_counter()
+        ollama_in_flight += 1
         try:
             payload = {
                 "model": "qwen2.5vl:7b",
@@ -649,20 +1748,7 @@ class SceneAnalyzer:
                 "images": images,
                 "stream": False,
                 "keep_alive": "10m",  # 모델을 10분간 메모리에 유지
-                "options": {
-                    "temperature": 0.3,
-                    "top_p": 0.9,
-                    "num_gpu": 36,  # 90% GPU 활용률 목표 (40코어 * 0.9)
-                    "num_thread": 10,  # CPU 스레드 적절히 조정
-                    "num_ctx": 7168,   # 컨텍스트 크기 90% 활용
-                    "num_batch": 896,  # 배치 크기 90% 활용
-                    "num_predict": 360, # 예측 토큰 90% 활용
-                    "repeat_penalty": 1.1,
-                    "top_k": 40,
-                    "num_keep": 4,  # 더 많은 토큰 유지
-                    "tfs_z": 1.0,  # 추가 샘플링 파라미터
-                    "typical_p": 1.0  # 추가 처리 부하
-                }
+                "options": self.ollama_options
             }
             
             logger.info("Ollama API 호출 중...")
@@ -670,8 +1756,6 @@ class SceneAnalyzer:
             async with asyncio.timeout(60):  # 60초 타임아웃 (복잡한 분석용)
                 # 비동기 HTTP 요청을 위해 별도 스레드에서 실행
                 loop = asyncio.get_event_loop()
-                # 단일 서버 URL 사용
-                ollama_url = self.get_ollama_url()
                 response = await loop.run_in_executor(
                     None,  # 기본 ThreadPoolExecutor 사용
                     lambda: requests.post(
@@ -681,35 +1765,60 @@ class SceneAnalyzer:
                     )
                 )
                 
+                self.last_call_stats["latency"] = time.perf_counter() - started
                 if response.status_code == 200:
                     result = response.json()
                     response_text = result.get('response', '')
+                    eval_seconds = result.get('eval_duration', 0) / 1e9
+                    if result.get('eval_count') and eval_seconds > 0:
+                        self.last_call_stats["tokens_per_second"] = result['eval_count'] / eval_seconds
                     logger.info(f"Ollama 분석 완료 - 응답 길이: {len(response_text)}")
                     if not response_text:
                         logger.warning("Ollama 응답이 비어있음")
                     return response_text
                 else:
                     logger.error(f"Ollama API HTTP 오류: {response.status_code}, 응답: {response.text[:200]}")
+                    self.last_call_stats["error"] = f"http_{response.status_code}"
                     return None
                     
         except asyncio.TimeoutError:
             logger.error(f"Ollama API 타임아웃 (60초 초과): {ollama_url}")
+            self.last_call_stats.update(latency=time.perf_counter() - started, timed_out=True)
             return None
         except requests.exceptions.ConnectionError as e:
             logger.error(f"Ollama 서버 연결 실패: {ollama_url} - 서버가 실행 중인지 확인하세요")
+            self.last_call_stats.update(latency=time.perf_counter() - started, error="connection")
             return None
         except Exception as e:
             logger.error(f"Ollama API 호출 실패 - URL: {ollama_url}, 오류: {str(e)}, 타입: {type(e)}")
+            self.last_call_stats.update(latency=time.perf_counter() - started, error=type(e).__name__)
             return None
+        finally:
+            ollama_in_flight -= 1
+            stats = self.last_call_stats
+            stage_seconds.observe(stats["latency"] if stats["latency"] is not None else time.perf_counter() - started, "llm")
+            if stats["tokens_per_second"]:
+                ollama_tokens_per_second.observe(stats["tokens_per_second"])
+            ollama_requests.inc("timeout" if stats["timed_out"] else stats["error"] or "ok")
     
     def parse_analysis_response(self, response_text, scene_id, start_time, end_time):
-        """Ollama 응답 파싱 - 중첩 JSON 구조 해결"""
+        """Ollama 응답 파싱 (파싱 시간과 사용된 방법을 지표로 기록)"""
+        started = time.perf_counter()
+        self.last_parse_method = "exception"
+        analysis = self._parse_response_text(response_text, scene_id, start_time, end_time)
+        stage_seconds.observe(time.perf_counter() - started, "parse")
+        parse_results.inc(self.last_parse_method)
+        return analysis
+    
+    def _parse_response_text(self, response_text, scene_id, start_time, end_time):
+        """Ollama 응답 파싱 - 중첩 JSON 구조 해결 (성공한 방법을 last_parse_method에 기록)"""
         try:
             logger.info(f"장면 {scene_id} 응답 파싱 시작 - 길이: {len(response_text) if response_text else 0}")
             
             if not response_text:
                 logger.error(f"장면 {scene_id}: 빈 응답")
-                return self.create_fallback_analysis(scene_id, start_time, end_time)
+                self.last_parse_method = "empty_response"
+                return self.create_fallback_analysis(scene_id, start_time, end_time, "empty_response")
             
             # 다양한 JSON 추출 방법 시도
             analysis = None
@@ -721,6 +1830,7 @@ class SceneAnalyzer:
                     end = response_text.rfind('}') + 1
                     json_str = response_text[start:end]
                     analysis = json.loads(json_str)
+                    self.last_parse_method = "standard_json"
                     logger.info(f"장면 {scene_id}: 표준 JSON 파싱 성공")
                 except json.JSONDecodeError as e:
                     logger.warning(f"장면 {scene_id}: 표준 JSON 파싱 실패 - {e}")
@@ -734,6 +1844,7 @@ class SceneAnalyzer:
                     if nested_json_match:
                         nested_json_str = nested_json_match.group(1).replace('\n', '').replace('\\', '')
                         analysis = json.loads(nested_json_str)
+                        self.last_parse_method = "nested_json"
                         logger.info(f"장면 {scene_id}: 중첩 JSON 파싱 성공")
                 except Exception as e:
                     logger.warning(f"장면 {scene_id}: 중첩 JSON 파싱 실패 - {e}")
@@ -751,6 +1862,7 @@ class SceneAnalyzer:
                         "highlight_score": float(self._extract_field(response_text, "highlight_score", "0.5")),
                         "mood_progression": self._extract_field(response_text, "mood_progression", "안정적")
                     }
+                    self.last_parse_method = "partial_fields"
                     logger.info(f"장면 {scene_id}: 부분 정보 추출 성공")
                 except Exception as e:
                     logger.warning(f"장면 {scene_id}: 부분 정보 추출 실패 - {e}")
@@ -773,9 +1885,9 @@ class SceneAnalyzer:
                 analysis.update({
                     "scene_id": scene_id,
                     "time_range": {
-                        "start": int(start_time),
-                        "end": int(end_time),
-                        "duration": int(end_time - start_time)
+                        "start": round(float(start_time), 2),
+                        "end": round(float(end_time), 2),
+                        "duration": round(float(end_time - start_time), 2)
                     },
                     "timestamp": datetime.now().isoformat()
                 })
@@ -785,13 +1897,15 @@ class SceneAnalyzer:
             
             # 모든 방법 실패 시 폴백
             logger.error(f"장면 {scene_id}: 모든 파싱 방법 실패")
-            return self.create_fallback_analysis(scene_id, start_time, end_time)
+            self.last_parse_method = "all_failed"
+            return self.create_fallback_analysis(scene_id, start_time, end_time, "parse_all_failed")
             
         except Exception as e:
             logger.error(f"장면 {scene_id} 파싱 중 예외 발생: {str(e)}")
             if response_text:
                 logger.error(f"응답 내용 샘플: {response_text[:100]}...")
-            return self.create_fallback_analysis(scene_id, start_time, end_time)
+            self.last_parse_method = "exception"
+            return self.create_fallback_analysis(scene_id, start_time, end_time, "parse_exception")
     
     def _extract_description(self, text):
         """텍스트에서 장면 설명 추출"""
@@ -816,8 +1930,9 @@ class SceneAnalyzer:
             return value if value else default_value
         return default_value
     
-    def create_fallback_analysis(self, scene_id, start_time, end_time):
-        """분석 실패 시 기본 응답 생성"""
+    def create_fallback_analysis(self, scene_id, start_time, end_time, reason="unknown"):
+        """분석 실패 시 기본 응답 생성 (원인별 폴백 횟수 기록)"""
+        fallback_analyses.inc(reason)
         return {
             "scene_id": scene_id,
             "scene_description": f"장면 {scene_id} - 분석 실패",
@@ -836,35 +1951,933 @@ class SceneAnalyzer:
             "error": True
         }
 
-def extract_video_metadata(file_path):
-    """비디오 메타데이터(길이, 썸네일) 추출"""
-    try:
-        # 비디오 길이 추출
-        video = mp.VideoFileClip(file_path)
-        duration = int(video.duration)
-        video.close()
-
-        # 썸네일 생성 (첫 프레임)
-        cap = cv2.VideoCapture(file_path)
-        ret, frame = cap.read()
-        
-        thumbnail_path = None
-        if ret:
-            thumbnail_filename = f"thumb_{os.path.basename(file_path)}.jpg"
-            thumbnail_path = os.path.join(THUMBNAILS_DIR, thumbnail_filename)
-            cv2.imwrite(thumbnail_path, frame)
-            # 상대 경로로 변환
-            thumbnail_path = f"/thumbnails/{thumbnail_filename}"
-            
-        cap.release()
+# 쇼츠 클립 렌더링 설정 (동시 인코딩 수, 키프레임 일치 허용 오차(초), 재인코딩 옵션)
+SHORTS_RENDER_WORKERS = max(1, min(4, (os.cpu_count() or 2) // 2))
+KEYFRAME_SNAP_TOLERANCE = 0.05
+CLIP_VIDEO_ENCODER = 'libx264'
+CLIP_ENCODE_ARGS = ['-preset', 'veryfast', '-crf', '20', '-pix_fmt', 'yuv420p']
+
+# 스마트 컷 재인코딩 구간 설정 (픽셀 형식은 원본을 따르므로 제외)
+SPLICE_ENCODE_ARGS = ['-preset', 'veryfast', '-crf', '20']
+# ffprobe H.264 프로파일 이름 → x264 프로파일
+X264_PROFILES = {
+    "Constrained Baseline": "baseline",
+    "Baseline": "baseline",
+    "Main": "main",
+    "High": "high",
+    "High 10": "high10",
+    "High 4:2:2": "high422",
+    "High 4:4:4 Predictive": "high444"
+}
+# 이어붙이기 전에 재인코딩 구간과 원본이 일치해야 하는 스트림 속성
+SPLICE_VIDEO_FIELDS = ("codec_name", "profile", "level", "pix_fmt", "width", "height", "time_base")
+SPLICE_AUDIO_FIELDS = ("codec_name", "sample_rate", "channels")
+
+# 하이라이트 클립 선택 기본값 (목표 총 길이, 클립 최소/최대 길이, 앞뒤 여유, 같은 분위기 반복 감점,
+# 인접 장면 병합 간격/점수 기준, 후보 최소 점수, 최대 클립 수, 오디오 흥분도 반영 비율, 무음 경계 보정 허용 오차(초, 0이면 끔))
+SHORTS_SELECTION_DEFAULTS = {
+    "target_duration": 60.0,
+    "min_clip_duration": 5.0,
+    "max_clip_duration": 30.0,
+    "padding": 0.5,
+    "diversity_penalty": 0.2,
+    "merge_gap": 1.0,
+    "merge_min_score": 0.6,
+    "min_score": 0.3,
+    "max_clips": 10,
+    "audio_weight": 0.25,
+    "snap_tolerance": 1.0
+}
+
+# 세로(9:16) 리프레이밍 설정 (출력 해상도, 크롭 명령 간격(초당), 평활화 시간(초), 최대 패닝 속도(화면 폭 비율/초))
+REFRAME_ASPECT = (9, 16)
+REFRAME_OUTPUT_SIZE = (1080, 1920)
+REFRAME_COMMAND_RATE = 5
+REFRAME_SMOOTHING_SECONDS = 1.0
+REFRAME_MAX_PAN_SPEED = 0.25
+
+# 오디오 분석 설정 (디코딩 샘플레이트, 한 번에 처리할 길이(초), 온셋 검출 프레임 크기(1초를 나누어떨어지게), 무음 하한(dB))
+AUDIO_SAMPLE_RATE = 16000
+AUDIO_BLOCK_SECONDS = 10
+AUDIO_ONSET_FRAME = 400
+AUDIO_FLOOR_DB = -70.0
+
+# 구간 경계 보정용 에너지 엔벨로프 해상도 (초당 값 수, int8 dB를 base64로 저장)
+AUDIO_ENVELOPE_RATE = 20
+
+# 무음 판정 (절대 상한(dBFS), 트랙 중앙값 대비 최소 하락폭(dB), 최소 무음 길이(초),
+# 무음이 트랙의 이 비율 이상이면 쉼이 아니라 조용한 트랙으로 보고 무시)
+PAUSE_MAX_DB = -35.0
+PAUSE_MEDIAN_DROP_DB = 20.0
+PAUSE_MIN_SECONDS = 0.15
+PAUSE_MAX_COVERAGE = 0.5
+
+# 온셋 검출 민감도 (스펙트럼 변화량이 중앙값 + 민감도 × 평균 편차를 넘으면 온셋)
+AUDIO_ONSET_SENSITIVITY = 1.5
+
+# 움직임 타임라인 설정 (프레임 차이 계산용 축소 크기)
+MOTION_FRAME_SIZE = (64, 36)
+
+# 주목 영역 추적 설정 (분석 프레임 축소 크기, 움직임/얼굴 가중치)
+SALIENCY_FRAME_SIZE = (160, 90)
+SALIENCY_MOTION_WEIGHT = 2.0
+SALIENCY_FACE_WEIGHT = 4.0
+
+# 스프라이트 시트 설정 (타일 크기, 시트당 열/행, 최대 타일 수)
+SPRITE_TILE_SIZE = (160, 90)
+SPRITE_COLUMNS = 10
+SPRITE_ROWS = 10
+SPRITE_MAX_TILES = 600
+SPRITE_QUALITY = 75
+
+# 미디어 프로브 결과 캐시 (경로, 크기, 수정 시각 기준 LRU)
+probe_cache = OrderedDict()
+PROBE_CACHE_SIZE = 256
+
+# 키프레임 간격 측정 구간 (초)
+KEYFRAME_PROBE_SECONDS = 30
+
+# 썸네일 후보 위치 (영상 길이 대비 비율) 및 검은 화면 판정 기준
+THUMBNAIL_CANDIDATE_RATIOS = [0.1, 0.25, 0.5, 0.75]
+THUMBNAIL_MIN_BRIGHTNESS = 20
+THUMBNAIL_MIN_CONTRAST = 10
+THUMBNAIL_WIDTH = 640
+
+class ClipRenderer:
+    """FFmpeg 쇼츠 클립 렌더러 - 키프레임 정렬 시 스트림 복사, 아니면 첫 GOP만 재인코딩 후 이어붙임"""
+    # 첫 GOP 재인코딩 후 이어붙이기가 가능한 원본 코덱 → 인코더
+    SPLICE_ENCODERS = {"h264": "libx264"}
+
+    def __init__(self, max_workers=SHORTS_RENDER_WORKERS):
+        self.ffmpeg_path = shutil.which("ffmpeg")
+        self.semaphore = asyncio.Semaphore(max_workers)
+
+    @property
+    def available(self):
+        return self.ffmpeg_path is not None
+
+    async def _run_ffmpeg(self, args):
+        """FFmpeg 실행 후 (성공 여부, 오류 메시지) 반환"""
+        process = await asyncio.create_subprocess_exec(
+            self.ffmpeg_path, '-y', '-hide_banner', '-loglevel', 'error', *args,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE
+        )
+        _, stderr = await process.communicate()
+        return process.returncode == 0, stderr.decode('utf-8', errors='ignore').strip()
+
+    def _input_args(self, video_path, start, duration):
+        return ['-ss', f'{start:.3f}', '-i', video_path, '-t', f'{duration:.3f}', '-map', '0:v:0', '-map', '0:a?']
+
+    @staticmethod
+    def _keyframe_seek(keyframe):
+        """스트림 복사용 -ss 값 (키프레임 pts를 ms 단위로 올림, 내림하면 이전 키프레임부터 복사되어 앞 GOP가 붙음)"""
+        return math.ceil(keyframe * 1000) / 1000
+
+    async def _stream_copy(self, video_path, keyframe, end, output_path):
+        """키프레임부터 end까지 스트림 복사 (keyframe은 실제 키프레임 pts)"""
+        seek = self._keyframe_seek(keyframe)
+        return await self._run_ffmpeg([
+            *self._input_args(video_path, seek, end - seek),
+            '-c', 'copy', '-avoid_negative_ts', 'make_zero', '-movflags', '+faststart',
+            output_path
+        ])
+
+    async def _reencode(self, video_path, start, end, output_path, video_filter=None):
+        filter_args = ['-vf', video_filter] if video_filter else []
+        return await self._run_ffmpeg([
+            *self._input_args(video_path, start, end - start), *filter_args,
+            '-c:v', CLIP_VIDEO_ENCODER, *CLIP_ENCODE_ARGS, '-c:a', 'aac', '-b:a', '128k', '-movflags', '+faststart',
+            output_path
+        ])
+
+    async def _smart_cut(self, video_path, start, keyframe, end, output_path, encoder):
+        """
+        시작~다음 키프레임 구간만 재인코딩하고 나머지는 스트림 복사해 이어붙임
+
+        재인코딩 구간은 원본의 프로파일/레벨/픽셀 형식/타임베이스를 따르고, 결과가 원본과 다르면 실패로 반환 (전체 재인코딩 폴백)
+        """
+        source = await asyncio.to_thread(probe_stream_params, video_path)
+        head_args = splice_encode_args(source)
+        if head_args is None:
+            return False, "원본 스트림 속성을 재현할 수 없어 이어붙이기 불가"
+
+        # 재인코딩 구간은 키프레임 직전 프레임까지 (-t를 ms 단위로 내려 꼬리의 첫 키프레임과 겹치지 않게)
+        start = round(start, 3)
+        head_seconds = math.floor((keyframe - start) * 1000) / 1000
+        base = os.path.splitext(output_path)[0]
+        head_path, tail_path, list_path = f"{base}_head.mp4", f"{base}_tail.mp4", f"{base}_concat.txt"
+        try:
+            ok, error = await self._run_ffmpeg([
+                *self._input_args(video_path, start, head_seconds),
+                # 오디오도 함께 인코딩 (복사하면 이전 키프레임부터 포함되어 길이가 늘어남)
+                '-c:v', encoder, *SPLICE_ENCODE_ARGS, *head_args, '-b:a', '128k', '-avoid_negative_ts', 'make_zero',
+                head_path
+            ])
+            if not ok:
+                return ok, error
+
+            mismatch = splice_mismatch(source, await asyncio.to_thread(probe_stream_params, head_path))
+            if mismatch:
+                return False, f"재인코딩 구간 스트림 속성 불일치: {mismatch}"
+
+            ok, error = await self._stream_copy(video_path, keyframe, end, tail_path)
+            if not ok:
+                return ok, error
+
+            with open(list_path, 'w', encoding='utf-8') as f:
+                f.write(f"file '{os.path.abspath(head_path)}'\nfile '{os.path.abspath(tail_path)}'\n")
+            return await self._run_ffmpeg([
+                '-f', 'concat', '-safe', '0', '-i', list_path,
+                '-c', 'copy', '-movflags', '+faststart', output_path
+            ])
+        finally:
+            for path in (head_path, tail_path, list_path):
+                if os.path.exists(path):
+                    os.remove(path)
+
+    async def render_clip(self, video_path, start, end, output_path, codec, video_filter=None):
+        """클립 하나 렌더링 (copy / smart / reencode 중 선택, 실패 시 전체 재인코딩으로 폴백, 필터 지정 시 단일 필터 패스)"""
+        async with self.semaphore:
+            started = time.perf_counter()
+            if video_filter:
+                # 크롭/스케일은 어차피 전체 재인코딩이므로 키프레임 조회 생략
+                ok, error = await self._reencode(video_path, start, end, output_path, video_filter)
+                if not ok:
+                    raise RuntimeError(f"클립 리프레이밍 실패: {error}")
+                return {"mode": "reframe", "encode_seconds": round(time.perf_counter() - started, 3)}
+
+            keyframes = await asyncio.to_thread(probe_keyframes, video_path, max(0.0, start - 1.0), end)
+
+            mode = "reencode"
+            next_keyframe = None
+            if keyframes:
+                nearest = min(keyframes, key=lambda k: abs(k - start))
+                if abs(nearest - start) <= KEYFRAME_SNAP_TOLERANCE:
+                    # 허용 오차 안의 키프레임으로 시작점을 맞춤 (복사는 어차피 키프레임부터 시작)
+                    mode = "copy"
+                    start = nearest
+                elif codec in self.SPLICE_ENCODERS:
+                    next_keyframe = next((k for k in keyframes if start < k < end - KEYFRAME_SNAP_TOLERANCE), None)
+                    if next_keyframe is not None:
+                        mode = "smart"
+
+            if mode == "copy":
+                ok, error = await self._stream_copy(video_path, start, end, output_path)
+            elif mode == "smart":
+                ok, error = await self._smart_cut(video_path, start, next_keyframe, end, output_path, self.SPLICE_ENCODERS[codec])
+            else:
+                ok, error = await self._reencode(video_path, start, end, output_path)
+
+            if not ok and mode != "reencode":
+                logger.warning(f"클립 {mode} 렌더링 실패, 재인코딩으로 폴백: {error}")
+                mode = "reencode"
+                ok, error = await self._reencode(video_path, start, end, output_path)
+
+            if not ok:
+                raise RuntimeError(f"클립 렌더링 실패: {error}")
+
+            return {"mode": mode, "encode_seconds": round(time.perf_counter() - started, 3)}
+
+    async def render_clips(self, video_path, clips, output_dir, progress_callback=None, vertical=False, saliency_track=None):
+        """클립들을 제한된 동시성으로 병렬 렌더링하고 처리량 통계 반환 (vertical이면 주목 영역 추적 9:16 크롭)"""
+        os.makedirs(output_dir, exist_ok=True)
+        probe = await asyncio.to_thread(probe_video, video_path) or {}
+        codec = probe.get("codec")
+        started = time.perf_counter()
+        completed = 0
+
+        async def render(clip):
+            nonlocal completed
+            output_path = os.path.join(output_dir, f"clip_{clip['clip_id']}.mp4")
+            start, end = float(clip["start_time"]), float(clip["end_time"])
+            command_path = None
+            try:
+                video_filter = None
+                if vertical:
+                    crop = build_crop_track(saliency_track, start, end, probe.get("width", 0), probe.get("height", 0))
+                    if crop and len(crop["points"]) > 1:
+                        command_path = os.path.join(output_dir, f"clip_{clip['clip_id']}_crop.cmd")
+                        write_crop_commands(command_path, crop["points"])
+                    video_filter = build_reframe_filter(crop, command_path)
+                    if crop:
+                        xs = [x for _, x in crop["points"]]
+                        clip["reframe"] = {"crop_width": crop["width"], "crop_height": crop["height"], "pan_range": [min(xs), max(xs)]}
+
+                result = await self.render_clip(video_path, start, end, output_path, codec, video_filter)
+                clip.update({
+                    "file": f"/clips/{os.path.relpath(output_path, SHORTS_DIR).replace(os.sep, '/')}",
+                    "render_mode": result["mode"],
+                    "encode_seconds": result["encode_seconds"]
+                })
+            except Exception as e:
+                logger.error(f"클립 {clip['clip_id']} 렌더링 실패: {e}")
+                clip.update({"file": None, "render_mode": "failed", "render_error": str(e)})
+            finally:
+                if command_path and os.path.exists(command_path):
+                    os.remove(command_path)
+            completed += 1
+            if progress_callback:
+                progress_callback(completed, len(clips))
+
+        await asyncio.gather(*(render(clip) for clip in clips))
+
+        wall_seconds = time.perf_counter() - started
+        rendered = [clip for clip in clips if clip.get("file")]
+        clip_seconds = sum(float(clip["end_time"]) - float(clip["start_time"]) for clip in rendered)
+        mode_counts = {}
+        for clip in clips:
+            mode_counts[clip["render_mode"]] = mode_counts.get(clip["render_mode"], 0) + 1
+
+        return {
+            "rendered_clips": len(rendered),
+            "clip_seconds": round(clip_seconds, 3),
+            "wall_seconds": round(wall_seconds, 3),
+            "clip_seconds_per_wall_second": round(clip_seconds / wall_seconds, 2) if wall_seconds > 0 else 0,
+            "render_modes": mode_counts,
+            "workers": SHORTS_RENDER_WORKERS
+        }
+
+def _parse_frame_rate(rate):
+    """ffprobe 프레임레이트 문자열 ("30000/1001") 파싱"""
+    try:
+        num, _, den = rate.partition("/")
+        return float(num) / float(den or 1)
+    except (ValueError, ZeroDivisionError, AttributeError):
+        return 0.0
+
+def probe_keyframes(file_path, start=0.0, end=None):
+    """구간 내 키프레임 시각 목록 조회 (패킷 플래그만 읽어 디코딩 없음, ffprobe 없으면 None)"""
+    ffprobe_path = shutil.which("ffprobe")
+    if not ffprobe_path:
+        return None
+
+    read_interval = f'{start:.3f}%{end:.3f}' if end is not None else f'{start:.3f}%+{KEYFRAME_PROBE_SECONDS}'
+    cmd = [
+        ffprobe_path, '-v', 'error',
+        '-select_streams', 'v:0',
+        '-read_intervals', read_interval,
+        '-show_entries', 'packet=pts_time,flags',
+        '-of', 'csv=print_section=0',
+        file_path
+    ]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
+    except Exception as e:
+        logger.warning(f"키프레임 조회 실패: {e}")
+        return None
+    if result.returncode != 0:
+        return None
+
+    keyframe_times = []
+    for line in result.stdout.splitlines():
+        pts_time, _, flags = line.partition(',')
+        if 'K' in flags and pts_time not in ('', 'N/A'):
+            keyframe_times.append(float(pts_time))
+    return sorted(keyframe_times)
+
+def probe_stream_params(file_path):
+    """이어붙이기 호환성 확인용 첫 비디오/오디오 스트림 속성 조회 (ffprobe가 없거나 실패하면 None)"""
+    ffprobe_path = shutil.which("ffprobe")
+    if not ffprobe_path:
+        return None
+
+    cmd = [
+        ffprobe_path, '-v', 'error',
+        '-show_entries', 'stream=codec_type,' + ','.join(sorted(set(SPLICE_VIDEO_FIELDS + SPLICE_AUDIO_FIELDS))),
+        '-of', 'json',
+        file_path
+    ]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
+        streams = json.loads(result.stdout).get("streams", []) if result.returncode == 0 else None
+    except Exception as e:
+        logger.warning(f"스트림 속성 조회 실패: {e}")
+        return None
+    if not streams:
+        return None
+
+    video = next((stream for stream in streams if stream.get("codec_type") == "video"), None)
+    audio = next((stream for stream in streams if stream.get("codec_type") == "audio"), None)
+    if video is None:
+        return None
+    return {
+        "video": {field: video.get(field) for field in SPLICE_VIDEO_FIELDS},
+        "audio": {field: audio.get(field) for field in SPLICE_AUDIO_FIELDS} if audio else None
+    }
+
+def splice_encode_args(params):
+    """원본 스트림 속성을 재현하는 재인코딩 구간 인코딩 인자 (재현할 수 없으면 None)"""
+    if not params:
+        return None
+    video, audio = params["video"], params["audio"]
+    profile = X264_PROFILES.get(video.get("profile"))
+    timescale = (video.get("time_base") or "").partition("/")[2]
+    if not profile or not video.get("pix_fmt") or not timescale.isdigit():
+        return None
+
+    args = ['-profile:v', profile, '-pix_fmt', video["pix_fmt"], '-video_track_timescale', timescale]
+    if video.get("level") and int(video["level"]) > 0:
+        args += ['-level:v', f'{int(video["level"]) / 10:.1f}']
+    if audio is None:
+        return args + ['-an']
+    # 스트림 복사 구간의 오디오와 같은 코덱으로만 이어붙일 수 있음
+    if audio.get("codec_name") != "aac" or not audio.get("sample_rate") or not audio.get("channels"):
+        return None
+    return args + ['-c:a', 'aac', '-ar', str(audio["sample_rate"]), '-ac', str(audio["channels"])]
+
+def splice_mismatch(source, head):
+    """원본과 재인코딩 구간의 스트림 속성 차이 목록 (일치하면 빈 목록)"""
+    if not source or not head:
+        return ["probe"]
+    mismatch = [f"video.{field}" for field in SPLICE_VIDEO_FIELDS if source["video"].get(field) != head["video"].get(field)]
+    if (source["audio"] is None) != (head["audio"] is None):
+        mismatch.append("audio")
+    elif source["audio"] is not None:
+        mismatch += [f"audio.{field}" for field in SPLICE_AUDIO_FIELDS if source["audio"].get(field) != head["audio"].get(field)]
+    return mismatch
+
+def _probe_keyframe_interval(file_path):
+    """앞부분 패킷 플래그로 평균 키프레임 간격(초) 측정 (디코딩 없음)"""
+    keyframe_times = probe_keyframes(file_path)
+    if not keyframe_times or len(keyframe_times) < 2:
+        return None
+    return (keyframe_times[-1] - keyframe_times[0]) / (len(keyframe_times) - 1)
+
+def _probe_with_ffprobe(file_path, ffprobe_path):
+    """ffprobe 컨테이너/스트림 헤더 조회"""
+    cmd = [
+        ffprobe_path, '-v', 'error',
+        '-select_streams', 'v:0',
+        '-show_entries', 'format=duration:stream=codec_name,width,height,avg_frame_rate,r_frame_rate,nb_frames,duration',
+        '-of', 'json',
+        file_path
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip() or "ffprobe 실패")
+
+    info = json.loads(result.stdout)
+    stream = (info.get("streams") or [{}])[0]
+    fps = _parse_frame_rate(stream.get("avg_frame_rate")) or _parse_frame_rate(stream.get("r_frame_rate"))
+    duration = float(info.get("format", {}).get("duration") or stream.get("duration") or 0)
+    frame_count = int(stream.get("nb_frames") or 0) or int(duration * fps)
+
+    return {
+        "duration": duration,
+        "fps": fps,
+        "frame_count": frame_count,
+        "width": int(stream.get("width") or 0),
+        "height": int(stream.get("height") or 0),
+        "codec": stream.get("codec_name"),
+        "keyframe_interval": _probe_keyframe_interval(file_path),
+        "probe_method": "ffprobe"
+    }
+
+def _probe_with_opencv(file_path):
+    """ffprobe가 없을 때 OpenCV 속성으로 조회 (키프레임 간격은 알 수 없음)"""
+    cap = cv2.VideoCapture(file_path)
+    try:
+        if not cap.isOpened():
+            raise RuntimeError("비디오를 열 수 없습니다")
+        fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
+        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        fourcc = int(cap.get(cv2.CAP_PROP_FOURCC))
+        codec = "".join(chr((fourcc >> 8 * i) & 0xFF) for i in range(4)).strip("\x00 ") or None
+        return {
+            "duration": frame_count / fps if fps else 0.0,
+            "fps": fps,
+            "frame_count": frame_count,
+            "width": int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            "height": int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            "codec": codec,
+            "keyframe_interval": None,
+            "probe_method": "opencv"
+        }
+    finally:
+        cap.release()
+
+def probe_video(file_path):
+    """비디오 길이/FPS/해상도/코덱/키프레임 간격 조회 (결과 캐시, 업로드·분석·쇼츠 공용)"""
+    stat = os.stat(file_path)
+    cache_key = (os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns)
+    if cache_key in probe_cache:
+        probe_cache.move_to_end(cache_key)
+        return probe_cache[cache_key]
+
+    ffprobe_path = shutil.which("ffprobe")
+    probe = None
+    if ffprobe_path:
+        try:
+            probe = _probe_with_ffprobe(file_path, ffprobe_path)
+        except Exception as e:
+            logger.warning(f"ffprobe 실패, OpenCV로 폴백: {e}")
+    if probe is None:
+        probe = _probe_with_opencv(file_path)
+
+    probe_cache[cache_key] = probe
+    if len(probe_cache) > PROBE_CACHE_SIZE:
+        probe_cache.popitem(last=False)
+    return probe
+
+async def probe_video_async(file_path):
+    """이벤트 루프를 막지 않도록 스레드에서 프로브 실행"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, probe_video, file_path)
+
+def generate_thumbnail(file_path, duration):
+    """검은 화면/단색이 아닌 대표 프레임으로 썸네일 생성"""
+    cap = cv2.VideoCapture(file_path)
+    best_frame = None
+    best_contrast = -1.0
+    try:
+        for ratio in THUMBNAIL_CANDIDATE_RATIOS:
+            cap.set(cv2.CAP_PROP_POS_MSEC, duration * ratio * 1000)
+            ret, frame = cap.read()
+            if not ret:
+                continue
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            brightness, contrast = float(gray.mean()), float(gray.std())
+            if contrast > best_contrast:
+                best_frame, best_contrast = frame, contrast
+            if brightness >= THUMBNAIL_MIN_BRIGHTNESS and contrast >= THUMBNAIL_MIN_CONTRAST:
+                best_frame = frame
+                break
+    finally:
+        cap.release()
+
+    if best_frame is None:
+        return None
+
+    height, width = best_frame.shape[:2]
+    if width > THUMBNAIL_WIDTH:
+        best_frame = cv2.resize(best_frame, (THUMBNAIL_WIDTH, int(height * THUMBNAIL_WIDTH / width)), interpolation=cv2.INTER_AREA)
+
+    thumbnail_filename = f"thumb_{os.path.basename(file_path)}.jpg"
+    cv2.imwrite(os.path.join(THUMBNAILS_DIR, thumbnail_filename), best_frame, [cv2.IMWRITE_JPEG_QUALITY, 85])
+    # 상대 경로로 변환
+    return f"/thumbnails/{thumbnail_filename}"
+
+def extract_video_metadata(file_path):
+    """비디오 메타데이터(길이, 썸네일, 미디어 정보) 추출"""
+    try:
+        probe = probe_video(file_path)
+        return {
+            "duration": format_duration(int(probe["duration"])),
+            "thumbnail": generate_thumbnail(file_path, probe["duration"]),
+            "media_info": probe
+        }
+    except Exception as e:
+        logger.error(f"Error extracting metadata: {e}")
+        return {"duration": "00:00", "thumbnail": None, "media_info": None}
+
+async def extract_video_metadata_async(file_path):
+    """이벤트 루프를 막지 않도록 스레드에서 메타데이터 추출"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, extract_video_metadata, file_path)
+
+def _sprite_image_extension():
+    """WebP 인코더가 있으면 WebP, 없으면 JPEG"""
+    return ".webp" if cv2.haveImageWriter("probe.webp") else ".jpg"
+
+def generate_sprite_sheet(frame_store, prefix):
+    """저장된 분석 프레임으로 타일형 스프라이트 시트와 타임스탬프 인덱스 생성"""
+    stride = max(1, math.ceil(len(frame_store) / SPRITE_MAX_TILES))
+    sampled = list(range(0, len(frame_store), stride))
+    tile_w, tile_h = SPRITE_TILE_SIZE
+    tiles_per_sheet = SPRITE_COLUMNS * SPRITE_ROWS
+    extension = _sprite_image_extension()
+    quality_flag = cv2.IMWRITE_WEBP_QUALITY if extension == ".webp" else cv2.IMWRITE_JPEG_QUALITY
+
+    sheets = []
+    tiles = []
+    for sheet_index, start in enumerate(range(0, len(sampled), tiles_per_sheet)):
+        batch = sampled[start:start + tiles_per_sheet]
+        rows = math.ceil(len(batch) / SPRITE_COLUMNS)
+        sheet = np.zeros((rows * tile_h, SPRITE_COLUMNS * tile_w, 3), dtype=np.uint8)
+
+        for i, frame_index in enumerate(batch):
+            row, col = divmod(i, SPRITE_COLUMNS)
+            x, y = col * tile_w, row * tile_h
+            sheet[y:y + tile_h, x:x + tile_w] = cv2.resize(frame_store.decode(frame_index, reduced=True), (tile_w, tile_h), interpolation=cv2.INTER_AREA)
+            tiles.append({"t": round(frame_store.timestamps[frame_index], 2), "sheet": sheet_index, "x": x, "y": y})
+
+        sheet_filename = f"sprite_{prefix}_{sheet_index}{extension}"
+        cv2.imwrite(os.path.join(THUMBNAILS_DIR, sheet_filename), sheet, [quality_flag, SPRITE_QUALITY])
+        sheets.append(f"/thumbnails/{sheet_filename}")
+
+    sprite_index = {
+        "tile_width": tile_w,
+        "tile_height": tile_h,
+        "columns": SPRITE_COLUMNS,
+        "interval": frame_store.timestamps[sampled[1]] - frame_store.timestamps[sampled[0]] if len(sampled) > 1 else 0.0,
+        "sheets": sheets,
+        "tiles": tiles
+    }
+
+    index_filename = f"sprite_{prefix}.json"
+    with open(os.path.join(THUMBNAILS_DIR, index_filename), "w", encoding="utf-8") as f:
+        json.dump(sprite_index, f)
+    sprite_index["index"] = f"/thumbnails/{index_filename}"
+
+    logger.info(f"스프라이트 시트 생성: {len(sheets)}장, {len(tiles)}개 타일")
+    return sprite_index
+
+def save_scene_thumbnail(scene_frames, prefix, scene_id):
+    """장면 중간 프레임을 썸네일로 저장 (이미 인코딩된 JPEG 그대로 기록)"""
+    if not scene_frames:
+        return None
+    frame = scene_frames[len(scene_frames) // 2]
+    thumbnail_filename = f"scene_{prefix}_{scene_id}.jpg"
+    with open(os.path.join(THUMBNAILS_DIR, thumbnail_filename), "wb") as f:
+        f.write(frame['jpeg'])
+    return f"/thumbnails/{thumbnail_filename}"
+
+# 얼굴 검출기 (최초 사용 시 한 번만 로드, 캐스케이드 파일이 없으면 False)
+face_detector = None
+
+def get_face_detector():
+    """OpenCV Haar 얼굴 검출기 반환 (사용 불가 시 None)"""
+    global face_detector
+    if face_detector is None:
+        cascade_path = os.path.join(getattr(getattr(cv2, "data", None), "haarcascades", ""), "haarcascade_frontalface_default.xml")
+        detector = cv2.CascadeClassifier(cascade_path) if os.path.exists(cascade_path) else None
+        face_detector = detector if detector is not None and not detector.empty() else False
+        if not face_detector:
+            logger.info("얼굴 검출기를 찾을 수 없어 움직임/에지 기반 주목 영역만 사용합니다")
+    return face_detector or None
+
+def compute_saliency_track(frame_store):
+    """저장된 분석 프레임을 1/4 크기로 디코딩해 프레임별 주목 영역 가로 중심(0~1) 계산 (에지 + 움직임 + 얼굴)"""
+    width, height = SALIENCY_FRAME_SIZE
+    columns = (np.arange(width, dtype=np.float32) + 0.5) / width
+    detector = get_face_detector()
+    centers = []
+    prev_gray = None
+
+    for i in range(len(frame_store)):
+        small = cv2.resize(frame_store.decode(i, reduced=True), (width, height), interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+
+        # 에지 세기를 기본 주목도로, 직전 프레임과의 차이를 움직임 주목도로 사용 (열 방향 합만 필요)
+        edges = cv2.magnitude(cv2.Sobel(gray, cv2.CV_32F, 1, 0), cv2.Sobel(gray, cv2.CV_32F, 0, 1)).sum(axis=0)
+        profile = edges / max(float(edges.sum()), 1e-6)
+        if prev_gray is not None:
+            motion = cv2.absdiff(gray, prev_gray).astype(np.float32).sum(axis=0)
+            if motion.sum() > width * height:
+                profile += SALIENCY_MOTION_WEIGHT * motion / float(motion.sum())
+        prev_gray = gray
+
+        if detector is not None:
+            faces = detector.detectMultiScale(cv2.resize(gray, (width * 2, height * 2)), scaleFactor=1.2, minNeighbors=4, minSize=(16, 16))
+            for (fx, _, fw, _) in faces:
+                left, right = fx // 2, max(fx // 2 + 1, (fx + fw) // 2)
+                profile[left:right] += SALIENCY_FACE_WEIGHT / len(faces) / (right - left)
+
+        total = float(profile.sum())
+        centers.append(round(float((profile * columns).sum() / total), 3) if total > 0 else 0.5)
+
+    timestamps = frame_store.timestamps
+    interval = timestamps[1] - timestamps[0] if len(timestamps) > 1 else 0.0
+    return with_sample_times({
+        "start": timestamps[0] if timestamps else 0.0,
+        "interval": interval,
+        "center_x": centers
+    }, timestamps)
+
+def compute_motion_timeline(timestamps, small_frames, scene_changes):
+    """축소 흑백 프레임 스택의 연속 차이로 프레임별 움직임 점수(0~1) 계산 (장면 전환 지점은 이웃 값으로 대체)"""
+    if len(small_frames) < 2:
+        return None
+    stack = np.stack(small_frames).astype(np.int16)
+    scores = np.concatenate([[0.0], np.abs(np.diff(stack, axis=0)).mean(axis=(1, 2)) / 255.0])
+
+    # 장면 전환 프레임의 차이는 움직임이 아니므로 직전/직후 값 평균으로 대체
+    cuts = sorted(i for i in scene_changes if i > 0)
+    cut_mask = np.zeros(len(scores), dtype=bool)
+    cut_mask[[0, *cuts]] = True
+    valid = np.flatnonzero(~cut_mask)
+    if len(valid):
+        scores[cut_mask] = np.interp(np.flatnonzero(cut_mask), valid, scores[valid])
+
+    return with_sample_times({
+        "start": timestamps[0],
+        "interval": timestamps[1] - timestamps[0],
+        "scores": np.round(scores, 4).tolist(),
+        "cuts": [round(timestamps[i], 2) for i in cuts]
+    }, timestamps)
+
+def with_sample_times(timeline, timestamps):
+    """샘플 간격이 균일하지 않으면 (적응형 샘플링) 시각 목록을 함께 기록"""
+    if len(timestamps) > 2 and np.ptp(np.diff(timestamps)) > 1e-3:
+        timeline["timestamps"] = [round(t, 3) for t in timestamps]
+    return timeline
+
+def timeline_sample_times(timeline, count):
+    """타임라인 샘플별 시각 배열 (균일 간격이면 start + i × interval)"""
+    if timeline.get("timestamps"):
+        return np.asarray(timeline["timestamps"], dtype=np.float64)
+    return timeline.get("start", 0.0) + np.arange(count) * timeline.get("interval", 0.0)
+
+def scene_motion_stats(motion_timeline, start_time, end_time):
+    """장면 구간의 움직임 통계 (평균, 최대, 표준편차)"""
+    if not motion_timeline or not motion_timeline.get("scores") or motion_timeline.get("interval", 0) <= 0:
+        return None
+    scores = np.asarray(motion_timeline["scores"])
+    times = timeline_sample_times(motion_timeline, len(scores))
+    first = int(np.searchsorted(times, start_time - 1e-6))
+    last = max(first + 1, int(np.searchsorted(times, end_time - 1e-6)))
+    window = scores[first:last]
+    if len(window) == 0:
+        return None
+    return {
+        "mean": round(float(window.mean()), 4),
+        "peak": round(float(window.max()), 4),
+        "std": round(float(window.std()), 4)
+    }
+
+def _smooth_track(values, dt):
+    """양방향 지수 평활화 후 최대 패닝 속도 제한 (위상 지연 없음)"""
+    alpha = dt / (REFRAME_SMOOTHING_SECONDS + dt)
+    smoothed = values.copy()
+    for i in range(1, len(smoothed)):
+        smoothed[i] = smoothed[i - 1] + alpha * (smoothed[i] - smoothed[i - 1])
+    for i in range(len(smoothed) - 2, -1, -1):
+        smoothed[i] = smoothed[i + 1] + alpha * (smoothed[i] - smoothed[i + 1])
+
+    max_step = REFRAME_MAX_PAN_SPEED * dt
+    for i in range(1, len(smoothed)):
+        smoothed[i] = smoothed[i - 1] + np.clip(smoothed[i] - smoothed[i - 1], -max_step, max_step)
+    return smoothed
+
+def build_crop_track(saliency_track, start, end, src_width, src_height):
+    """클립 구간의 9:16 크롭 위치 트랙 생성 (클립 기준 시각, 원본 픽셀 x) - 이미 세로 영상이면 None"""
+    aspect_w, aspect_h = REFRAME_ASPECT
+    crop_height = src_height - src_height % 2
+    crop_width = int(crop_height * aspect_w / aspect_h) // 2 * 2
+    if not src_width or not crop_height or crop_width >= src_width:
+        return None
+
+    dt = 1.0 / REFRAME_COMMAND_RATE
+    times = np.arange(0.0, max(end - start, dt), dt)
+    centers = (saliency_track or {}).get("center_x") or []
+    interval = (saliency_track or {}).get("interval") or 0.0
+    if len(centers) > 1 and interval > 0:
+        track_times = timeline_sample_times(saliency_track, len(centers))
+        values = _smooth_track(np.interp(start + times, track_times, centers), dt)
+    else:
+        # 주목 영역 정보가 없으면 중앙 고정 크롭
+        values = np.full(len(times), 0.5)
+
+    max_x = src_width - crop_width
+    xs = np.clip(values * src_width - crop_width / 2, 0, max_x).astype(int) // 2 * 2
+
+    # 위치가 바뀌는 시점만 명령으로 남김
+    points = [(0.0, int(xs[0]))]
+    for t, x in zip(times[1:], xs[1:]):
+        if x != points[-1][1]:
+            points.append((round(float(t), 3), int(x)))
+
+    return {"width": crop_width, "height": crop_height, "points": points}
+
+def write_crop_commands(path, points):
+    """크롭 위치 트랙을 FFmpeg sendcmd 명령 파일로 기록"""
+    with open(path, "w", encoding="utf-8") as f:
+        for t, x in points[1:]:
+            f.write(f"{t:.3f} crop x {x};\n")
+
+def build_reframe_filter(crop, command_path=None):
+    """세로 리프레이밍 필터 그래프 (sendcmd로 크롭 위치 갱신 → 크롭 → 출력 해상도 스케일)"""
+    out_w, out_h = REFRAME_OUTPUT_SIZE
+    scale = f"scale={out_w}:{out_h}:force_original_aspect_ratio=decrease,pad={out_w}:{out_h}:(ow-iw)/2:(oh-ih)/2,setsar=1"
+    if not crop:
+        return scale
+
+    filters = []
+    if command_path:
+        escaped = command_path.replace("\\", "/").replace(":", "\\:").replace("'", "\\'")
+        filters.append(f"sendcmd=f='{escaped}'")
+    filters.append(f"crop={crop['width']}:{crop['height']}:{crop['points'][0][1]}:0")
+    filters.append(scale)
+    return ",".join(filters)
+
+def _k_weighting_power(freqs):
+    """EBU R128 K-가중 필터(48kHz 기준 계수)의 주파수별 파워 이득"""
+    z = np.exp(-2j * np.pi * freqs / 48000.0)
+    shelf = (1.53512485958697 - 2.69169618940638 * z + 1.19839281085285 * z ** 2) / (1 - 1.69065929318241 * z + 0.73248077421585 * z ** 2)
+    highpass = (1 - 2 * z + z ** 2) / (1 - 1.99004745483398 * z + 0.99007225036621 * z ** 2)
+    return np.abs(shelf * highpass) ** 2
+
+def _to_db(power):
+    return np.maximum(10 * np.log10(np.maximum(power, 1e-12)), AUDIO_FLOOR_DB)
+
+def analyze_audio_track(video_path):
+    """오디오를 모노 PCM으로 스트리밍 디코딩해 초당 RMS/라우드니스(LUFS)/온셋 밀도 타임라인 계산 (오디오 없으면 None)"""
+    ffmpeg_path = shutil.which("ffmpeg")
+    if not ffmpeg_path:
+        return None
+
+    sr = AUDIO_SAMPLE_RATE
+    cmd = [ffmpeg_path, '-v', 'error', '-i', video_path, '-vn', '-ac', '1', '-ar', str(sr), '-f', 'f32le', '-']
+    process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+
+    # 1초 블록 파워 계산용 주파수 가중치 (rfft 양쪽 대칭 성분 보정 포함)
+    spectrum_weights = np.full(sr // 2 + 1, 2.0)
+    spectrum_weights[[0, -1]] = 1.0
+    k_weights = spectrum_weights * _k_weighting_power(np.fft.rfftfreq(sr, 1.0 / sr))
+    window = np.hanning(AUDIO_ONSET_FRAME).astype(np.float32)
+
+    mean_squares, k_mean_squares, flux, envelope = [], [], [], []
+    prev_magnitude = None
+    try:
+        while True:
+            data = process.stdout.read(sr * AUDIO_BLOCK_SECONDS * 4)
+            if not data:
+                break
+            samples = np.frombuffer(data, dtype=np.float32)
+            # 마지막 자투리 구간은 1초 단위로 0 채움
+            samples = np.pad(samples, (0, (-len(samples)) % sr))
+            seconds = samples.reshape(-1, sr)
+
+            mean_squares.append(np.mean(seconds.astype(np.float64) ** 2, axis=1))
+            envelope.append(np.mean(samples.reshape(-1, sr // AUDIO_ENVELOPE_RATE).astype(np.float64) ** 2, axis=1))
+            power = np.abs(np.fft.rfft(seconds, axis=1)) ** 2
+            k_mean_squares.append((power * k_weights).sum(axis=1) / sr ** 2)
+
+            # 짧은 프레임 스펙트럼의 양의 변화량 (spectral flux) - 블록 경계도 이어서 계산
+            frames = samples.reshape(-1, AUDIO_ONSET_FRAME) * window
+            magnitude = np.log1p(100 * np.abs(np.fft.rfft(frames, axis=1)))
+            previous = np.vstack([prev_magnitude if prev_magnitude is not None else magnitude[:1], magnitude[:-1]])
+            flux.append(np.maximum(magnitude - previous, 0).sum(axis=1))
+            prev_magnitude = magnitude[-1:]
+    finally:
+        process.stdout.close()
+        process.wait()
+
+    if not mean_squares:
+        return None
 
-        return {
-            "duration": format_duration(duration),
-            "thumbnail": thumbnail_path
-        }
-    except Exception as e:
-        print(f"Error extracting metadata: {e}")
-        return {"duration": "00:00", "thumbnail": None}
+    mean_squares = np.concatenate(mean_squares)
+    k_mean_squares = np.concatenate(k_mean_squares)
+    flux = np.concatenate(flux)
+    loudness = -0.691 + _to_db(k_mean_squares)
+
+    # 온셋: 임계값을 넘는 flux 국소 최대값을 초 단위로 집계
+    threshold = np.median(flux) + AUDIO_ONSET_SENSITIVITY * np.mean(np.abs(flux - np.median(flux)))
+    peaks = np.flatnonzero((flux[1:-1] > threshold) & (flux[1:-1] > flux[:-2]) & (flux[1:-1] >= flux[2:])) + 1
+    onset_density = np.bincount(peaks * AUDIO_ONSET_FRAME // sr, minlength=len(mean_squares))[:len(mean_squares)]
+
+    # 통합 라우드니스 (절대 -70 LUFS, 상대 -10 LU 게이팅, 1초 블록 근사)
+    gated = k_mean_squares[loudness > -70]
+    integrated = None
+    if len(gated):
+        relative_gate = -0.691 + 10 * np.log10(gated.mean()) - 10
+        gated = gated[-0.691 + 10 * np.log10(gated) > relative_gate]
+        integrated = round(float(-0.691 + 10 * np.log10(gated.mean())), 1)
+
+    return {
+        "sample_rate": sr,
+        "interval": 1.0,
+        "integrated_lufs": integrated,
+        "rms_db": np.round(_to_db(mean_squares), 1).tolist(),
+        "loudness_lufs": np.round(loudness, 1).tolist(),
+        "onset_density": onset_density.astype(int).tolist(),
+        "envelope_rate": AUDIO_ENVELOPE_RATE,
+        "envelope_db": base64.b64encode(np.round(_to_db(np.concatenate(envelope))).astype(np.int8).tobytes()).decode("ascii")
+    }
+
+def audio_excitement_profile(audio_timeline):
+    """오디오 타임라인을 초당 0~1 흥분도로 변환 (라우드니스/온셋 순위 기반 정규화)"""
+    if not audio_timeline or not audio_timeline.get("loudness_lufs"):
+        return None
+    loudness = np.asarray(audio_timeline["loudness_lufs"], dtype=np.float64)
+    onsets = np.asarray(audio_timeline.get("onset_density") or np.zeros(len(loudness)), dtype=np.float64)
+
+    def rank(values):
+        if len(values) < 2 or values.max() == values.min():
+            return np.zeros(len(values))
+        return np.argsort(np.argsort(values, kind="stable"), kind="stable") / (len(values) - 1)
+
+    return 0.7 * rank(loudness) + 0.3 * rank(onsets)
+
+def scene_audio_excitement(scene, excitement):
+    """장면 구간의 평균 오디오 흥분도"""
+    time_range = scene.get("time_range", {})
+    start = max(0, int(float(time_range.get("start", 0))))
+    end = max(start + 1, int(math.ceil(float(time_range.get("end", 0)))))
+    window = excitement[start:end]
+    return float(window.mean()) if len(window) else 0.0
+
+def find_pause_points(audio_timeline):
+    """에너지 기반 음성/무음 판정으로 무음 구간 중심 시각 배열 계산 (엔벨로프 없으면 None, 쉼이 없으면 빈 배열)"""
+    if not audio_timeline or not audio_timeline.get("envelope_db"):
+        return None
+    rate = audio_timeline.get("envelope_rate", AUDIO_ENVELOPE_RATE)
+    energy = np.frombuffer(base64.b64decode(audio_timeline["envelope_db"]), dtype=np.int8).astype(np.float32)
+    if len(energy) == 0:
+        return None
+
+    # 절대적으로 조용하면서 트랙의 평소 레벨보다 충분히 낮은 구간만 무음으로 판정
+    # (트랙 자체의 가장 조용한 부분 기준이면 쉼 없는 연속 오디오에서도 항상 "무음"이 생김)
+    threshold = min(PAUSE_MAX_DB, float(np.median(energy)) - PAUSE_MEDIAN_DROP_DB)
+    quiet = energy <= threshold
+    if quiet.mean() >= PAUSE_MAX_COVERAGE:
+        return np.array([])
+
+    silent = np.concatenate([[False], quiet, [False]])
+    edges = np.flatnonzero(np.diff(silent.astype(np.int8)))
+    starts, ends = edges[::2], edges[1::2]
+    long_enough = (ends - starts) >= PAUSE_MIN_SECONDS * rate
+    return (starts[long_enough] + ends[long_enough]) / 2.0 / rate
+
+def snap_clip_boundaries(clips, audio_timeline, video_duration, tolerance):
+    """클립 시작/끝을 허용 오차 내 가장 가까운 무음 지점으로 이동 (겹침 없이)"""
+    pauses = find_pause_points(audio_timeline) if tolerance > 0 else None
+    if pauses is None or len(pauses) == 0:
+        return clips
+
+    def nearest_pause(t):
+        i = bisect.bisect_left(pauses, t)
+        candidates = [pauses[j] for j in (i - 1, i) if 0 <= j < len(pauses) and abs(pauses[j] - t) <= tolerance]
+        return float(min(candidates, key=lambda p: abs(p - t))) if candidates else None
+
+    ordered = sorted(clips, key=lambda clip: clip["start_time"])
+    for i, clip in enumerate(ordered):
+        lower = ordered[i - 1]["end_time"] if i > 0 else 0.0
+        upper = ordered[i + 1]["start_time"] if i + 1 < len(ordered) else (video_duration or float("inf"))
+        start, end = clip["start_time"], clip["end_time"]
+
+        new_start, new_end = nearest_pause(start), nearest_pause(end)
+        new_start = start if new_start is None or new_start < lower else new_start
+        new_end = end if new_end is None or new_end > upper else new_end
+        if new_end - new_start < 1.0:
+            continue
+
+        clip.update({
+            "start_time": round(new_start, 3),
+            "end_time": round(new_end, 3),
+            "duration": round(new_end - new_start, 3),
+            "boundary_snap": {"start": round(new_start - start, 3), "end": round(new_end - end, 3)}
+        })
+    return clips
+
+def summarize_audio(audio_timeline, top_n=3, min_gap=5):
+    """오디오 요약 (통합 라우드니스, 평균 온셋 밀도, 가장 큰 순간들)"""
+    if not audio_timeline or not audio_timeline.get("loudness_lufs"):
+        return None
+    loudness = audio_timeline["loudness_lufs"]
+    peaks = []
+    for second in sorted(range(len(loudness)), key=lambda i: loudness[i], reverse=True):
+        if len(peaks) == top_n:
+            break
+        if all(abs(second - peak["time"]) >= min_gap for peak in peaks):
+            peaks.append({"time": second, "loudness_lufs": loudness[second]})
+    onsets = audio_timeline.get("onset_density") or []
+    return {
+        "integrated_lufs": audio_timeline.get("integrated_lufs"),
+        "average_onset_density": round(sum(onsets) / len(onsets), 2) if onsets else 0,
+        "loudest_moments": sorted(peaks, key=lambda peak: peak["time"])
+    }
 
 def format_duration(seconds):
     """초를 HH:MM:SS 형식으로 변환"""
@@ -877,6 +2890,203 @@ def format_duration(seconds):
 # 청크 업로드용 임시 저장소
 chunk_uploads = {}
 
+# 콘텐츠 해시(SHA-256) → 저장된 원본 파일 정보 (중복 업로드 제거용)
+content_index = {}
+
+# 중복 제거 및 분석 결과 재사용 통계
+dedup_stats = {
+    "uploads": 0,
+    "duplicate_uploads": 0,
+    "bytes_saved": 0,
+    "analysis_cache_hits": 0,
+    "analysis_cache_misses": 0
+}
+
+def store_uploaded_file(temp_path, final_path, content_hash, file_size):
+    """업로드 파일을 콘텐츠 해시 기준으로 저장 (동일 파일이 이미 있으면 기존 파일 재사용)"""
+    dedup_stats["uploads"] += 1
+    blob = content_index.get(content_hash)
+
+    if blob and os.path.exists(blob["file_path"]):
+        os.remove(temp_path)
+        blob["ref_count"] += 1
+        dedup_stats["duplicate_uploads"] += 1
+        dedup_stats["bytes_saved"] += file_size
+        logger.info(f"중복 업로드 감지, 기존 파일 재사용: {blob['file_path']}")
+        return blob, True
+
+    shutil.move(temp_path, final_path)
+    blob = {"file_path": final_path, "file_size": file_size, "ref_count": 1}
+    content_index[content_hash] = blob
+    return blob, False
+
+def release_stored_file(video):
+    """비디오가 참조하는 원본 파일 참조 해제 (마지막 참조일 때만 파일 삭제)"""
+    blob = content_index.get(video.get("content_hash"))
+    if blob and blob["file_path"] == video["file_path"]:
+        blob["ref_count"] -= 1
+        if blob["ref_count"] > 0:
+            return
+        del content_index[video["content_hash"]]
+
+    if os.path.exists(video["file_path"]):
+        os.remove(video["file_path"])
+
+# 파싱된 분석 결과 LRU 캐시 ((비디오 ID, 분석 버전) → 결과 dict, 읽기 전용으로 공유)
+result_cache = OrderedDict()
+RESULT_CACHE_SIZE = 32
+
+# 분석 결과 캐시 통계
+result_cache_stats = {"hits": 0, "misses": 0}
+
+def _cache_result(key, result):
+    result_cache[key] = result
+    result_cache.move_to_end(key)
+    while len(result_cache) > RESULT_CACHE_SIZE:
+        result_cache.popitem(last=False)
+
+def invalidate_result_cache(video_id):
+    """해당 비디오의 캐시된 분석 결과 전부 제거"""
+    for key in [key for key in result_cache if key[0] == video_id]:
+        del result_cache[key]
+
+async def save_analysis_result(video, result, result_id, **fields):
+    """분석 결과를 고유 ID 파일로 저장하고 버전 증가 후 캐시 갱신 (이전 버전 캐시 무효화)"""
+    result_file_path = os.path.join(RESULTS_DIR, f"analysis_{result_id}.json")
+    started = time.perf_counter()
+    content = await asyncio.to_thread(json.dumps, result, ensure_ascii=False, indent=2)
+    async with aiofiles.open(result_file_path, 'w', encoding='utf-8') as f:
+        await f.write(content)
+    stage_seconds.observe(time.perf_counter() - started, "result_write")
+
+    version = video.get("analysis_version", 0) + 1
+    invalidate_result_cache(video["id"])
+    # 분석 중 삭제된 비디오의 결과는 캐시에 남기지 않음
+    if find_video(video["id"]) is video:
+        _cache_result((video["id"], version), result)
+    update_video(video, result_id=result_id, result_file=result_file_path, analysis_version=version, **fields)
+    return result_file_path
+
+async def save_analysis_trace(video, trace, result_id, profiler=None, **fields):
+    """성능 추적(과 샘플링 프로파일)을 결과 JSON 옆에 저장 (실패해도 분석 결과에는 영향 없음)"""
+    try:
+        if profiler is not None:
+            profile_path = os.path.join(RESULTS_DIR, f"analysis_{result_id}.folded")
+            folded = profiler.stop()
+            async with aiofiles.open(profile_path, 'w', encoding='utf-8') as f:
+                await f.write(folded)
+            fields["profile"] = {"samples": profiler.samples, "interval": profiler.interval, "file": profile_path}
+        trace_path = os.path.join(RESULTS_DIR, f"analysis_{result_id}.trace.json")
+        content = json.dumps(trace.to_dict(**fields), ensure_ascii=False, indent=2)
+        async with aiofiles.open(trace_path, 'w', encoding='utf-8') as f:
+            await f.write(content)
+        update_video(video, trace_file=trace_path, profile_file=fields.get("profile", {}).get("file"))
+    except Exception as e:
+        logger.warning(f"성능 추적 저장 실패: {e}")
+
+async def load_analysis_result(video):
+    """분석 결과 조회 (캐시 적중 시 디스크 읽기/JSON 파싱 없음)"""
+    if not video.get("result_file"):
+        return None
+    key = (video["id"], video.get("analysis_version", 0))
+    result = result_cache.get(key)
+    if result is not None:
+        result_cache.move_to_end(key)
+        result_cache_stats["hits"] += 1
+        return result
+
+    result_cache_stats["misses"] += 1
+    async with aiofiles.open(video["result_file"], 'r', encoding='utf-8') as f:
+        content = await f.read()
+    result = await asyncio.to_thread(json.loads, content)
+    invalidate_result_cache(video["id"])
+    _cache_result(key, result)
+    return result
+
+def find_analyzed_duplicate(content_hash, exclude_id=None):
+    """같은 콘텐츠의 분석 완료 비디오 검색"""
+    if not content_hash:
+        return None
+    return next(
+        (
+            v for v in videos_db
+            if v.get("content_hash") == content_hash
+            and v["id"] != exclude_id
+            and v["status"] == "completed"
+            and v.get("result_file")
+        ),
+        None
+    )
+
+def link_analysis_artifacts(video, source):
+    """동일 콘텐츠 비디오의 분석/쇼츠 결과를 연결 (재분석 없이 즉시 완료)"""
+    fields = {
+        "status": "completed",
+        "progress": 100,
+        "result_id": source.get("result_id"),
+        "result_file": source["result_file"],
+        "analysis_version": video.get("analysis_version", 0) + 1,
+        "total_scenes": source.get("total_scenes", 0),
+        "dominant_mood": source.get("dominant_mood", "unknown"),
+        "analysis_source_id": source["id"],
+        "trace_file": source.get("trace_file"),
+        "profile_file": source.get("profile_file")
+    }
+    if source.get("shorts_status") == "completed":
+        fields.update({
+            "shorts_status": "completed",
+            "shorts_progress": 100,
+            "shorts_file": source["shorts_file"],
+            "shorts_clips_count": source.get("shorts_clips_count", 0)
+        })
+
+    # 원본 비디오의 캐시된 결과를 그대로 공유 (같은 파일이므로 다시 파싱할 필요 없음)
+    cached = result_cache.get((source["id"], source.get("analysis_version", 0)))
+    if cached is not None:
+        invalidate_result_cache(video["id"])
+        _cache_result((video["id"], fields["analysis_version"]), cached)
+    update_video(video, **fields)
+
+async def create_video_record(original_name, filename, blob, content_hash, is_duplicate):
+    """업로드된 파일로 비디오 레코드 생성 (중복이면 메타데이터/분석 결과 재사용)"""
+    existing = None
+    if is_duplicate:
+        existing = next((v for v in videos_db if v.get("content_hash") == content_hash), None)
+
+    if existing:
+        metadata = {
+            "duration": existing["duration"],
+            "thumbnail": existing["thumbnail"],
+            "media_info": existing.get("media_info")
+        }
+    else:
+        metadata = await extract_video_metadata_async(blob["file_path"])
+
+    video_info = {
+        "id": allocate_video_id(),
+        "filename": filename,
+        "original_name": original_name,
+        "file_path": blob["file_path"],
+        "file_size": blob["file_size"],
+        "content_hash": content_hash,
+        "uploaded_at": datetime.now().isoformat(),
+        "status": "uploaded",  # uploaded, analyzing, completed, failed
+        "duration": metadata["duration"],
+        "thumbnail": metadata["thumbnail"],
+        "media_info": metadata["media_info"]
+    }
+    if existing:
+        video_info["duplicate_of"] = existing["id"]
+
+    register_video(video_info)
+
+    source = find_analyzed_duplicate(content_hash, exclude_id=video_info["id"])
+    if source:
+        link_analysis_artifacts(video_info, source)
+        dedup_stats["analysis_cache_hits"] += 1
+
+    return video_info
+
 @app.get("/")
 async def root():
     """API 상태 확인"""
@@ -888,13 +3098,174 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    """헬스 체크"""
-    return {"status": "healthy", "timestamp": datetime.now().isoformat()}
+    """헬스 체크 (선택된 디코더와 측정 디코딩 fps 포함)"""
+    decoder = {
+        "name": hwaccel_state["name"],
+        "fps": hwaccel_state["fps"],
+        "candidates": hwaccel_state["candidates"],
+        "failures": hwaccel_state["failures"][-5:]
+    } if hwaccel_state["probed"] else {"name": None, "probing": True}
+    return {"status": "healthy", "timestamp": datetime.now().isoformat(), "decoder": decoder}
+
+def _gauge_lines(name, help_text, values, label=None):
+    """게이지 지표 텍스트 (values: {라벨 값: 값}, 라벨 없으면 {None: 값})"""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+    for label_value, value in values.items():
+        labels = _metric_labels(label, label_value)
+        lines.append(f"{name}{{{labels}}} {value}" if labels else f"{name} {value}")
+    return lines
+
+def _hit_ratio(hits, misses):
+    return round(hits / (hits + misses), 4) if hits + misses else 0
+
+@app.get("/metrics")
+async def get_metrics():
+    """단계별 지연 히스토그램, Ollama 토큰 속도, 캐시 적중률, 폴백 횟수, 진행 중 작업 (Prometheus 텍스트 형식)"""
+    analyses = sum(1 for video in videos_db if video.get("status") == "analyzing")
+    shorts = sum(1 for video in videos_db if video.get("shorts_status") == "generating")
+    lines = [
+        *stage_seconds.render(),
+        *ollama_tokens_per_second.render(),
+        *ollama_requests.render(),
+        *parse_results.render(),
+        *fallback_analyses.render(),
+        *_gauge_lines("eodi_jobs_in_flight", "진행 중인 작업 수", {"analysis": analyses, "shorts": shorts, "upload": len(chunk_uploads)}, "kind"),
+        *_gauge_lines("eodi_ollama_requests_in_flight", "응답을 기다리는 Ollama 호출 수", {None: ollama_in_flight}),
+        # Ollama는 OLLAMA_NUM_PARALLEL(1)개씩 처리하므로 그 이상은 서버 쪽 대기열에 쌓인 호출
+        *_gauge_lines("eodi_ollama_queue_depth", "Ollama 서버 대기열에 있는 호출 수 (추정)", {None: max(0, ollama_in_flight - int(os.environ.get("OLLAMA_NUM_PARALLEL", "1")))}),
+        *_gauge_lines("eodi_event_subscribers", "SSE 구독자 수", {None: len(event_broker.subscribers)}),
+        "# HELP eodi_cache_requests_total 캐시 조회 결과별 횟수",
+        "# TYPE eodi_cache_requests_total counter",
+        f'eodi_cache_requests_total{{cache="result",result="hit"}} {result_cache_stats["hits"]}',
+        f'eodi_cache_requests_total{{cache="result",result="miss"}} {result_cache_stats["misses"]}',
+        f'eodi_cache_requests_total{{cache="analysis_dedup",result="hit"}} {dedup_stats["analysis_cache_hits"]}',
+        f'eodi_cache_requests_total{{cache="analysis_dedup",result="miss"}} {dedup_stats["analysis_cache_misses"]}',
+        *_gauge_lines("eodi_cache_hit_ratio", "캐시 적중률", {
+            "result": _hit_ratio(result_cache_stats["hits"], result_cache_stats["misses"]),
+            "analysis_dedup": _hit_ratio(dedup_stats["analysis_cache_hits"], dedup_stats["analysis_cache_misses"])
+        }, "cache"),
+    ]
+    return Response("\n".join(lines) + "\n", media_type="text/plain; version=0.0.4; charset=utf-8")
+
+def format_sse(event):
+    """이벤트를 SSE 와이어 포맷으로 변환"""
+    payload = json.dumps(event["data"], ensure_ascii=False)
+    return f"id: {event['id']}\nevent: {event['event']}\ndata: {payload}\n\n"
+
+@app.get("/events")
+async def stream_events(request: Request, video_id: Optional[int] = None, last_event_id: int = 0):
+    """
+    작업 상태 이벤트 스트림 (Server-Sent Events)
+
+    - video.created / video.updated / video.deleted: 비디오 레코드 변경
+    - extraction.progress: 프레임 추출 진행
+    - scene.completed: 장면별 분석 완료
+    - Last-Event-ID 헤더 (또는 last_event_id 파라미터) 이후 이벤트 재전송
+    """
+    header_last_id = request.headers.get("last-event-id")
+    if header_last_id and header_last_id.isdigit():
+        last_event_id = int(header_last_id)
+
+    def matches(event):
+        return video_id is None or event["data"].get("video_id") == video_id
+
+    async def event_stream():
+        subscriber, replay, missed = event_broker.subscribe(last_event_id)
+        try:
+            yield "retry: 3000\n\n"
+            if missed:
+                # 재전송 버퍼를 벗어난 경우 클라이언트가 목록을 다시 조회하도록 알림
+                yield format_sse({"id": event_broker.last_event_id, "event": "resync", "data": {"revision": videos_revision}})
+            for event in replay:
+                if matches(event):
+                    yield format_sse(event)
+
+            while True:
+                if await request.is_disconnected():
+                    break
+                try:
+                    event = await asyncio.wait_for(subscriber.get(), timeout=SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if event is None:
+                    break
+                if matches(event):
+                    yield format_sse(event)
+        finally:
+            event_broker.unsubscribe(subscriber)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+def mark_chunk_received(bitmap, chunk_index):
+    """청크 수신 비트 설정 (이미 설정되어 있었으면 False)"""
+    byte_index, bit = divmod(chunk_index, 8)
+    mask = 1 << bit
+    if bitmap[byte_index] & mask:
+        return False
+    bitmap[byte_index] |= mask
+    return True
+
+def is_chunk_received(bitmap, chunk_index):
+    """청크 수신 여부 확인"""
+    byte_index, bit = divmod(chunk_index, 8)
+    return bool(bitmap[byte_index] & (1 << bit))
+
+def missing_chunks(upload_info):
+    """아직 수신되지 않은 청크 인덱스 목록"""
+    bitmap = upload_info["chunk_bitmap"]
+    return [i for i in range(upload_info["total_chunks"]) if not is_chunk_received(bitmap, i)]
+
+def hash_received_prefix(upload_info):
+    """앞에서부터 연속으로 수신된 청크까지 전체 파일 해시 진행 (스레드용)"""
+    bitmap = upload_info["chunk_bitmap"]
+    chunk_size = upload_info["chunk_size"]
+    hasher = upload_info["content_hasher"]
+
+    with open(upload_info["temp_path"], "rb") as temp_file:
+        temp_file.seek(upload_info["hashed_chunks"] * chunk_size)
+        while (upload_info["hashed_chunks"] < upload_info["total_chunks"]
+               and is_chunk_received(bitmap, upload_info["hashed_chunks"])):
+            remaining = min(chunk_size, upload_info["file_size"] - upload_info["hashed_chunks"] * chunk_size)
+            while remaining > 0:
+                block = temp_file.read(min(UPLOAD_READ_BLOCK_SIZE, remaining))
+                if not block:
+                    raise IOError("임시 파일이 예상보다 짧습니다")
+                hasher.update(block)
+                remaining -= len(block)
+            upload_info["hashed_chunks"] += 1
+
+async def advance_content_hash(upload_info):
+    """수신된 청크를 순서대로 해시에 반영 (순서 무관 업로드 중에도 점진적으로 계산)"""
+    async with upload_info["hash_lock"]:
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, hash_received_prefix, upload_info)
+
+def write_chunk_at_offset(temp_path, offset, source, expected_size):
+    """청크를 파일의 해당 오프셋에 스트리밍 기록하며 SHA-256 계산 (스레드용)"""
+    sha256 = hashlib.sha256()
+    written = 0
+    with open(temp_path, "r+b") as temp_file:
+        temp_file.seek(offset)
+        while True:
+            block = source.read(UPLOAD_READ_BLOCK_SIZE)
+            if not block:
+                break
+            written += len(block)
+            if written > expected_size:
+                raise ValueError("청크 크기가 예상보다 큽니다")
+            sha256.update(block)
+            temp_file.write(block)
+    return written, sha256.hexdigest()
 
 @app.post("/upload/init")
 async def init_upload(request: dict):
     """
-    청크 업로드 초기화
+    청크 업로드 초기화 (최종 크기로 임시 파일 사전 할당)
     """
     filename = request.get("filename")
     file_size = request.get("fileSize")
@@ -910,34 +3281,67 @@ async def init_upload(request: dict):
         raise HTTPException(status_code=400, detail="지원하지 않는 파일 형식입니다")
 
     # 파일 크기 제한 (2GB)
-    max_size = 2 * 1024 * 1024 * 1024  # 2GB
-    if file_size > max_size:
-        raise HTTPException(status_code=400, detail="파일 크기가 2GB를 초과합니다")
+    if file_size > MAX_UPLOAD_SIZE:
+        raise HTTPException(status_code=413, detail="파일 크기가 2GB를 초과합니다")
+
+    # 청크 크기 (마지막 청크를 제외한 모든 청크는 같은 크기)
+    chunk_size = request.get("chunkSize") or math.ceil(file_size / total_chunks)
+    if math.ceil(file_size / chunk_size) != total_chunks:
+        raise HTTPException(status_code=400, detail="청크 크기와 청크 개수가 일치하지 않습니다")
 
     # 고유 업로드 ID 생성
     upload_id = str(uuid.uuid4())
+    temp_path = os.path.join(TEMP_DIR, f"{upload_id}.tmp")
+
+    # 최종 크기로 사전 할당 (청크가 순서와 무관하게 오프셋에 기록됨)
+    with open(temp_path, "wb") as temp_file:
+        temp_file.truncate(file_size)
 
     # 임시 저장 정보 초기화
     chunk_uploads[upload_id] = {
         "filename": filename,
         "file_size": file_size,
         "total_chunks": total_chunks,
-        "uploaded_chunks": [],
-        "temp_path": os.path.join(TEMP_DIR, f"{upload_id}.tmp"),
+        "chunk_size": chunk_size,
+        "chunk_bitmap": bytearray(math.ceil(total_chunks / 8)),
+        "received_count": 0,
+        "chunk_checksums": {},
+        "content_hasher": hashlib.sha256(),
+        "hashed_chunks": 0,
+        "hash_lock": asyncio.Lock(),
+        "temp_path": temp_path,
         "created_at": datetime.now()
     }
 
-    return {"uploadId": upload_id}
+    return {"uploadId": upload_id, "chunkSize": chunk_size}
+
+@app.get("/upload/{upload_id}/status")
+async def get_upload_status(upload_id: str):
+    """
+    청크 업로드 상태 조회 (이어 올리기용 누락 청크 목록)
+    """
+    if upload_id not in chunk_uploads:
+        raise HTTPException(status_code=404, detail="잘못된 업로드 ID입니다")
+
+    upload_info = chunk_uploads[upload_id]
+    return {
+        "uploadId": upload_id,
+        "totalChunks": upload_info["total_chunks"],
+        "chunkSize": upload_info["chunk_size"],
+        "receivedChunks": upload_info["received_count"],
+        "missingChunks": missing_chunks(upload_info)
+    }
 
 @app.post("/upload/chunk")
 async def upload_chunk(
     uploadId: str = Form(...),
     chunkIndex: int = Form(...),
     totalChunks: int = Form(...),
-    chunk: UploadFile = File(...)
+    chunk: UploadFile = File(...),
+    checksum: Optional[str] = Form(None)
 ):
     """
-    파일 청크 업로드
+    파일 청크 업로드 (청크 오프셋에 직접 기록, 병렬/순서 무관 업로드 지원)
     """
     if uploadId not in chunk_uploads:
         raise HTTPException(status_code=400, detail="잘못된 업로드 ID입니다")
@@ -945,24 +3349,38 @@ async def upload_chunk(
     upload_info = chunk_uploads[uploadId]
 
     # 청크 인덱스 검증
-    if chunkIndex >= totalChunks or chunkIndex in upload_info["uploaded_chunks"]:
+    if totalChunks != upload_info["total_chunks"] or not 0 <= chunkIndex < totalChunks:
         raise HTTPException(status_code=400, detail="잘못된 청크 인덱스입니다")
 
-    # 청크 데이터 읽기
-    chunk_data = await chunk.read()
+    offset = chunkIndex * upload_info["chunk_size"]
+    expected_size = min(upload_info["chunk_size"], upload_info["file_size"] - offset)
 
     try:
-        # 임시 파일에 청크 추가
-        with open(upload_info["temp_path"], "ab") as temp_file:
-            temp_file.write(chunk_data)
+        # 청크를 블록 단위로 읽으며 오프셋에 기록 (이벤트 루프 블로킹 방지)
+        loop = asyncio.get_running_loop()
+        written, chunk_checksum = await loop.run_in_executor(
+            None, write_chunk_at_offset, upload_info["temp_path"], offset, chunk.file, expected_size
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"청크 저장 중 오류 발생: {str(e)}")
 
-        # 업로드된 청크 기록
-        upload_info["uploaded_chunks"].append(chunkIndex)
+    if written != expected_size:
+        raise HTTPException(status_code=400, detail="청크 크기가 일치하지 않습니다")
 
-        return {"success": True, "chunkIndex": chunkIndex}
+    if checksum and checksum.lower() != chunk_checksum:
+        raise HTTPException(status_code=400, detail="청크 체크섬이 일치하지 않습니다")
 
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"청크 저장 중 오류 발생: {str(e)}")
+    # 업로드된 청크 기록 (재전송된 청크는 덮어쓰기만 하고 중복 집계하지 않음)
+    if mark_chunk_received(upload_info["chunk_bitmap"], chunkIndex):
+        upload_info["received_count"] += 1
+    upload_info["chunk_checksums"][chunkIndex] = chunk_checksum
+
+    # 연속 구간이 생기면 전체 파일 해시를 이어서 계산 (페이지 캐시에 있는 동안)
+    await advance_content_hash(upload_info)
+
+    return {"success": True, "chunkIndex": chunkIndex, "checksum": chunk_checksum}
 
 @app.post("/upload/complete")
 async def complete_upload(request: dict):
@@ -977,7 +3395,7 @@ async def complete_upload(request: dict):
     upload_info = chunk_uploads[upload_id]
 
     # 모든 청크가 업로드되었는지 확인
-    if len(upload_info["uploaded_chunks"]) != upload_info["total_chunks"]:
+    if upload_info["received_count"] != upload_info["total_chunks"]:
         raise HTTPException(status_code=400, detail="모든 청크가 업로드되지 않았습니다")
 
     # 최종 파일 경로 설정
@@ -986,31 +3404,20 @@ async def complete_upload(request: dict):
     final_path = os.path.join(UPLOAD_DIR, filename)
 
     try:
-        # 임시 파일을 최종 위치로 이동
-        shutil.move(upload_info["temp_path"], final_path)
-
         # 실제 파일 크기 검증
-        actual_size = os.path.getsize(final_path)
+        actual_size = os.path.getsize(upload_info["temp_path"])
         if actual_size != upload_info["file_size"]:
-            # 크기가 맞지 않으면 파일 삭제
-            os.remove(final_path)
             raise HTTPException(status_code=400, detail="파일 크기가 일치하지 않습니다")
 
+        # 남은 청크까지 해시 반영 후 콘텐츠 해시 확정
+        await advance_content_hash(upload_info)
+        content_hash = upload_info["content_hasher"].hexdigest()
+
+        # 콘텐츠 해시 기준 저장 (중복이면 기존 파일 재사용)
+        blob, is_duplicate = store_uploaded_file(upload_info["temp_path"], final_path, content_hash, actual_size)
+
         # 비디오 메타데이터 추출 및 저장
-        video_id = len(videos_db) + 1
-        metadata = extract_video_metadata(final_path)
-        video_info = {
-            "id": video_id,
-            "filename": filename,
-            "original_name": upload_info["filename"],
-            "file_path": final_path,
-            "file_size": actual_size,
-            "uploaded_at": datetime.now().isoformat(),
-            "status": "uploaded",
-            "duration": metadata["duration"],
-            "thumbnail": metadata["thumbnail"]
-        }
-        videos_db.append(video_info)
+        video_info = await create_video_record(upload_info["filename"], filename, blob, content_hash, is_duplicate)
 
         # 임시 데이터 정리
         del chunk_uploads[upload_id]
@@ -1018,8 +3425,10 @@ async def complete_upload(request: dict):
         return {
             "success": True,
             "message": f"'{upload_info['filename']}' 파일이 성공적으로 업로드되었습니다.",
-            "video_id": video_id,
-            "filename": filename
+            "video_id": video_info["id"],
+            "filename": filename,
+            "duplicate": is_duplicate,
+            "status": video_info["status"]
         }
 
     except Exception as e:
@@ -1029,107 +3438,252 @@ async def complete_upload(request: dict):
         del chunk_uploads[upload_id]
         raise HTTPException(status_code=500, detail=f"파일 완료 처리 중 오류 발생: {str(e)}")
 
+class MultipartFileStream:
+    """multipart/form-data 본문에서 파일 필드 하나만 꺼내는 증분 파서 (받은 만큼 feed 후 take로 데이터 블록 회수)"""
+    def __init__(self, content_type_header, field_name="file"):
+        content_type, params = parse_options_header(content_type_header)
+        if content_type != b"multipart/form-data" or b"boundary" not in params:
+            raise HTTPException(status_code=400, detail="multipart/form-data 요청이 아닙니다")
+        self.field_name = field_name.encode("latin-1")
+        self.filename = None
+        self.completed = False
+        self._pending = []
+        self._headers = {}
+        self._header_field = b""
+        self._header_value = b""
+        self._in_file = False
+        self._parser = MultipartParser(params[b"boundary"], callbacks={
+            "on_part_begin": self._on_part_begin,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end
+        })
+
+    def _on_part_begin(self):
+        self._headers = {}
+
+    def _on_header_field(self, data, start, end):
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data, start, end):
+        self._header_value += data[start:end]
+
+    def _on_header_end(self):
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field = b""
+        self._header_value = b""
+
+    def _on_headers_finished(self):
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        # 같은 이름의 파일 필드가 여러 개면 첫 번째만 사용
+        if options.get(b"name") == self.field_name and b"filename" in options and self.filename is None:
+            self.filename = os.path.basename(options[b"filename"].decode("utf-8", errors="replace"))
+            self._in_file = True
+
+    def _on_part_data(self, data, start, end):
+        if self._in_file:
+            self._pending.append(bytes(data[start:end]))
+
+    def _on_part_end(self):
+        if self._in_file:
+            self._in_file = False
+            self.completed = True
+
+    def feed(self, data):
+        self._parser.write(data)
+
+    def take(self):
+        """지금까지 파싱된 파일 데이터 블록 반환 후 비움"""
+        blocks, self._pending = self._pending, []
+        return blocks
+
+async def stream_upload_to_disk(request: Request, dest_path, allowed_extensions, max_size=MAX_UPLOAD_SIZE):
+    """
+    multipart 요청 본문을 받는 대로 파일 필드만 디스크에 기록 (크기 제한 검사 및 SHA-256 계산 동시 수행)
+
+    UploadFile과 달리 Starlette가 본문 전체를 임시 파일로 먼저 받아 두지 않으므로 디스크 기록은 한 번뿐
+    반환값: (원본 파일명, 파일 크기, SHA-256)
+    """
+    form = MultipartFileStream(request.headers.get("content-type", ""))
+    sha256 = hashlib.sha256()
+    file_size = 0
+    async with aiofiles.open(dest_path, "wb") as buffer:
+        async for data in request.stream():
+            form.feed(data)
+            # 파일 파트 헤더를 받은 즉시 확장자 검증 (본문을 끝까지 받지 않음)
+            if form.filename is not None and os.path.splitext(form.filename)[1].lower() not in allowed_extensions:
+                raise HTTPException(status_code=400, detail="지원하지 않는 파일 형식입니다")
+            for block in form.take():
+                file_size += len(block)
+                if file_size > max_size:
+                    raise HTTPException(status_code=413, detail="파일 크기가 2GB를 초과합니다")
+                sha256.update(block)
+                await buffer.write(block)
+    if not form.completed:
+        raise HTTPException(status_code=400, detail="업로드할 파일이 없습니다")
+    return form.filename, file_size, sha256.hexdigest()
+
+@app.middleware("http")
+async def reject_oversized_upload(request: Request, call_next):
+    """Content-Length가 업로드 제한을 넘는 요청은 본문 수신 전에 거부"""
+    if request.method == "POST" and request.url.path == "/upload":
+        content_length = request.headers.get("content-length")
+        if content_length and content_length.isdigit() and int(content_length) > MAX_UPLOAD_SIZE + MULTIPART_OVERHEAD_ALLOWANCE:
+            return JSONResponse(
+                status_code=413,
+                content={
+                    "success": False,
+                    "error": "파일 크기가 2GB를 초과합니다",
+                    "timestamp": datetime.now().isoformat()
+                }
+            )
+    return await call_next(request)
+
 # 기존 단일 파일 업로드 (호환성 유지)
 @app.post("/upload")
-async def upload_video(file: UploadFile = File(...)):
+async def upload_video(request: Request):
     """
-    비디오 파일 업로드 (단일 파일, 호환성 유지)
+    비디오 파일 업로드 (단일 파일, multipart/form-data의 file 필드, 호환성 유지)
     """
-    # 확장자 검증 (파일명과 무관하게 확장자만 체크)
+    # 확장자 검증 (파일명과 무관하게 확장자만 체크, 파일 파트 헤더 수신 시 검사)
     allowed_extensions = ['.mp4', '.avi', '.mov', '.mkv', '.wmv', '.flv', '.webm']
-    file_extension = os.path.splitext(file.filename)[1].lower()
-    if file_extension not in allowed_extensions:
-        raise HTTPException(status_code=400, detail="지원하지 않는 파일 형식입니다")
 
-    # 파일 크기 제한 (2GB)
-    file_size = 0
-    content = await file.read()
-    file_size = len(content)
+    # 임시 파일에 먼저 저장 후 콘텐츠 해시로 중복 확인
+    temp_path = os.path.join(TEMP_DIR, f"{uuid.uuid4()}.tmp")
 
-    max_size = 2 * 1024 * 1024 * 1024  # 2GB
-    if file_size > max_size:
-        raise HTTPException(status_code=400, detail="파일 크기가 2GB를 초과합니다")
+    try:
+        # 요청 본문을 받는 대로 기록 (메모리 사용량은 수신 블록 크기로 제한, 2GB 제한은 저장 중 검사)
+        original_name, file_size, content_hash = await stream_upload_to_disk(request, temp_path, allowed_extensions)
 
-    # 파일 저장
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"{timestamp}_{file.filename}"
-    file_path = os.path.join(UPLOAD_DIR, filename)
+        # 파일 저장 경로
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename = f"{timestamp}_{original_name}"
+        file_path = os.path.join(UPLOAD_DIR, filename)
 
-    try:
-        with open(file_path, "wb") as buffer:
-            buffer.write(content)
+        # 콘텐츠 해시 기준 저장 (중복이면 기존 파일 재사용)
+        blob, is_duplicate = store_uploaded_file(temp_path, file_path, content_hash, file_size)
 
         # 비디오 메타데이터 추출 및 저장
-        video_id = len(videos_db) + 1
-        metadata = extract_video_metadata(file_path)
-        video_info = {
-            "id": video_id,
-            "filename": filename,
-            "original_name": file.filename,
-            "file_path": file_path,
-            "file_size": file_size,
-            "uploaded_at": datetime.now().isoformat(),
-            "status": "uploaded",  # uploaded, analyzing, completed, failed
-            "analysis_result": None,
-            "duration": metadata["duration"],
-            "thumbnail": metadata["thumbnail"]
-        }
-
-        videos_db.append(video_info)
+        video_info = await create_video_record(original_name, filename, blob, content_hash, is_duplicate)
 
         return {
             "success": True,
             "message": "비디오가 성공적으로 업로드되었습니다",
-            "video_id": video_id,
-            "filename": filename
+            "video_id": video_info["id"],
+            "filename": filename,
+            "duplicate": is_duplicate,
+            "status": video_info["status"]
         }
 
+    except HTTPException:
+        # 크기 제한 초과 등 검증 실패시 파일 삭제
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
     except Exception as e:
         # 업로드 실패시 파일 삭제
-        if os.path.exists(file_path):
-            os.remove(file_path)
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
         raise HTTPException(status_code=500, detail=f"업로드 실패: {str(e)}")
 
-@app.get("/videos")
-async def get_videos():
+@app.get("/uploads/dedup-stats")
+async def get_dedup_stats():
     """
-    업로드된 비디오 목록 조회
+    중복 업로드 제거 및 분석 결과 재사용 통계
     """
+    analysis_requests = dedup_stats["analysis_cache_hits"] + dedup_stats["analysis_cache_misses"]
+    stored_bytes = sum(blob["file_size"] for blob in content_index.values())
     return {
-        "videos": videos_db,
-        "total": len(videos_db)
+        **dedup_stats,
+        "unique_files": len(content_index),
+        "stored_bytes": stored_bytes,
+        "storage_savings_ratio": dedup_stats["bytes_saved"] / (stored_bytes + dedup_stats["bytes_saved"]) if stored_bytes else 0,
+        "upload_dedup_ratio": dedup_stats["duplicate_uploads"] / dedup_stats["uploads"] if dedup_stats["uploads"] else 0,
+        "analysis_cache_hit_rate": dedup_stats["analysis_cache_hits"] / analysis_requests if analysis_requests else 0
     }
 
+@app.get("/videos")
+async def get_videos(
+    request: Request,
+    cursor: int = 0,
+    limit: int = DEFAULT_PAGE_LIMIT,
+    view: str = "summary",
+    fields: Optional[str] = None,
+    since: int = 0
+):
+    """
+    업로드된 비디오 목록 조회 (커서 페이지네이션, 필드 투영, ETag 지원)
+
+    - view=summary: 무거운 필드 제외 (기본값), view=full: 전체 레코드 (분석 결과 본문은 /videos/{id}/result)
+    - fields: 쉼표로 구분된 필드만 반환
+    - since: 해당 리비전 이후 변경된 비디오만 반환
+    """
+    if view not in ("summary", "full"):
+        raise HTTPException(status_code=400, detail="view는 summary 또는 full이어야 합니다")
+
+    field_list = parse_fields_param(fields)
+    etag = make_etag("videos", videos_revision, cursor, limit, view, fields, since)
+
+    def build_content():
+        page, next_cursor = paginate_videos(videos_db, cursor, limit, since)
+        return {
+            "videos": [project_video(video, view, field_list) for video in page],
+            "total": len(videos_db),
+            "next_cursor": next_cursor,
+            "revision": videos_revision
+        }
+
+    return cached_json_response(request, etag, build_content)
+
 @app.get("/shorts/videos")
-async def get_completed_videos():
-    """쇼츠 생성용 분석 완료된 비디오 목록 반환"""
-    completed_videos = []
-    
-    for video in videos_db:
-        if video["status"] == "completed" and "result_file" in video:
-            # 결과 파일이 실제로 존재하는지 확인
-            if os.path.exists(video["result_file"]):
-                completed_videos.append({
+async def get_completed_videos(
+    request: Request,
+    cursor: int = 0,
+    limit: int = DEFAULT_PAGE_LIMIT,
+    since: int = 0
+):
+    """쇼츠 생성용 분석 완료된 비디오 목록 반환 (커서 페이지네이션, ETag 지원)"""
+    etag = make_etag("shorts", videos_revision, cursor, limit, since)
+
+    def build_content():
+        # 결과 파일 존재 여부는 쇼츠 생성 요청 시점에 확인 (목록 조회마다 stat 호출하지 않음)
+        completed = [
+            video for video in videos_db
+            if video["status"] == "completed" and "result_file" in video
+        ]
+        page, next_cursor = paginate_videos(completed, cursor, limit, since)
+        return {
+            "videos": [
+                {
                     "id": video["id"],
                     "original_name": video["original_name"],
                     "uploaded_at": video["uploaded_at"],
                     "duration": video.get("duration", "00:00"),
                     "thumbnail": video.get("thumbnail"),
                     "result_file": video["result_file"],
-                    "total_scenes": video.get("analysis_result", {}).get("total_scenes", 0),
-                    "dominant_mood": video.get("analysis_result", {}).get("overall_summary", {}).get("dominant_mood", "unknown"),
+                    "total_scenes": video.get("total_scenes", 0),
+                    "dominant_mood": video.get("dominant_mood", "unknown"),
                     "shorts_status": video.get("shorts_status", "none"),
                     "shorts_progress": video.get("shorts_progress", 0),
                     "shorts_clips_count": video.get("shorts_clips_count", 0)
-                })
-    
-    return {"videos": completed_videos, "total": len(completed_videos)}
+                }
+                for video in page
+            ],
+            "total": len(completed),
+            "next_cursor": next_cursor,
+            "revision": videos_revision
+        }
+
+    return cached_json_response(request, etag, build_content)
 
 @app.post("/shorts/generate/{video_id}")
 async def generate_shorts(video_id: int, background_tasks: BackgroundTasks):
     """선택된 비디오의 쇼츠 생성"""
     # 비디오 찾기
-    video = next((v for v in videos_db if v["id"] == video_id), None)
+    video = find_video(video_id)
     if not video:
         raise HTTPException(status_code=404, detail="비디오를 찾을 수 없습니다.")
     
@@ -1140,8 +3694,7 @@ async def generate_shorts(video_id: int, background_tasks: BackgroundTasks):
         raise HTTPException(status_code=400, detail="분석 결과 파일이 존재하지 않습니다.")
     
     # 쇼츠 생성 상태 초기화
-    video["shorts_status"] = "generating"
-    video["shorts_progress"] = 0
+    update_video(video, shorts_status="generating", shorts_progress=0)
     
     # 백그라운드에서 쇼츠 생성 작업 시작
     background_tasks.add_task(perform_shorts_generation, video_id)
@@ -1153,34 +3706,91 @@ async def generate_shorts(video_id: int, background_tasks: BackgroundTasks):
     }
 
 @app.get("/videos/{video_id}")
-async def get_video(video_id: int):
+async def get_video(video_id: int, view: str = "full"):
     """
     특정 비디오 정보 조회
     """
-    if video_id < 1 or video_id > len(videos_db):
-        raise HTTPException(status_code=404, detail="비디오를 찾을 수 없습니다")
+    video = get_video_or_404(video_id)
+    if view == "full":
+        return {**video, "analysis_result": await load_analysis_result(video)}
+    return project_video(video, view)
+
+@app.get("/videos/{video_id}/result")
+async def get_video_result(video_id: int, request: Request):
+    """
+    특정 비디오의 전체 분석 결과 조회 (ETag 지원)
+    """
+    video = get_video_or_404(video_id)
+    if not video.get("result_file"):
+        raise HTTPException(status_code=404, detail="분석 결과가 없습니다")
+
+    # 결과 ID/버전만으로 ETag 계산 (304면 결과를 읽지 않음)
+    etag = make_etag("result", video_id, video.get("result_id"), video.get("analysis_version", 0))
+    if etag_matches(request, etag):
+        return cached_json_response(request, etag, lambda: None)
+    analysis_result = await load_analysis_result(video)
+    return cached_json_response(request, etag, lambda: analysis_result)
+
+@app.get("/videos/{video_id}/trace")
+async def get_video_trace(video_id: int, format: str = "json"):
+    """
+    마지막 분석의 성능 추적 조회 (단계 구간, 장면별 요청 시간, 디코더/배치 결정)
 
-    return videos_db[video_id - 1]
+    format=folded: profile=true로 분석한 경우 flame graph용 folded 스택 (flamegraph.pl, speedscope)
+    """
+    video = get_video_or_404(video_id)
+    if format == "folded":
+        profile_file = video.get("profile_file")
+        if not profile_file or not os.path.exists(profile_file):
+            raise HTTPException(status_code=404, detail="프로파일이 없습니다 (profile=true로 분석해야 합니다)")
+        async with aiofiles.open(profile_file, 'r', encoding='utf-8') as f:
+            return Response(await f.read(), media_type="text/plain; charset=utf-8")
+    if format != "json":
+        raise HTTPException(status_code=400, detail=f"지원하지 않는 형식입니다: {format}")
+
+    trace_file = video.get("trace_file")
+    if not trace_file or not os.path.exists(trace_file):
+        raise HTTPException(status_code=404, detail="성능 추적이 없습니다")
+    async with aiofiles.open(trace_file, 'r', encoding='utf-8') as f:
+        return JSONResponse(json.loads(await f.read()))
 
 @app.post("/analyze/{video_id}")
-async def analyze_video(video_id: int, background_tasks: BackgroundTasks):
+async def analyze_video(video_id: int, background_tasks: BackgroundTasks, force: bool = False, sampling: str = "auto", profile: bool = False):
     """
     비디오 분석 시작 (qwen2.5vl:7b 모델 사용)
+
+    같은 콘텐츠의 분석 결과가 이미 있으면 재분석 없이 즉시 연결 (force=true로 강제 재분석)
+    sampling: auto(기본, 긴 영상은 적응형), dense(균일 간격), scene(FFmpeg 장면 필터로 변화 프레임만)
+    profile=true: 분석 중 파이썬 스택을 샘플링해 flame graph용 프로파일 저장 (/videos/{id}/trace?format=folded)
     """
-    if video_id < 1 or video_id > len(videos_db):
-        raise HTTPException(status_code=404, detail="비디오를 찾을 수 없습니다")
+    video = get_video_or_404(video_id)
 
-    video = videos_db[video_id - 1]
+    if sampling not in SAMPLING_MODES:
+        raise HTTPException(status_code=400, detail=f"지원하지 않는 샘플링 모드입니다: {sampling}")
 
     if video["status"] == "analyzing":
         raise HTTPException(status_code=400, detail="이미 분석이 진행중입니다")
 
+    if not force and video["status"] != "completed":
+        source = find_analyzed_duplicate(video.get("content_hash"), exclude_id=video_id)
+        if source:
+            link_analysis_artifacts(video, source)
+            dedup_stats["analysis_cache_hits"] += 1
+            return {
+                "success": True,
+                "message": "동일한 영상의 분석 결과를 재사용했습니다",
+                "video_id": video_id,
+                "status": "completed",
+                "cached": True
+            }
+
+    dedup_stats["analysis_cache_misses"] += 1
+
     # 분석 상태로 변경
-    video["status"] = "analyzing"
-    video["progress"] = 0
+    update_video(video, status="analyzing", progress=0)
     
     # 백그라운드에서 분석 실행
-    background_tasks.add_task(perform_video_analysis, video_id, video["file_path"])
+    background_tasks.add_task(perform_video_analysis, video_id, video["file_path"], sampling, profile)
     
     return {
         "success": True,
@@ -1212,14 +3822,14 @@ async def preload_ollama_models():
         
         # 병렬로 두 모델 로드
         tasks = [
-            requests.post("http://127.0.0.1:11434/api/generate", json=payload1, timeout=60),
-            requests.post("http://127.0.0.1:11434/api/generate", json=payload2, timeout=60)
+            requests.post(OLLAMA_API_URL, json=payload1, timeout=60),
+            requests.post(OLLAMA_API_URL, json=payload2, timeout=60)
         ]
         
         # 순차 실행 (안정성을 위해)
         for i, payload in enumerate([payload1, payload2], 1):
             try:
-                response = requests.post("http://127.0.0.1:11434/api/generate", json=payload, timeout=60)
+                response = requests.post(OLLAMA_API_URL, json=payload, timeout=60)
                 if response.status_code == 200:
                     logger.info(f"Ollama 모델 인스턴스 {i} 로드 완료")
                 else:
@@ -1232,15 +3842,23 @@ async def preload_ollama_models():
     except Exception as e:
         logger.warning(f"모델 사전 로드 중 전체 오류: {e}")
 
-async def perform_video_analysis(video_id: int, video_path: str):
-    """실제 비디오 분석 수행"""
-    video = videos_db[video_id - 1]
+async def perform_video_analysis(video_id: int, video_path: str, sampling: str = "auto", profile: bool = False):
+    """실제 비디오 분석 수행 (성능 추적을 결과 옆에 저장, profile 지정 시 샘플링 프로파일 함께 저장)"""
+    video = find_video(video_id)
+    frames_data = None
+    rss_monitor = PeakRSSMonitor().start()
+    trace = AnalysisTrace(video_id, sampling)
+    profiler = SamplingProfiler().start() if profile else None
+    # 썸네일/스프라이트/결과 파일명 접두사 (분석마다 고유, 장기 캐시 가능)
+    asset_prefix = f"{video_id}_{uuid.uuid4().hex[:8]}"
+    trace_fields = {}
     
     try:
         logger.info(f"비디오 {video_id} 분석 시작: {video_path}")
         
         # 모델 2개 인스턴스 사전 로드
-        await preload_ollama_models()
+        with trace.span("preload"):
+            await preload_ollama_models()
         
         # 분석기 초기화
         scene_analyzer = SceneAnalyzer()
@@ -1248,44 +3866,76 @@ async def perform_video_analysis(video_id: int, video_path: str):
         
         # 1단계: 프레임 추출 (1초 간격)
         logger.info("프레임 추출 시작...")
-        video["progress"] = 10
-        frames_data = await scene_analyzer.extract_frames_from_video(video_path, interval_seconds=1)
+        update_video(video, progress=10)
+        extract_span = trace.begin("extract")
+        frames_data = await scene_analyzer.extract_frames_from_video(
+            video_path,
+            interval_seconds=1,
+            sprite_prefix=asset_prefix,
+            sampling=sampling,
+            progress_callback=lambda frames, expected: event_broker.publish("extraction.progress", {
+                "video_id": video_id,
+                "frames": frames,
+                "expected_frames": expected
+            })
+        )
+        trace.end(extract_span, frames=len(frames_data) if frames_data else 0, sampling=scene_analyzer.sampling_stats)
         
         if not frames_data:
             raise Exception("프레임 추출 실패")
         
         # 2단계: 장면 전환 감지
         logger.info("장면 전환 감지 중...")
-        video["progress"] = 30
-        scene_changes = scene_analyzer.detect_scene_changes(frames_data)
-        detected_scenes = scene_analyzer.group_frames_by_scene(frames_data, scene_changes)
+        update_video(video, progress=30)
+        with trace.span("scene_detect") as detect_info:
+            scene_changes = scene_analyzer.detect_scene_changes(frames_data)
+            detected_scenes = scene_analyzer.group_frames_by_scene(frames_data, scene_changes)
+            detect_info.update(scene_changes=len(scene_changes), detected_scenes=len(detected_scenes))
         
         # 배치 크기 계산
         batch_size = batch_manager.get_optimal_batch_size()
         expected_scene_count = max(1, math.ceil(len(frames_data) / batch_size))
         
         # 폴백 로직: 감지된 씬이 기대 씬 수보다 적으면 배치 단위로 강제 분할
-        if len(detected_scenes) < expected_scene_count:
-            logger.info(f"씬 감지 부족 ({len(detected_scenes)} < {expected_scene_count}): 배치 단위로 {expected_scene_count}개 씬 생성")
-            scenes = build_scenes_by_batch(
-                frames_data,
-                scene_analyzer.interval_seconds,
-                scene_analyzer.video_duration,
-                batch_size
-            )
+        # (배치 모드에서는 매 장면 분석 후 측정값으로 조정된 배치 크기로 다음 씬을 만듦)
+        use_batches = len(detected_scenes) < expected_scene_count
+        if use_batches:
+            logger.info(f"씬 감지 부족 ({len(detected_scenes)} < {expected_scene_count}): 배치 단위로 씬 생성 (초기 배치 크기: {batch_size})")
         else:
             logger.info(f"씬 감지 충분: {len(detected_scenes)}개 씬 사용")
-            scenes = detected_scenes
+        
+        def next_scene(frame_index, scene_index):
+            """다음 분석할 장면 (없으면 None)"""
+            if use_batches:
+                if frame_index >= len(frames_data):
+                    return None
+                return build_batch_scene(
+                    frames_data,
+                    frame_index,
+                    batch_manager.current_batch_size,
+                    scene_analyzer.interval_seconds,
+                    scene_analyzer.video_duration,
+                    scene_index + 1
+                )
+            return detected_scenes[scene_index] if scene_index < len(detected_scenes) else None
         
         # 3단계: 장면별 순차 분석 (안정성 우선)
         logger.info("장면 분석 시작...")
         analysis_results = []
-        
-        total_scenes = len(scenes)
-        logger.info(f"총 {total_scenes}개 장면을 순차적으로 분석합니다...")
+        processed_frames = 0
         
         # 순차 분석 (안정적이고 예측 가능)
-        for i, scene in enumerate(scenes):
+        analysis_span = trace.begin("scene_analysis", mode="batch" if use_batches else "detected", initial_batch_size=batch_size)
+        while (scene := next_scene(processed_frames, len(analysis_results))) is not None:
+            i = len(analysis_results)
+            scene_started = time.perf_counter()
+            scene_analyzer.last_parse_method = None
+            processed_frames += len(scene['frames'])
+            remaining_frames = len(frames_data) - processed_frames
+            if use_batches:
+                total_scenes = i + 1 + math.ceil(remaining_frames / batch_manager.current_batch_size)
+            else:
+                total_scenes = len(detected_scenes)
             try:
                 logger.info(f"장면 {scene['scene_id']} 분석 중... ({i+1}/{total_scenes})")
                 
@@ -1293,15 +3943,24 @@ async def perform_video_analysis(video_id: int, video_path: str):
                     scene['frames'],
                     scene['scene_id'], 
                     scene['start_time'],
-                    scene['end_time']
+                    scene['end_time'],
+                    max_images=batch_manager.current_batch_size
                 )
+                scene_analysis["thumbnail"] = save_scene_thumbnail(scene['frames'], asset_prefix, scene['scene_id'])
+                scene_analysis["motion"] = scene_motion_stats(scene_analyzer.motion_timeline, scene['start_time'], scene['end_time'])
                 
                 analysis_results.append(scene_analysis)
                 logger.info(f"장면 {scene['scene_id']} 분석 완료")
+                event_broker.publish("scene.completed", {
+                    "video_id": video_id,
+                    "completed": i + 1,
+                    "total": total_scenes,
+                    "scene": scene_analysis
+                })
                 
-                # 진행률 업데이트 (30% ~ 90%)
-                progress = 30 + int((i + 1) / total_scenes * 60)
-                video["progress"] = progress
+                # 진행률 업데이트 (30% ~ 90%, 처리한 프레임 비율 기준)
+                progress = 30 + int(processed_frames / len(frames_data) * 60)
+                update_video(video, progress=progress)
                 
                 # 메모리 정리
                 gc.collect()
@@ -1311,18 +3970,29 @@ async def perform_video_analysis(video_id: int, video_path: str):
                 fallback_analysis = scene_analyzer.create_fallback_analysis(
                     scene['scene_id'],
                     scene['start_time'], 
-                    scene['end_time']
+                    scene['end_time'],
+                    "pipeline_exception"
                 )
+                fallback_analysis["thumbnail"] = save_scene_thumbnail(scene['frames'], asset_prefix, scene['scene_id'])
+                fallback_analysis["motion"] = scene_motion_stats(scene_analyzer.motion_timeline, scene['start_time'], scene['end_time'])
                 analysis_results.append(fallback_analysis)
+            
+            trace.add_scene(scene, analysis_results[-1], scene_analyzer.last_call_stats, scene_analyzer.last_parse_method, scene_started)
+            # 측정된 지연/토큰 속도/타임아웃/메모리로 다음 배치 크기 결정 (실제 전송한 이미지 수 기준)
+            call_stats = scene_analyzer.last_call_stats
+            batch_manager.observe(scene['scene_id'], call_stats.get("images") or len(scene['frames']), call_stats)
+        trace.end(analysis_span, scenes=len(analysis_results), final_batch_size=batch_manager.current_batch_size)
         
         # 메모리 정리
         gc.collect()
         
         # 4단계: 전체 요약 생성
         logger.info("전체 분석 요약 생성 중...")
-        video["progress"] = 90
+        update_video(video, progress=90)
         
-        overall_summary = generate_overall_summary(analysis_results, frames_data)
+        with trace.span("summary"):
+            overall_summary = generate_overall_summary(analysis_results, frames_data, scene_analyzer.audio_timeline)
+        memory_usage = {**rss_monitor.stop(), "frame_store": frames_data.stats()}
         
         # 5단계: 결과 저장
         logger.info("결과 저장 중...")
@@ -1333,141 +4003,292 @@ async def perform_video_analysis(video_id: int, video_path: str):
             "total_frames": len(frames_data),
             "video_duration": scene_analyzer.video_duration,
             "overall_summary": overall_summary,
+            "sprite_sheet": scene_analyzer.sprite_sheet,
+            "saliency_track": scene_analyzer.saliency_track,
+            "audio_timeline": scene_analyzer.audio_timeline,
+            "motion_timeline": scene_analyzer.motion_timeline,
+            "sampling": scene_analyzer.sampling_stats,
+            "batch_control": {**batch_manager.summary(), "mode": "batch" if use_batches else "detected"},
+            "memory": memory_usage,
             "scene_analysis": analysis_results
         }
         
-        # temp/영상파일명.json에 저장
-        video_filename = os.path.splitext(video["original_name"])[0]  # 확장자 제거
-        result_file_path = os.path.join(RESULTS_DIR, f"{video_filename}.json")
-        async with aiofiles.open(result_file_path, 'w', encoding='utf-8') as f:
-            await f.write(json.dumps(final_result, ensure_ascii=False, indent=2))
+        trace_fields = {
+            "status": "completed",
+            "frames": len(frames_data),
+            "video_duration": scene_analyzer.video_duration,
+            "batch_control": final_result["batch_control"],
+            "memory": memory_usage
+        }
         
-        # 비디오 상태 업데이트
-        video["status"] = "completed"
-        video["progress"] = 100
-        video["analysis_result"] = final_result
-        video["result_file"] = result_file_path
+        # temp/analysis_<고유 ID>.json에 저장 (같은 파일명 업로드끼리 덮어쓰지 않음) 후 상태 업데이트
+        with trace.span("result_write"):
+            await save_analysis_result(
+                video,
+                final_result,
+                asset_prefix,
+                status="completed",
+                progress=100,
+                total_scenes=final_result["total_scenes"],
+                peak_rss_mb=memory_usage["peak_rss_mb"],
+                dominant_mood=overall_summary.get("dominant_mood", "unknown")
+            )
         
         logger.info(f"비디오 {video_id} 분석 완료")
         
     except Exception as e:
         logger.error(f"비디오 {video_id} 분석 실패: {e}")
-        video["status"] = "failed"
-        video["progress"] = 0
-        video["error"] = str(e)
+        update_video(video, status="failed", progress=0, error=str(e))
+        trace_fields = {"status": "failed", "error": str(e)}
+    finally:
+        rss_monitor.stop()
+        if frames_data is not None:
+            frames_data.close()
+        await save_analysis_trace(video, trace, asset_prefix, profiler, **trace_fields)
+
+def resolve_selection_criteria(criteria):
+    """쇼츠 요청 조건에서 클립 선택 파라미터 추출 (기본값 적용, 잘못된 값이면 ValueError)"""
+    criteria = criteria or {}
+    options = {key: float(criteria.get(key, default)) for key, default in SHORTS_SELECTION_DEFAULTS.items()}
+    options["max_clips"] = int(options["max_clips"])
+    if options["target_duration"] <= 0 or options["min_clip_duration"] <= 0 or options["max_clips"] < 1:
+        raise ValueError("target_duration, min_clip_duration, max_clips는 양수여야 합니다")
+    if options["max_clip_duration"] < options["min_clip_duration"]:
+        raise ValueError("max_clip_duration은 min_clip_duration 이상이어야 합니다")
+    if not 0 <= options["diversity_penalty"] < 1 or options["padding"] < 0:
+        raise ValueError("diversity_penalty는 0~1, padding은 0 이상이어야 합니다")
+    if not 0 <= options["audio_weight"] <= 1:
+        raise ValueError("audio_weight는 0~1이어야 합니다")
+    if options["snap_tolerance"] < 0:
+        raise ValueError("snap_tolerance는 0 이상이어야 합니다")
+    return options
+
+def _build_highlight_segments(scored_scenes, options):
+    """시간순 (장면, 점수) 중 인접한 고득점 장면을 최대 길이 내에서 하나의 구간으로 병합"""
+    segments = []
+    for scene, score in scored_scenes:
+        time_range = scene.get("time_range", {})
+        start, end = float(time_range.get("start", 0)), float(time_range.get("end", 0))
+        if end <= start:
+            continue
+        current = segments[-1] if segments else None
+        if (current and score >= options["merge_min_score"] and current["min_score"] >= options["merge_min_score"]
+                and 0 <= start - current["end"] <= options["merge_gap"]
+                and end - current["start"] <= options["max_clip_duration"]):
+            current["end"] = end
+            current["scenes"].append(scene)
+            current["weighted_score"] += score * (end - start)
+            current["min_score"] = min(current["min_score"], score)
+            continue
+        segments.append({"start": start, "end": end, "scenes": [scene], "weighted_score": score * (end - start), "min_score": score})
+
+    for segment in segments:
+        moods = {}
+        for scene in segment["scenes"]:
+            time_range = scene.get("time_range", {})
+            moods[scene.get("mood", "neutral")] = moods.get(scene.get("mood", "neutral"), 0) + float(time_range.get("end", 0)) - float(time_range.get("start", 0))
+        segment["score"] = segment["weighted_score"] / max(sum(moods.values()), 1e-6)
+        segment["mood"] = max(moods, key=moods.get)
+    return segments
+
+def _fit_clip_window(start, end, length, video_duration):
+    """구간 중심을 유지하며 [0, 영상 길이] 안에서 원하는 길이로 늘리거나 줄임"""
+    center = (start + end) / 2
+    length = min(length, video_duration) if video_duration > 0 else length
+    new_start = max(0.0, center - length / 2)
+    if video_duration > 0:
+        new_start = min(new_start, video_duration - length)
+    return max(0.0, new_start), max(0.0, new_start) + length
+
+def select_highlight_clips(scenes, video_duration, options, audio_timeline=None):
+    """예산(목표 총 길이) 내에서 점수가 높은 구간을 겹치지 않게 선택 (오디오 흥분도 반영, 분위기 반복 감점, O(n log n))"""
+    excitement = audio_excitement_profile(audio_timeline) if options["audio_weight"] > 0 else None
+    scored = []
+    for scene in sorted(scenes, key=lambda s: float(s.get("time_range", {}).get("start", 0))):
+        score = float(scene.get("highlight_score", 0) or 0)
+        if excitement is not None:
+            score = (1 - options["audio_weight"]) * score + options["audio_weight"] * scene_audio_excitement(scene, excitement)
+        scored.append((scene, score))
+    candidates = [item for item in scored if item[1] >= options["min_score"]]
+    segments = _build_highlight_segments(candidates or scored, options)
+
+    # 여유 구간 추가 후 최소/최대 길이에 맞춤
+    for segment in segments:
+        start = max(0.0, segment["start"] - options["padding"])
+        end = segment["end"] + options["padding"]
+        if video_duration > 0:
+            end = min(end, video_duration)
+        length = min(max(end - start, options["min_clip_duration"]), options["max_clip_duration"])
+        segment["clip_start"], segment["clip_end"] = _fit_clip_window(start, end, length, video_duration)
+
+    # 분위기 감점은 값을 낮추기만 하므로 지연 재평가 최대 힙으로 탐욕 선택
+    heap = [(-segment["score"], i, 0) for i, segment in enumerate(segments)]
+    heapq.heapify(heap)
+    mood_counts = {}
+    selected_starts, selected = [], []
+    remaining = options["target_duration"]
+
+    while heap and remaining >= options["min_clip_duration"] and len(selected) < options["max_clips"]:
+        neg_value, i, seen_count = heapq.heappop(heap)
+        segment = segments[i]
+        count = mood_counts.get(segment["mood"], 0)
+        if count != seen_count:
+            heapq.heappush(heap, (-segment["score"] * (1 - options["diversity_penalty"]) ** count, i, count))
+            continue
+
+        start, end = segment["clip_start"], segment["clip_end"]
+        if end - start > remaining:
+            start, end = _fit_clip_window(start, end, remaining, video_duration)
 
-async def perform_shorts_generation(video_id: int):
-    """쇼츠 생성 작업 수행 (백그라운드)"""
+        # 이미 선택된 클립과 겹치면 제외 (시작 시각 정렬 목록에서 양옆만 확인)
+        pos = bisect.bisect_left(selected_starts, start)
+        if pos > 0 and selected[pos - 1]["clip_end"] > start:
+            continue
+        if pos < len(selected) and selected[pos]["clip_start"] < end:
+            continue
+
+        selected_starts.insert(pos, start)
+        selected.insert(pos, {**segment, "clip_start": start, "clip_end": end, "value": -neg_value})
+        mood_counts[segment["mood"]] = count + 1
+        remaining -= end - start
+
+    clips = []
+    for clip_id, segment in enumerate(selected, start=1):
+        best_scene = max(segment["scenes"], key=lambda s: s.get("highlight_score", 0) or 0)
+        clips.append({
+            "clip_id": clip_id,
+            "scene_id": segment["scenes"][0].get("scene_id"),
+            "scene_ids": [scene.get("scene_id") for scene in segment["scenes"]],
+            "start_time": round(segment["clip_start"], 3),
+            "end_time": round(segment["clip_end"], 3),
+            "duration": round(segment["clip_end"] - segment["clip_start"], 3),
+            "description": best_scene.get("scene_description", ""),
+            "mood": segment["mood"],
+            "highlight_score": round(segment["score"], 3),
+            "selection_score": round(segment["value"], 3)
+        })
+    return clips
+
+async def perform_shorts_generation(video_id: int, criteria: Optional[Dict[str, Any]] = None):
+    """쇼츠 생성 작업 수행 (하이라이트 선택 후 FFmpeg로 클립 렌더링)"""
+    criteria = criteria or {}
     try:
-        video = next((v for v in videos_db if v["id"] == video_id), None)
+        video = find_video(video_id)
         if not video:
             logger.error(f"쇼츠 생성 실패: 비디오 {video_id}를 찾을 수 없음")
-            return
+            return None
         
         logger.info(f"쇼츠 생성 시작: {video['original_name']}")
         
-        # 분석 결과 파일 읽기
-        async with aiofiles.open(video["result_file"], 'r', encoding='utf-8') as f:
-            analysis_data = json.loads(await f.read())
+        # 분석 결과 조회 (캐시 적중 시 디스크/JSON 파싱 없음)
+        analysis_data = await load_analysis_result(video)
         
-        # 하이라이트 장면 추출
-        highlight_scenes = []
-        for scene in analysis_data.get("scene_analysis", []):
-            if scene.get("highlight_score", 0) > 0.7:  # 하이라이트 점수 0.7 이상
-                highlight_scenes.append(scene)
-        
-        if not highlight_scenes:
-            logger.warning(f"하이라이트 장면이 없어서 상위 3개 장면 선택: {video['original_name']}")
-            # 하이라이트가 없으면 상위 3개 장면 선택
-            scenes_by_score = sorted(
-                analysis_data.get("scene_analysis", []), 
-                key=lambda x: x.get("highlight_score", 0), 
-                reverse=True
-            )
-            highlight_scenes = scenes_by_score[:3]
-        
-        # 쇼츠 클립 정보 생성
-        shorts_clips = []
-        for i, scene in enumerate(highlight_scenes[:5]):  # 최대 5개 클립
-            clip_info = {
-                "clip_id": i + 1,
-                "scene_id": scene.get("scene_id"),
-                "start_time": scene.get("time_range", {}).get("start", 0),
-                "end_time": scene.get("time_range", {}).get("end", 0),
-                "duration": scene.get("time_range", {}).get("duration", 0),
-                "description": scene.get("scene_description", ""),
-                "mood": scene.get("mood", "neutral"),
-                "highlight_score": scene.get("highlight_score", 0)
-            }
-            shorts_clips.append(clip_info)
+        # 목표 길이 예산 안에서 하이라이트 구간 선택
+        selection_options = resolve_selection_criteria(criteria)
+        shorts_clips = select_highlight_clips(
+            analysis_data.get("scene_analysis", []),
+            float(analysis_data.get("video_duration") or 0),
+            selection_options,
+            analysis_data.get("audio_timeline")
+        )
+        if not shorts_clips:
+            logger.warning(f"선택할 수 있는 하이라이트 구간이 없습니다: {video['original_name']}")
+        
+        # 클립 경계를 가까운 무음 지점으로 보정 (말 중간에서 잘리지 않도록)
+        snap_started = time.perf_counter()
+        snap_clip_boundaries(
+            shorts_clips,
+            analysis_data.get("audio_timeline"),
+            float(analysis_data.get("video_duration") or 0),
+            selection_options["snap_tolerance"]
+        )
+        logger.info(f"클립 경계 보정: {(time.perf_counter() - snap_started) * 1000:.1f}ms")
         
+        # 클립 렌더링 (제한된 동시성으로 병렬 인코딩, aspect="9:16"이면 세로 리프레이밍)
+        shorts_id = f"{video_id}_{uuid.uuid4().hex[:8]}"
+        encode_throughput = None
+        renderer = ClipRenderer()
+        if criteria.get("render", True) and renderer.available and shorts_clips:
+            output_dir = os.path.join(SHORTS_DIR, shorts_id)
+            encode_throughput = await renderer.render_clips(
+                video["file_path"],
+                shorts_clips,
+                output_dir,
+                progress_callback=lambda done, total: update_video(video, shorts_progress=int(done / total * 90)),
+                vertical=criteria.get("aspect") == "9:16",
+                saliency_track=analysis_data.get("saliency_track")
+            )
+            logger.info(f"클립 렌더링 완료: {encode_throughput}")
+        elif not renderer.available:
+            logger.warning("FFmpeg를 찾을 수 없어 클립 렌더링을 건너뜁니다")
+
         # 쇼츠 정보 저장
         shorts_result = {
             "video_id": video_id,
             "video_name": video["original_name"],
             "generation_timestamp": datetime.now().isoformat(),
             "total_clips": len(shorts_clips),
+            "total_duration": round(sum(clip["duration"] for clip in shorts_clips), 3),
+            "selection": selection_options,
+            "encode_throughput": encode_throughput,
             "clips": shorts_clips
         }
         
         # 쇼츠 결과 파일 저장
-        video_filename = os.path.splitext(video["original_name"])[0]
-        shorts_file_path = os.path.join(SHORTS_DIR, f"{video_filename}_shorts.json")
+        shorts_file_path = os.path.join(SHORTS_DIR, f"shorts_{shorts_id}.json")
         async with aiofiles.open(shorts_file_path, 'w', encoding='utf-8') as f:
             await f.write(json.dumps(shorts_result, ensure_ascii=False, indent=2))
         
         # 쇼츠 생성 완료 상태 업데이트
-        video["shorts_status"] = "completed"
-        video["shorts_progress"] = 100
-        video["shorts_file"] = shorts_file_path
-        video["shorts_clips_count"] = len(shorts_clips)
+        update_video(
+            video,
+            shorts_status="completed",
+            shorts_progress=100,
+            shorts_file=shorts_file_path,
+            shorts_clips_count=len(shorts_clips)
+        )
         
         logger.info(f"쇼츠 생성 완료: {len(shorts_clips)}개 클립 - {shorts_file_path}")
+        return shorts_result
         
     except Exception as e:
         logger.error(f"쇼츠 생성 실패 (비디오 {video_id}): {e}")
         
         # 쇼츠 생성 실패 상태 업데이트
-        video = next((v for v in videos_db if v["id"] == video_id), None)
+        video = find_video(video_id)
         if video:
-            video["shorts_status"] = "failed"
-            video["shorts_progress"] = 0
+            update_video(video, shorts_status="failed", shorts_progress=0)
+        return None
 
-def build_scenes_by_batch(frames_data: List[Dict], interval_sec: float, video_duration: float, batch_size: int) -> List[Dict]:
-    """배치 단위로 씬을 강제 생성"""
-    scenes = []
+def build_batch_scene(frames_data: FrameStore, start_index: int, batch_size: int, interval_sec: float, video_duration: float, scene_id: int) -> Dict:
+    """start_index부터 batch_size개 프레임으로 씬 하나 생성 (프레임은 복사 없이 구간 뷰로 보관)"""
     n = len(frames_data)
+    chunk = frames_data[start_index:start_index+batch_size]
+    start_time = float(chunk[0]['timestamp'])
     
-    for i in range(0, n, batch_size):
-        chunk = frames_data[i:i+batch_size]
-        start_time = float(chunk[0]['timestamp'])
-        
-        # 다음 배치의 첫 프레임 시각 (없으면 비디오 끝)
-        next_batch_start = float(frames_data[i+batch_size]['timestamp']) if (i+batch_size) < n else video_duration
-        
-        # 종료 시각: 마지막 프레임 + 간격, 다음 배치 시작, 비디오 끝 중 최소값
-        end_time = min(
-            float(chunk[-1]['timestamp']) + interval_sec,
-            next_batch_start,
-            video_duration
-        )
-        
-        # 시작과 끝이 같으면 최소 간격 보장
-        if end_time <= start_time:
-            end_time = min(start_time + interval_sec, video_duration)
-            
-        scenes.append({
-            'scene_id': len(scenes) + 1,
-            'start_time': start_time,
-            'end_time': end_time,
-            'frames': chunk
-        })
+    # 다음 배치의 첫 프레임 시각 (없으면 비디오 끝)
+    next_batch_start = float(frames_data[start_index+batch_size]['timestamp']) if (start_index+batch_size) < n else video_duration
     
-    logger.info(f"배치 단위로 {len(scenes)}개 씬 생성 (배치 크기: {batch_size})")
-    return scenes
+    # 종료 시각: 마지막 프레임 + 간격, 다음 배치 시작, 비디오 끝 중 최소값
+    end_time = min(
+        float(chunk[-1]['timestamp']) + interval_sec,
+        next_batch_start,
+        video_duration
+    )
+    
+    # 시작과 끝이 같으면 최소 간격 보장
+    if end_time <= start_time:
+        end_time = min(start_time + interval_sec, video_duration)
+        
+    return {
+        'scene_id': scene_id,
+        'start_time': start_time,
+        'end_time': end_time,
+        'frames': chunk
+    }
 
-def generate_overall_summary(analysis_results, frames_data):
-    """전체 분석 결과 요약 생성"""
+def generate_overall_summary(analysis_results, frames_data, audio_timeline=None):
+    """전체 분석 결과 요약 생성 (오디오 타임라인이 있으면 오디오 요약 포함)"""
     try:
         # 분위기 분포 계산
         mood_counts = {}
@@ -1484,6 +4305,11 @@ def generate_overall_summary(analysis_results, frames_data):
             if highlight_score > 0.7:
                 highlight_scenes.append(result)
         
+        # 오디오가 있으면 소리가 큰 장면을 우선 추천
+        excitement = audio_excitement_profile(audio_timeline)
+        if excitement is not None:
+            highlight_scenes.sort(key=lambda scene: scene_audio_excitement(scene, excitement), reverse=True)
+        
         # 주요 분위기 결정
         dominant_mood = max(mood_counts, key=mood_counts.get) if mood_counts else 'unknown'
         
@@ -1494,7 +4320,8 @@ def generate_overall_summary(analysis_results, frames_data):
             "highlight_scenes": len(highlight_scenes),
             "average_highlight_score": total_highlight_score / len(analysis_results) if analysis_results else 0,
             "recommended_clips": highlight_scenes[:5],  # 상위 5개 하이라이트
-            "analysis_quality": "good" if len([r for r in analysis_results if not r.get('error', False)]) > len(analysis_results) * 0.8 else "fair"
+            "analysis_quality": "good" if len([r for r in analysis_results if not r.get('error', False)]) > len(analysis_results) * 0.8 else "fair",
+            "audio": summarize_audio(audio_timeline)
         }
         
     except Exception as e:
@@ -1510,85 +4337,59 @@ def generate_overall_summary(analysis_results, frames_data):
         }
 
 @app.post("/generate-shorts/{video_id}")
-async def generate_shorts(video_id: int, criteria: Dict[str, Any] = None):
+async def generate_shorts_with_criteria(video_id: int, criteria: Dict[str, Any] = None):
     """
-    분석 결과를 기반으로 쇼츠 생성
+    분석 결과를 기반으로 쇼츠 생성 (완료까지 대기 후 클립 정보 반환)
     """
-    if video_id < 1 or video_id > len(videos_db):
-        raise HTTPException(status_code=404, detail="비디오를 찾을 수 없습니다")
-
-    video = videos_db[video_id - 1]
+    video = get_video_or_404(video_id)
 
     if video["status"] != "completed":
         raise HTTPException(status_code=400, detail="먼저 비디오 분석을 완료해야 합니다")
 
-    try:
-        # TODO: 실제 쇼츠 생성 로직 구현
-        # 1. 분석 결과에서 하이라이트 구간 추출
-        # 2. FFmpeg으로 클립 생성
-        # 3. 결과 저장
+    if video.get("shorts_status") == "generating":
+        raise HTTPException(status_code=400, detail="이미 쇼츠 생성이 진행중입니다")
 
-        # 임시 응답 (실제 구현시 제거)
-        shorts_result = {
-            "shorts_generated": 3,
-            "clips": [
-                {
-                    "id": 1,
-                    "start_time": "00:00:05",
-                    "end_time": "00:00:15",
-                    "mood": "excited",
-                    "description": "가장 신나는 부분"
-                },
-                {
-                    "id": 2,
-                    "start_time": "00:01:20",
-                    "end_time": "00:01:30",
-                    "mood": "happy",
-                    "description": "웃음이 많은 부분"
-                },
-                {
-                    "id": 3,
-                    "start_time": "00:03:45",
-                    "end_time": "00:03:55",
-                    "mood": "emotional",
-                    "description": "감정적인 부분"
-                }
-            ]
-        }
+    try:
+        resolve_selection_criteria(criteria)
+    except (TypeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"잘못된 쇼츠 생성 조건: {e}")
 
-        return {
-            "success": True,
-            "message": "쇼츠 생성이 완료되었습니다",
-            "video_id": video_id,
-            "shorts_result": shorts_result
-        }
+    update_video(video, shorts_status="generating", shorts_progress=0)
+    shorts_result = await perform_shorts_generation(video_id, criteria)
+    if shorts_result is None:
+        raise HTTPException(status_code=500, detail="쇼츠 생성 실패")
 
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"쇼츠 생성 실패: {str(e)}")
+    return {
+        "success": True,
+        "message": "쇼츠 생성이 완료되었습니다",
+        "video_id": video_id,
+        "shorts_result": shorts_result
+    }
 
 @app.delete("/videos/{video_id}")
 async def delete_video(video_id: int):
     """
     비디오 및 관련 파일 삭제
     """
-    if video_id < 1 or video_id > len(videos_db):
-        raise HTTPException(status_code=404, detail="비디오를 찾을 수 없습니다")
-
-    video = videos_db[video_id - 1]
+    video = get_video_or_404(video_id)
 
     try:
-        # 파일 삭제
-        if os.path.exists(video["file_path"]):
-            os.remove(video["file_path"])
+        # 파일 삭제 (같은 콘텐츠를 참조하는 다른 비디오가 있으면 유지)
+        release_stored_file(video)
 
-        # 분석 결과 삭제 (있는 경우)
-        if video["analysis_result"]:
-            result_file = os.path.join(ANALYSIS_DIR, f"analysis_{video_id}.json")
-            if os.path.exists(result_file):
-                os.remove(result_file)
+        # 분석 결과 삭제 (같은 결과를 공유하는 다른 비디오가 없을 때만)
+        result_file = video.get("result_file")
+        if (result_file and os.path.exists(result_file)
+                and not any(v is not video and v.get("result_file") == result_file for v in videos_db)):
+            os.remove(result_file)
+        for key in ("trace_file", "profile_file"):
+            artifact = video.get(key)
+            if (artifact and os.path.exists(artifact)
+                    and not any(v is not video and v.get(key) == artifact for v in videos_db)):
+                os.remove(artifact)
 
         # 목록에서 제거
-        videos_db.pop(video_id - 1)
+        unregister_video(video)
 
         return {
             "success": True,
@@ -1623,6 +4424,7 @@ async def general_exception_handler(request, exc):
     )
 
 if __name__ == "__main__":
+    import uvicorn
     uvicorn.run(
         "main:app",
         host="127.0.0.1",
@@ -0,0 +1,44 @@
+import os
+import sys
+
+import cv2
+import numpy as np
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+
+@pytest.fixture(scope="session")
+def backend(tmp_path_factory):
+    """임시 작업 디렉토리에서 불러온 백엔드 모듈 (업로드/결과 디렉토리가 저장소를 건드리지 않도록)"""
+    workdir = tmp_path_factory.mktemp("backend")
+    previous = os.getcwd()
+    os.chdir(workdir)
+    import main
+    main.ensure_directories()
+    yield main
+    os.chdir(previous)
+
+
+@pytest.fixture
+def client(backend):
+    from fastapi.testclient import TestClient
+    # lifespan(디렉토리 초기화, 디코더 프로브)은 실행하지 않음
+    return TestClient(backend.app)
+
+
+@pytest.fixture
+def make_video(tmp_path):
+    """색이 다른 짧은 합성 영상 생성 (색마다 내용/해시가 다름)"""
+    def _make(color, seconds=2, fps=10, size=(160, 90)):
+        path = str(tmp_path / f"video_{'_'.join(map(str, color))}.mp4")
+        writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), fps, size)
+        frame = np.zeros((size[1], size[0], 3), np.uint8)
+        frame[:] = color
+        for i in range(seconds * fps):
+            cv2.putText(frame, str(i), (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
+            writer.write(frame)
+        writer.release()
+        return path
+    return _make
@@ -0,0 +1,60 @@
+import asyncio
+import shutil
+import subprocess
+
+import cv2
+import pytest
+
+pytestmark = pytest.mark.skipif(not (shutil.which("ffmpeg") and shutil.which("ffprobe")), reason="ffmpeg/ffprobe 필요")
+
+FPS = 24
+GOP = 50  # 키프레임 시각이 ms 단위로 나누어떨어지지 않도록 (50/24 = 2.0833...초)
+# 스트림 복사는 끝을 dts로 자르므로 B 프레임 재정렬 깊이만큼 뒤 프레임이 더 들어올 수 있음
+COPY_TAIL_SLACK = 2
+
+
+@pytest.fixture
+def gop_video(tmp_path):
+    """고정 GOP의 H.264 합성 영상 (키프레임 0, 2.0833, 4.1667, 6.25, 8.3333초)"""
+    path = str(tmp_path / "gop.mp4")
+    subprocess.run([
+        "ffmpeg", "-y", "-hide_banner", "-loglevel", "error",
+        "-f", "lavfi", "-i", f"testsrc2=size=320x180:rate={FPS}:duration=10",
+        "-c:v", "libx264", "-g", str(GOP), "-keyint_min", str(GOP), "-sc_threshold", "0",
+        "-pix_fmt", "yuv420p", path
+    ], check=True)
+    return path
+
+
+def count_frames(path):
+    cap = cv2.VideoCapture(path)
+    frames = 0
+    while cap.read()[0]:
+        frames += 1
+    cap.release()
+    return frames
+
+
+def render(backend, video, start, end, output):
+    renderer = backend.ClipRenderer(max_workers=1)
+    return asyncio.run(renderer.render_clip(video, start, end, output, "h264"))
+
+
+def test_copy_clip_starts_at_snapped_keyframe(backend, gop_video, tmp_path):
+    keyframe = GOP / FPS
+    output = str(tmp_path / "copy.mp4")
+    # 시작점 직후의 키프레임과 일치 → 이전 GOP 없이 키프레임부터 복사
+    result = render(backend, gop_video, keyframe - 0.03, 6.0, output)
+    assert result["mode"] == "copy"
+    expected = round(6.0 * FPS) - GOP
+    assert 0 <= count_frames(output) - expected <= COPY_TAIL_SLACK
+    assert abs(backend.probe_video(output)["duration"] - expected / FPS) < 0.1
+
+
+def test_smart_cut_tail_does_not_repeat_head_gop(backend, gop_video, tmp_path):
+    output = str(tmp_path / "smart.mp4")
+    result = render(backend, gop_video, 1.0, 6.0, output)
+    assert result["mode"] == "smart"
+    expected = round(5.0 * FPS)
+    assert 0 <= count_frames(output) - expected <= COPY_TAIL_SLACK
+    assert abs(backend.probe_video(output)["duration"] - 5.0) < 0.1
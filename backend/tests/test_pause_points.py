@@ -0,0 +1,51 @@
+import base64
+
+import numpy as np
+
+
+def make_timeline(backend, energy_db):
+    energy = np.clip(np.round(energy_db), backend.AUDIO_FLOOR_DB, 0).astype(np.int8)
+    return {"envelope_rate": backend.AUDIO_ENVELOPE_RATE, "envelope_db": base64.b64encode(energy.tobytes()).decode("ascii")}
+
+
+def continuous_audio(backend, seconds, level_db=-18.0, seed=0):
+    rng = np.random.default_rng(seed)
+    return level_db + rng.normal(0, 3, seconds * backend.AUDIO_ENVELOPE_RATE)
+
+
+def test_continuous_audio_has_no_pauses(backend):
+    timeline = make_timeline(backend, continuous_audio(backend, 120))
+    assert len(backend.find_pause_points(timeline)) == 0
+
+
+def test_silent_audio_has_no_pauses(backend):
+    timeline = make_timeline(backend, np.full(60 * backend.AUDIO_ENVELOPE_RATE, backend.AUDIO_FLOOR_DB))
+    assert len(backend.find_pause_points(timeline)) == 0
+
+
+def test_real_pause_is_found(backend):
+    energy = continuous_audio(backend, 120)
+    rate = backend.AUDIO_ENVELOPE_RATE
+    energy[int(89.7 * rate):int(90.3 * rate)] = backend.AUDIO_FLOOR_DB
+    pauses = backend.find_pause_points(make_timeline(backend, energy))
+    assert len(pauses) == 1
+    assert abs(pauses[0] - 90.0) < 0.1
+
+
+def test_quiet_recording_pause_is_found(backend):
+    # 전체적으로 조용한 녹음(-45dBFS)이라도 바닥 수준까지 떨어지는 쉼은 무음
+    energy = continuous_audio(backend, 60, level_db=-45.0)
+    rate = backend.AUDIO_ENVELOPE_RATE
+    energy[30 * rate:31 * rate] = backend.AUDIO_FLOOR_DB
+    pauses = backend.find_pause_points(make_timeline(backend, energy))
+    assert len(pauses) == 1
+    assert abs(pauses[0] - 30.5) < 0.1
+
+
+def test_snap_keeps_boundaries_without_pauses(backend):
+    clips = [{"clip_id": 1, "start_time": 59.5, "end_time": 75.0, "duration": 15.5}]
+    for energy in (continuous_audio(backend, 120), np.full(120 * backend.AUDIO_ENVELOPE_RATE, backend.AUDIO_FLOOR_DB)):
+        snapped = backend.snap_clip_boundaries([dict(clip) for clip in clips], make_timeline(backend, energy), 120.0, 1.0)
+        assert snapped[0]["start_time"] == 59.5
+        assert snapped[0]["end_time"] == 75.0
+        assert "boundary_snap" not in snapped[0]
@@ -0,0 +1,38 @@
+import asyncio
+import os
+
+
+def upload(client, path):
+    with open(path, "rb") as f:
+        response = client.post("/upload", files={"file": (os.path.basename(path), f, "video/mp4")})
+    assert response.status_code == 200
+    return response.json()["video_id"]
+
+
+def test_reupload_after_delete_gets_new_id_and_no_cached_result(backend, client, make_video):
+    first_id = upload(client, make_video((200, 40, 40)))
+    video = backend.find_video(first_id)
+    asyncio.run(backend.save_analysis_result(video, {"scenes": ["first"]}, f"{first_id}_test", status="completed"))
+
+    assert client.get(f"/videos/{first_id}/result").json() == {"scenes": ["first"]}
+    assert any(key[0] == first_id for key in backend.result_cache)
+
+    assert client.delete(f"/videos/{first_id}").status_code == 200
+    assert not any(key[0] == first_id for key in backend.result_cache)
+
+    second_id = upload(client, make_video((40, 200, 40)))
+    assert second_id != first_id
+    assert client.get(f"/videos/{first_id}/result").status_code == 404
+    assert client.get(f"/videos/{second_id}/result").status_code == 404
+
+
+def test_ids_are_not_reused_after_delete(client, make_video):
+    ids = [upload(client, make_video(color)) for color in ((10, 10, 120), (10, 120, 10), (120, 10, 10))]
+    assert client.delete(f"/videos/{ids[0]}").status_code == 200
+
+    new_id = upload(client, make_video((90, 90, 90)))
+    assert new_id not in ids
+
+    listed = [video["id"] for video in client.get("/videos", params={"limit": 200}).json()["videos"]]
+    assert len(listed) == len(set(listed))
+    assert client.get(f"/videos/{ids[2]}").json()["id"] == ids[2]
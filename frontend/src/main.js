@@ -587,13 +587,13 @@ app.on('activate', () => {
   }
 });
 
-// IPC 통신 핸들러들 (나중에 백엔드와 통신할 때 사용)
-ipcMain.handle('get-video-list', async () => {
-  return new Promise((resolve, reject) => {
+// 비디오 목록 한 페이지 조회 (cursor 이후, 실패 시 null)
+function fetchVideoPage(cursor) {
+  return new Promise((resolve) => {
     const options = {
       hostname: '127.0.0.1',
       port: 8000,
-      path: '/videos',
+      path: `/videos?cursor=${cursor}&limit=200`,
       method: 'GET'
     };
 
@@ -606,23 +606,38 @@ ipcMain.handle('get-video-list', async () => {
 
       res.on('end', () => {
         try {
-          const response = JSON.parse(data);
-          console.log('Video list from backend:', response);
-          resolve(response.videos || []);
+          resolve(JSON.parse(data));
         } catch (error) {
           console.error('Error parsing video list:', error);
-          resolve([]);
+          resolve(null);
         }
       });
     });
 
     req.on('error', (error) => {
       console.error('Error fetching video list:', error);
-      resolve([]);
+      resolve(null);
     });
 
     req.end();
   });
+}
+
+// IPC 통신 핸들러들 (나중에 백엔드와 통신할 때 사용)
+ipcMain.handle('get-video-list', async () => {
+  // 목록이 커서 페이지네이션이므로 next_cursor가 없을 때까지 모든 페이지 조회
+  const videos = [];
+  let cursor = 0;
+  while (cursor !== null) {
+    const response = await fetchVideoPage(cursor);
+    if (!response) {
+      break;
+    }
+    videos.push(...(response.videos || []));
+    cursor = response.next_cursor ?? null;
+  }
+  console.log(`Video list from backend: ${videos.length} videos`);
+  return videos;
 });
 
 ipcMain.handle('analyze-video', async (event, videoId) => {
@@ -659,7 +674,8 @@ ipcMain.handle('analyze-video', async (event, videoId) => {
               success: true,
               message: result.message || '비디오 분석이 시작되었습니다',
               video_id: videoId,
-              status: result.status
+              status: result.status,
+              cached: result.cached === true
             });
           } else {
             console.error(`HTTP error! status: ${res.statusCode}`);
@@ -217,9 +217,15 @@ async function handleFileUpload(file) {
     }
 }
 
-// 청크 방식 파일 업로드 함수
+// 청크 방식 파일 업로드 함수 (여러 청크를 병렬 업로드, 서버가 청크 오프셋에 직접 기록)
+const UPLOAD_CHUNK_SIZE = 4 * 1024 * 1024; // 4MB 청크
+const UPLOAD_CONCURRENCY = 4; // 동시 업로드 청크 수
+const UPLOAD_CHUNK_RETRIES = 3; // 청크별 재시도 횟수
+const UPLOAD_RESUME_ROUNDS = 3; // 서버 상태 기준 누락 청크 재전송 최대 횟수
+const UPLOAD_RESUME_DELAY_MS = 1000; // 재전송 라운드 간 대기 (라운드마다 배로 증가)
+
 async function uploadFileInChunks(file) {
-    const chunkSize = 1024 * 1024; // 1MB 청크
+    const chunkSize = UPLOAD_CHUNK_SIZE;
     const totalChunks = Math.ceil(file.size / chunkSize);
 
     // 초기화 요청
@@ -231,7 +237,8 @@ async function uploadFileInChunks(file) {
         body: JSON.stringify({
             filename: file.name,
             fileSize: file.size,
-            totalChunks: totalChunks
+            totalChunks: totalChunks,
+            chunkSize: chunkSize
         })
     });
 
@@ -241,37 +248,92 @@ async function uploadFileInChunks(file) {
 
     const { uploadId } = await initResponse.json();
 
-    // 청크별 업로드
-    for (let chunkIndex = 0; chunkIndex < totalChunks; chunkIndex++) {
+    let completedChunks = 0;
+
+    // 청크 1개 업로드 (재시도 후에도 실패하면 false)
+    async function uploadChunk(chunkIndex) {
         const start = chunkIndex * chunkSize;
         const end = Math.min(start + chunkSize, file.size);
         const chunk = file.slice(start, end);
 
-        const formData = new FormData();
-        formData.append('uploadId', uploadId);
-        formData.append('chunkIndex', chunkIndex);
-        formData.append('totalChunks', totalChunks);
-        formData.append('chunk', chunk);
+        for (let attempt = 1; attempt <= UPLOAD_CHUNK_RETRIES; attempt++) {
+            const formData = new FormData();
+            formData.append('uploadId', uploadId);
+            formData.append('chunkIndex', chunkIndex);
+            formData.append('totalChunks', totalChunks);
+            formData.append('chunk', chunk);
+
+            try {
+                const chunkResponse = await fetch('http://127.0.0.1:8000/upload/chunk', {
+                    method: 'POST',
+                    body: formData
+                });
+                if (chunkResponse.ok) {
+                    return true;
+                }
+            } catch (error) {
+                console.warn(`청크 ${chunkIndex + 1} 업로드 오류 (시도 ${attempt}):`, error);
+            }
+        }
+        console.warn(`청크 ${chunkIndex + 1}/${totalChunks} 업로드 실패`);
+        return false;
+    }
 
-        const chunkResponse = await fetch('http://127.0.0.1:8000/upload/chunk', {
-            method: 'POST',
-            body: formData
+    // 청크 목록 병렬 업로드 (실패한 청크도 중단 없이 계속 진행, 실패 수 반환)
+    async function uploadPendingChunks(chunkIndexes) {
+        const pending = [...chunkIndexes];
+        let failed = 0;
+        const workers = Array.from({ length: Math.min(UPLOAD_CONCURRENCY, pending.length) }, async () => {
+            while (pending.length > 0) {
+                const chunkIndex = pending.shift();
+                if (!(await uploadChunk(chunkIndex))) {
+                    failed++;
+                    continue;
+                }
+
+                // 진행률 업데이트
+                completedChunks++;
+                const progress = Math.round((completedChunks / totalChunks) * 100);
+                updateUploadProgress(progress, `업로드 중... ${progress}%`);
+            }
         });
+        await Promise.all(workers);
+        return failed;
+    }
 
-        if (!chunkResponse.ok) {
-            throw new Error(`청크 ${chunkIndex + 1}/${totalChunks} 업로드 실패`);
+    // 서버가 받은 청크 비트맵 기준 누락 청크 목록 (조회 실패 시 null)
+    async function fetchMissingChunks() {
+        try {
+            const statusResponse = await fetch(`http://127.0.0.1:8000/upload/${uploadId}/status`);
+            if (statusResponse.ok) {
+                return (await statusResponse.json()).missingChunks;
+            }
+        } catch (error) {
+            console.warn('업로드 상태 조회 오류:', error);
         }
+        return null;
+    }
 
-        // 진행률 업데이트
-        const progress = Math.round(((chunkIndex + 1) / totalChunks) * 100);
-        const progressFill = document.getElementById('upload-progress-fill');
-        const progressText = document.getElementById('upload-progress-text');
+    // 청크별 병렬 업로드
+    await uploadPendingChunks(Array.from({ length: totalChunks }, (_, i) => i));
 
-        if (progressFill) {
-            progressFill.style.width = `${progress}%`;
+    // 서버 기준 누락 청크만 이어 올리기 (실패한 청크나 유실된 청크, 최대 UPLOAD_RESUME_ROUNDS회)
+    for (let round = 0; ; round++) {
+        const missingChunks = await fetchMissingChunks();
+        if (missingChunks !== null && missingChunks.length === 0) {
+            break;
         }
-        if (progressText) {
-            progressText.textContent = `업로드 중... ${progress}%`;
+        if (round >= UPLOAD_RESUME_ROUNDS) {
+            throw new Error(missingChunks === null
+                ? '업로드 상태 확인 실패'
+                : `청크 ${missingChunks.length}/${totalChunks}개 업로드 실패`);
+        }
+
+        await new Promise(resolve => setTimeout(resolve, UPLOAD_RESUME_DELAY_MS * 2 ** round));
+        if (missingChunks !== null) {
+            console.warn(`누락 청크 ${missingChunks.length}개 재전송 (${round + 1}/${UPLOAD_RESUME_ROUNDS})`);
+            completedChunks = totalChunks - missingChunks.length;
+            await uploadPendingChunks(missingChunks);
         }
     }
 
@@ -366,23 +428,35 @@ function getStatusText(status) {
 
 // 분석 시작
 async function startAnalysis(videoId) {
+    let watcher = null;
     try {
         // 1. 즉시 UI를 "분석 중" 상태로 업데이트
         updateVideoStatusInUI(videoId, 'analyzing', 0);
-        
+
+        // 2. 분석 요청 전에 이벤트를 구독해 요청 직후 발생하는 진행/완료 이벤트도 받음
+        watcher = await startAnalysisPolling(videoId);
+
         const result = await ipcRenderer.invoke('analyze-video', videoId);
-        if (result.success) {
-            showNotification('성공', result.message, 'success');
-            
-            // 2. 분석 진행 상황을 주기적으로 체크 (첫 새로고침은 3초 후)
-            startAnalysisPolling(videoId);
-        } else {
+        if (!result.success) {
+            watcher.cancel();
             // 실패 시 상태 복원
             await refreshVideoList();
             throw new Error(result.message || '분석 시작 실패');
         }
+
+        if (result.cached || result.status === 'completed') {
+            // 같은 영상의 분석 결과를 재사용한 경우 이벤트 없이 바로 완료
+            await watcher.finish('completed', result.message);
+        } else {
+            showNotification('성공', result.message, 'success');
+            // 구독 연결 직전에 상태가 바뀌었을 수 있으므로 현재 레코드로 한 번 맞춤
+            await watcher.sync();
+        }
     } catch (error) {
         console.error('Analysis error:', error);
+        if (watcher) {
+            watcher.cancel();
+        }
         showNotification('오류', error.message, 'error');
         // 에러 시 목록 새로고침
         await refreshVideoList();
@@ -413,49 +487,141 @@ function updateVideoStatusInUI(videoId, status, progress = 0) {
     }
 }
 
-// 분석 진행 상황 폴링
-function startAnalysisPolling(videoId) {
-    // 첫 번째 체크를 3초 후에 시작 (즉시 호출 방지)
-    const pollInterval = setInterval(async () => {
-        try {
-            const videoList = await ipcRenderer.invoke('get-video-list');
-            const video = videoList.videos.find(v => v.id === videoId);
-            
-            if (video) {
-                if (video.status === 'completed') {
-                    clearInterval(pollInterval);
-                    showNotification('완료', '비디오 분석이 완료되었습니다!', 'success');
-                    // 완료 시 자동 새로고침
-                    await refreshVideoList();
-                } else if (video.status === 'failed') {
-                    clearInterval(pollInterval);
-                    showNotification('실패', '비디오 분석이 실패했습니다.', 'error');
-                    // 실패 시 자동 새로고침
-                    await refreshVideoList();
-                } else if (video.status === 'analyzing') {
-                    // 분석 중일 때는 단순히 "분석 중..." 표시
-                    updateVideoStatusInUI(videoId, 'analyzing');
-                    console.log('분석 진행 중...');
+// 비디오 상태 이벤트 구독 (Server-Sent Events, 재접속 시 Last-Event-ID로 누락 이벤트 재전송)
+// 연결이 열리면 EventSource로 resolve (연결이 늦어지면 3초 후 그대로 진행)
+function subscribeVideoEvents(videoId, handlers, onReconnect = null) {
+    const source = new EventSource(`http://127.0.0.1:8000/events?video_id=${videoId}`);
+
+    Object.entries(handlers).forEach(([eventType, handler]) => {
+        source.addEventListener(eventType, (event) => {
+            try {
+                handler(JSON.parse(event.data), source);
+            } catch (error) {
+                console.error(`Event handling error (${eventType}):`, error);
+            }
+        });
+    });
+
+    // 재전송 버퍼를 벗어났으면 서버가 resync를 보내므로 현재 상태를 다시 조회
+    if (onReconnect) {
+        source.addEventListener('resync', () => onReconnect());
+    }
+
+    source.onerror = () => {
+        // EventSource가 자동 재접속하므로 연결이 완전히 닫힌 경우만 기록
+        if (source.readyState === EventSource.CLOSED) {
+            console.error('Event stream closed');
+        }
+    };
+
+    return new Promise((resolve) => {
+        let opened = false;
+        const timer = setTimeout(() => resolve(source), 3000);
+        source.addEventListener('open', () => {
+            if (opened) {
+                // 자동 재접속 후에는 놓친 상태 변경이 없는지 다시 확인
+                if (onReconnect) {
+                    onReconnect();
                 }
+                return;
             }
-        } catch (error) {
-            console.error('Polling error:', error);
-            clearInterval(pollInterval);
+            opened = true;
+            clearTimeout(timer);
+            resolve(source);
+        });
+    });
+}
+
+// 비디오 레코드 요약 조회 (실패 시 null)
+async function fetchVideoSummary(videoId) {
+    try {
+        const response = await fetch(`http://127.0.0.1:8000/videos/${videoId}?view=summary`);
+        return response.ok ? await response.json() : null;
+    } catch (error) {
+        console.error('Failed to get video status:', error);
+        return null;
+    }
+}
+
+// 분석 진행 상황 구독 (분석 요청 전에 호출, finish/sync/cancel 제어 객체 반환)
+async function startAnalysisPolling(videoId) {
+    let source = null;
+    let done = false;
+    let timer = null;
+
+    const cancel = () => {
+        done = true;
+        clearTimeout(timer);
+        if (source) {
+            source.close();
         }
-    }, 3000); // 3초마다 체크 (더 빠른 응답)
-    
+    };
+
+    const finish = async (status, message = null) => {
+        if (done) {
+            return;
+        }
+        cancel();
+        if (status === 'completed') {
+            showNotification('완료', message || '비디오 분석이 완료되었습니다!', 'success');
+        } else {
+            showNotification('실패', '비디오 분석이 실패했습니다.', 'error');
+        }
+        // 완료/실패 시 자동 새로고침
+        await refreshVideoList();
+    };
+
+    const handleStatus = async (status) => {
+        if (status === 'completed' || status === 'failed') {
+            await finish(status);
+        } else if (status === 'analyzing' && !done) {
+            updateVideoStatusInUI(videoId, 'analyzing');
+        }
+    };
+
+    // 현재 레코드 상태로 맞춤 (구독 전/재접속 중 놓친 이벤트 보정)
+    const sync = async () => {
+        const video = await fetchVideoSummary(videoId);
+        if (video) {
+            await handleStatus(video.status);
+        }
+    };
+
+    source = await subscribeVideoEvents(videoId, {
+        'video.updated': async (data) => {
+            if (data.changes.status) {
+                await handleStatus(data.changes.status);
+            } else if (data.changes.progress !== undefined && !done) {
+                updateVideoStatusInUI(videoId, 'analyzing');
+            }
+        },
+        'extraction.progress': (data) => {
+            console.log(`프레임 추출 진행: ${data.frames}/${data.expected_frames}`);
+        },
+        'scene.completed': (data) => {
+            console.log(`장면 분석 완료: ${data.completed}/${data.total}`);
+        }
+    }, sync);
+
     // 10분 후 자동 종료 (타임아웃)
-    setTimeout(() => {
-        clearInterval(pollInterval);
-    }, 600000);
+    timer = setTimeout(cancel, 600000);
+
+    return { finish, sync, cancel };
 }
 
 // 쇼츠 생성용 분석 완료된 비디오 목록 새로고침
 async function refreshShortsVideoList() {
     try {
-        const response = await fetch('http://127.0.0.1:8000/shorts/videos');
-        const data = await response.json();
-        updateShortsVideoListDisplay(data.videos || []);
+        // 목록이 커서 페이지네이션이므로 next_cursor가 없을 때까지 모든 페이지 조회
+        const videos = [];
+        let cursor = 0;
+        while (cursor !== null) {
+            const response = await fetch(`http://127.0.0.1:8000/shorts/videos?cursor=${cursor}&limit=200`);
+            const data = await response.json();
+            videos.push(...(data.videos || []));
+            cursor = data.next_cursor ?? null;
+        }
+        updateShortsVideoListDisplay(videos);
     } catch (error) {
         console.error('Failed to get shorts video list:', error);
         showNotification('오류', '쇼츠용 비디오 목록을 불러오는데 실패했습니다.', 'error');
@@ -552,10 +718,14 @@ function getShortsButton(video) {
 
 // 쇼츠 생성
 async function generateShorts(videoId) {
+    let watcher = null;
     try {
         // 버튼 상태를 즉시 '생성 중'으로 변경
         updateShortsButtonStatus(videoId, 'generating');
-        
+
+        // 생성 요청 전에 이벤트를 구독해 요청 직후 발생하는 완료/실패 이벤트도 받음
+        watcher = await startShortsPolling(videoId);
+
         const response = await fetch(`http://127.0.0.1:8000/shorts/generate/${videoId}`, {
             method: 'POST'
         });
@@ -564,15 +734,19 @@ async function generateShorts(videoId) {
         
         if (result.success) {
             showNotification('성공', result.message, 'success');
-            // 쇼츠 생성 상태 폴링 시작
-            startShortsPolling(videoId);
+            // 구독 연결 직전에 상태가 바뀌었을 수 있으므로 현재 레코드로 한 번 맞춤
+            await watcher.sync();
         } else {
+            watcher.cancel();
             // 실패 시 버튼 상태 복원
             updateShortsButtonStatus(videoId, 'failed');
-            throw new Error(result.message || '쇼츠 생성 요청 실패');
+            throw new Error(result.error || result.message || '쇼츠 생성 요청 실패');
         }
     } catch (error) {
         console.error('Shorts generation error:', error);
+        if (watcher) {
+            watcher.cancel();
+        }
         showNotification('오류', error.message, 'error');
         updateShortsButtonStatus(videoId, 'failed');
     }
@@ -593,34 +767,53 @@ function updateShortsButtonStatus(videoId, status, clipsCount = 0) {
     }
 }
 
-// 쇼츠 생성 상태 폴링
-function startShortsPolling(videoId) {
-    const pollInterval = setInterval(async () => {
-        try {
-            const response = await fetch('http://127.0.0.1:8000/shorts/videos');
-            const data = await response.json();
-            const video = data.videos.find(v => v.id === videoId);
-            
-            if (video) {
-                if (video.shorts_status === 'completed') {
-                    clearInterval(pollInterval);
-                    updateShortsButtonStatus(videoId, 'completed', video.shorts_clips_count);
-                    showNotification('완료', `쇼츠 생성이 완료되었습니다! (${video.shorts_clips_count}개 클립)`, 'success');
-                } else if (video.shorts_status === 'failed') {
-                    clearInterval(pollInterval);
-                    updateShortsButtonStatus(videoId, 'failed');
-                    showNotification('실패', '쇼츠 생성이 실패했습니다.', 'error');
-                }
-            }
-        } catch (error) {
-            console.error('Shorts polling error:', error);
+// 쇼츠 생성 상태 구독 (생성 요청 전에 호출, sync/cancel 제어 객체 반환)
+async function startShortsPolling(videoId) {
+    let source = null;
+    let done = false;
+    let timer = null;
+
+    const cancel = () => {
+        done = true;
+        clearTimeout(timer);
+        if (source) {
+            source.close();
         }
-    }, 3000); // 3초마다 체크
-    
+    };
+
+    const handleStatus = (shortsStatus, clipsCount = 0) => {
+        if (done) {
+            return;
+        }
+        if (shortsStatus === 'completed') {
+            cancel();
+            updateShortsButtonStatus(videoId, 'completed', clipsCount);
+            showNotification('완료', `쇼츠 생성이 완료되었습니다! (${clipsCount}개 클립)`, 'success');
+        } else if (shortsStatus === 'failed') {
+            cancel();
+            updateShortsButtonStatus(videoId, 'failed');
+            showNotification('실패', '쇼츠 생성이 실패했습니다.', 'error');
+        }
+    };
+
+    // 현재 레코드 상태로 맞춤 (구독 전/재접속 중 놓친 이벤트 보정)
+    const sync = async () => {
+        const video = await fetchVideoSummary(videoId);
+        if (video) {
+            handleStatus(video.shorts_status, video.shorts_clips_count || 0);
+        }
+    };
+
+    source = await subscribeVideoEvents(videoId, {
+        'video.updated': (data) => {
+            handleStatus(data.changes.shorts_status, data.changes.shorts_clips_count || 0);
+        }
+    }, sync);
+
     // 5분 후 자동 종료
-    setTimeout(() => {
-        clearInterval(pollInterval);
-    }, 300000);
+    timer = setTimeout(cancel, 300000);
+
+    return { sync, cancel };
 }
 
 // 설정 열기